@@ -1,8 +1,15 @@
-"""Setup and run a simple echo bot."""
+"""Setup and run the bot.
+
+    $ python main.py               # the bot, or a cluster when CLUSTER_WORKERS > 1
+    $ python main.py router        # the router of a cluster only
+    $ python main.py worker <i>    # the worker i of a cluster only
+"""
 
 import logging
+import os
+import sys
 
-from src import application
+from src import boot
 
 # Enable logging
 logging.basicConfig(
@@ -15,10 +22,39 @@ logger = logging.getLogger(__name__)
 
 
 def main() -> None:
-    app = application.create()
-    application.register_handlers(app)
-    application.schedule_jobs(app)
-    application.run(app)
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    worker = int(sys.argv[2]) if command == "worker" else None
+
+    with boot.phase("imports"):
+        from src import application, cluster, database
+        from src.config import Config
+
+    if worker is not None and not 0 <= worker < Config.CLUSTER_WORKERS:
+        raise ValueError(
+            f"Worker {worker} is not one of the {Config.CLUSTER_WORKERS} workers, "
+            "see CLUSTER_WORKERS"
+        )
+    if command == "router":
+        cluster.route()
+        return
+    if command is None and Config.CLUSTER_WORKERS > 1:
+        cluster.run_local(Config.CLUSTER_WORKERS)
+        return
+
+    # in production the schema is owned by alembic, see the release step in Procfile
+    # and the README for a new database
+    if os.getenv("ENV") != "production" and worker in (None, 0):
+        with boot.phase("schema"):
+            database.create_schema()
+
+    with boot.phase("application"):
+        app = application.create(worker)
+    with boot.phase("handlers"):
+        application.register_handlers(app)
+    with boot.phase("jobs"):
+        application.schedule_jobs(app, worker)
+    app.job_queue.run_once(boot.ready, 0, name="BOOT_READY")
+    application.run(app, worker)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""Add indexed user_data full_name and username.
+
+Revision ID: 3f6c2a9d1e47
+Revises: b8d8eafb9ab7
+Create Date: 2026-10-19 10:12:31.204117
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6c2a9d1e47"
+down_revision: Union[str, None] = "b8d8eafb9ab7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "user_data",
+        sa.Column(
+            "full_name", sa.String(length=150), server_default="", nullable=False
+        ),
+    )
+    op.add_column(
+        "user_data", sa.Column("username", sa.String(length=50), nullable=True)
+    )
+    op.execute(
+        "UPDATE user_data SET "
+        "full_name = left(coalesce(data ->> 'full_name', ''), 150), "
+        "username = left(data ->> 'username', 50)"
+    )
+    op.create_index("user_data_full_name_idx", "user_data", ["full_name"])
+    op.create_index(
+        "user_data_full_name_trgm_idx",
+        "user_data",
+        ["full_name"],
+        postgresql_using="gin",
+        postgresql_ops={"full_name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "user_data_username_trgm_idx",
+        "user_data",
+        ["username"],
+        postgresql_using="gin",
+        postgresql_ops={"username": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("user_data_username_trgm_idx", table_name="user_data")
+    op.drop_index("user_data_full_name_trgm_idx", table_name="user_data")
+    op.drop_index("user_data_full_name_idx", table_name="user_data")
+    op.drop_column("user_data", "username")
+    op.drop_column("user_data", "full_name")
@@ -0,0 +1,35 @@
+"""Add file file_unique_id, size and mime_type.
+
+Revision ID: 5d0b3e6a9c21
+Revises: c27e9f4b8d13
+Create Date: 2026-10-19 14:02:19.406851
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d0b3e6a9c21"
+down_revision: Union[str, None] = "c27e9f4b8d13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "file", sa.Column("file_unique_id", sa.String(length=100), nullable=True)
+    )
+    op.add_column("file", sa.Column("size", sa.BigInteger(), nullable=True))
+    op.add_column("file", sa.Column("mime_type", sa.String(length=100), nullable=True))
+    op.create_index("file_file_unique_id_idx", "file", ["file_unique_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("file_file_unique_id_idx", table_name="file")
+    op.drop_column("file", "mime_type")
+    op.drop_column("file", "size")
+    op.drop_column("file", "file_unique_id")
@@ -0,0 +1,30 @@
+"""Add user_data (full_name, user_id) index.
+
+Revision ID: 8a41d7c5b2e0
+Revises: 3f6c2a9d1e47
+Create Date: 2026-10-19 11:03:47.518260
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a41d7c5b2e0"
+down_revision: Union[str, None] = "3f6c2a9d1e47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "user_data_full_name_user_id_idx", "user_data", ["full_name", "user_id"]
+    )
+    op.drop_index("user_data_full_name_idx", table_name="user_data")
+
+
+def downgrade() -> None:
+    op.create_index("user_data_full_name_idx", "user_data", ["full_name"])
+    op.drop_index("user_data_full_name_user_id_idx", table_name="user_data")
@@ -0,0 +1,92 @@
+"""Store conversation key as bigint array.
+
+Revision ID: a93d5e1f6b28
+Revises: e61a4f0c7b95
+Create Date: 2026-10-19 16:08:52.730415
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a93d5e1f6b28"
+down_revision: Union[str, None] = "e61a4f0c7b95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ended conversations are no longer stored, they were stored as SQL `NULL` or as
+    # `json.dumps(None)`
+    op.execute(
+        "DELETE FROM conversation WHERE new_state IS NULL OR new_state = 'null'"
+    )
+    op.drop_constraint("_name_key_uc", "conversation", type_="unique")
+
+    op.add_column(
+        "conversation",
+        sa.Column("key_array", postgresql.ARRAY(sa.BigInteger()), nullable=True),
+    )
+    op.execute(
+        "UPDATE conversation SET key_array = "
+        "ARRAY(SELECT json_array_elements_text(key::json)::bigint)"
+    )
+    op.drop_column("conversation", "key")
+    op.alter_column("conversation", "key_array", new_column_name="key")
+    op.alter_column("conversation", "key", nullable=False)
+
+    op.alter_column(
+        "conversation",
+        "new_state",
+        type_=sa.JSON(),
+        postgresql_using="new_state::json",
+        nullable=False,
+    )
+    op.alter_column("conversation", "new_state", new_column_name="state")
+    op.add_column(
+        "conversation",
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+    op.create_unique_constraint("_name_key_uc", "conversation", ["name", "key"])
+    op.create_index(
+        "conversation_name_updated_at_idx", "conversation", ["name", "updated_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("conversation_name_updated_at_idx", table_name="conversation")
+    op.drop_constraint("_name_key_uc", "conversation", type_="unique")
+    op.drop_column("conversation", "updated_at")
+
+    op.alter_column("conversation", "state", new_column_name="new_state")
+    op.alter_column(
+        "conversation",
+        "new_state",
+        type_=sa.String(length=100),
+        postgresql_using="new_state::text",
+        nullable=True,
+    )
+
+    op.add_column(
+        "conversation", sa.Column("key_json", sa.String(length=100), nullable=True)
+    )
+    # the format of `json.dumps`
+    op.execute(
+        "UPDATE conversation SET key_json = '[' || array_to_string(key, ', ') || ']'"
+    )
+    op.drop_column("conversation", "key")
+    op.alter_column("conversation", "key_json", new_column_name="key")
+    op.alter_column("conversation", "key", nullable=False)
+
+    op.create_unique_constraint("_name_key_uc", "conversation", ["name", "key"])
@@ -0,0 +1,63 @@
+"""Check odd enrollment semesters per statement.
+
+Revision ID: b2c9e47d1a53
+Revises: f4b7c2d8e610
+Create Date: 2026-10-19 19:12:44.208317
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b2c9e47d1a53"
+down_revision: Union[str, None] = "f4b7c2d8e610"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS odd_semester ON enrollment")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION check_odd_semester() "
+        "RETURNS TRIGGER AS $$ "
+        "BEGIN "
+        "IF EXISTS (SELECT FROM new_enrollment AS e "
+        "INNER JOIN program_semester AS ps ON e.program_semester_id = ps.id "
+        "INNER JOIN semester as s ON ps.semester_id = s.id "
+        "WHERE MOD(s.number, 2) = 0) THEN "
+        "RAISE EXCEPTION 'Cannot insert: Semester number must be odd'; "
+        "END IF;"
+        "RETURN NULL; "
+        "END; $$ LANGUAGE PLPGSQL"
+    )
+    op.execute(
+        "CREATE TRIGGER odd_semester AFTER INSERT ON enrollment "
+        "REFERENCING NEW TABLE AS new_enrollment "
+        "FOR EACH STATEMENT EXECUTE PROCEDURE check_odd_semester()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS odd_semester ON enrollment")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION check_odd_semester() "
+        "RETURNS TRIGGER AS $$ "
+        "DECLARE "
+        "semester_number INT; "
+        "BEGIN "
+        "SELECT s.number INTO semester_number FROM program_semester AS ps "
+        "INNER JOIN semester as s ON ps.semester_id = s.id "
+        "WHERE ps.id = NEW.program_semester_id; "
+        "IF MOD(semester_number, 2) = 0 THEN "
+        "RAISE EXCEPTION 'Cannot insert: Semester number must be odd'; "
+        "END IF;"
+        "RETURN NEW; "
+        "END; $$ LANGUAGE PLPGSQL"
+    )
+    op.execute(
+        "CREATE TRIGGER odd_semester BEFORE INSERT ON enrollment "
+        "FOR EACH ROW EXECUTE PROCEDURE check_odd_semester()"
+    )
@@ -0,0 +1,27 @@
+"""Add file archive_message_id.
+
+Revision ID: c27e9f4b8d13
+Revises: 8a41d7c5b2e0
+Create Date: 2026-10-19 13:21:05.733412
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c27e9f4b8d13"
+down_revision: Union[str, None] = "8a41d7c5b2e0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("file", sa.Column("archive_message_id", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("file", "archive_message_id")
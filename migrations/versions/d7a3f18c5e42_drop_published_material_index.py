@@ -0,0 +1,35 @@
+"""Drop the published material index.
+
+Revision ID: d7a3f18c5e42
+Revises: b2c9e47d1a53
+Create Date: 2026-10-19 21:04:13.527094
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a3f18c5e42"
+down_revision: Union[str, None] = "b2c9e47d1a53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # material_course_id_academic_year_id_type_idx has the same columns
+    op.drop_index(
+        "material_published_course_id_academic_year_id_type_idx", table_name="material"
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        "material_published_course_id_academic_year_id_type_idx",
+        "material",
+        ["course_id", "academic_year_id", "type"],
+        postgresql_where=sa.text("published"),
+    )
@@ -0,0 +1,62 @@
+"""Add hot query indexes.
+
+Revision ID: e61a4f0c7b95
+Revises: 5d0b3e6a9c21
+Create Date: 2026-10-19 15:21:47.118203
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e61a4f0c7b95"
+down_revision: Union[str, None] = "5d0b3e6a9c21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "material_course_id_academic_year_id_type_idx",
+        "material",
+        ["course_id", "academic_year_id", "type"],
+    )
+    op.create_index(
+        "material_published_course_id_academic_year_id_type_idx",
+        "material",
+        ["course_id", "academic_year_id", "type"],
+        postgresql_where=sa.text("published"),
+    )
+    op.create_index(
+        "assignment_deadline_idx",
+        "assignment",
+        ["deadline"],
+        postgresql_where=sa.text("deadline IS NOT NULL"),
+    )
+    op.create_index(
+        "enrollment_academic_year_id_program_semester_id_idx",
+        "enrollment",
+        ["academic_year_id", "program_semester_id"],
+        postgresql_include=["user_id"],
+    )
+    op.create_index(
+        "file_material_id_type_name_id_idx",
+        "file",
+        ["material_id", "type", "name", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("file_material_id_type_name_id_idx", table_name="file")
+    op.drop_index(
+        "enrollment_academic_year_id_program_semester_id_idx", table_name="enrollment"
+    )
+    op.drop_index("assignment_deadline_idx", table_name="assignment")
+    op.drop_index(
+        "material_published_course_id_academic_year_id_type_idx", table_name="material"
+    )
+    op.drop_index("material_course_id_academic_year_id_type_idx", table_name="material")
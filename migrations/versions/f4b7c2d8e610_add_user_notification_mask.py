@@ -0,0 +1,65 @@
+"""Add user notification_mask.
+
+Revision ID: f4b7c2d8e610
+Revises: a93d5e1f6b28
+Create Date: 2026-10-19 16:47:05.381926
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4b7c2d8e610"
+down_revision: Union[str, None] = "a93d5e1f6b28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# `SettingKey` notification keys, in the order of their bits
+NOTIFICATION_KEYS = [
+    "notification.lecture",
+    "notification.tutorial",
+    "notification.lab",
+    "notification.reference",
+    "notification.sheet",
+    "notification.tool",
+    "notification.assignment",
+    "notification.review",
+]
+ALL_NOTIFICATIONS = (1 << len(NOTIFICATION_KEYS)) - 1
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user",
+        sa.Column(
+            "notification_mask",
+            sa.Integer(),
+            server_default=str(ALL_NOTIFICATIONS),
+            nullable=False,
+        ),
+    )
+    for bit, key in enumerate(NOTIFICATION_KEYS):
+        op.execute(
+            sa.text(
+                'UPDATE "user" SET notification_mask = notification_mask & ~:bit '
+                "WHERE id IN (SELECT user_id FROM setting "
+                "WHERE key = :key AND value::text = 'false')"
+            ).bindparams(bit=1 << bit, key=key)
+        )
+    op.execute("DELETE FROM setting WHERE key LIKE 'notification.%'")
+
+
+def downgrade() -> None:
+    for bit, key in enumerate(NOTIFICATION_KEYS):
+        op.execute(
+            sa.text(
+                "INSERT INTO setting (user_id, key, value) "
+                "SELECT id, :key, 'false' FROM \"user\" "
+                "WHERE notification_mask & :bit = 0"
+            ).bindparams(bit=1 << bit, key=key)
+        )
+    op.drop_column("user", "notification_mask")
@@ -0,0 +1,81 @@
+"""Measures the CPU time spent per call in the hot functions of `src/queries.py`,
+with and without SQLAlchemy's compiled statement cache.
+
+    $ python -m scripts.bench_queries [-n CALLS]
+
+CPU time is the time of this process only: time spent waiting for Postgres is
+left out, so the difference between the two runs is what caching saves.
+"""
+
+import argparse
+import time
+from datetime import UTC, datetime, timedelta
+
+from src import queries
+from src.database import Session as DBSession
+from src.models import Course
+
+from .explain_queries import samples
+
+
+def cases(values: dict) -> dict:
+    now = datetime.now(UTC)
+    return {
+        "user_courses": lambda session: queries.user_courses(
+            session,
+            program_id=values["program_id"],
+            semester_id=values["semester_id"],
+            user_id=values["user_id"],
+            sort_attr=Course.en_name,
+        ),
+        "all_have_editors": lambda session: queries.all_have_editors(
+            session,
+            course_ids=values["course_ids"],
+            academic_year=values["academic_year"],
+        ),
+        "assignments": lambda session: queries.assignments(
+            session,
+            program_id=values["program_id"],
+            semester_numbers=[1, 2],
+            start=now,
+        ),
+        "due_assignments": lambda session: queries.due_assignments(
+            session, start=now, end=now + timedelta(days=30)
+        ),
+        "assignment_users": lambda session: queries.assignment_users(
+            session,
+            assignment_id=values["material_id"],
+            academic_year_id=values["academic_year_id"],
+        ),
+    }
+
+
+def cpu_per_call(function, calls: int, compiled_cache: bool) -> float:
+    """Microseconds of CPU per call of :paramref:`function`"""
+    with DBSession() as session:
+        if not compiled_cache:
+            session.connection(execution_options={"compiled_cache": None})
+        function(session)  # warm up
+        start = time.process_time()
+        for _ in range(calls):
+            function(session)
+        return (time.process_time() - start) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    with DBSession() as session:
+        values = samples(session)
+
+    print(f"{'query':<20}{'cached µs':>12}{'uncached µs':>14}{'saved µs':>12}")
+    for name, function in cases(values).items():
+        cached = cpu_per_call(function, args.calls, compiled_cache=True)
+        uncached = cpu_per_call(function, args.calls, compiled_cache=False)
+        print(f"{name:<20}{cached:>12.1f}{uncached:>14.1f}{uncached - cached:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
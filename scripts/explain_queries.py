@@ -0,0 +1,166 @@
+"""Runs `EXPLAIN` on the SQL of every function in `src/queries.py` and flags
+sequential scans that filter rows, i.e. filters no index matches.
+
+Run it against a database holding realistic (seeded) data::
+
+    $ python -m scripts.explain_queries
+
+Sequential scans are disabled for the session by default, so that the planner
+picking a sequential scan on a small table doesn't hide a missing index: a
+`Seq Scan` that is still chosen means there is no index it could use. Pass
+`--seqscan` to keep the planner defaults. Exits with status 1 when a scan is
+flagged.
+"""
+
+import argparse
+import inspect
+import sys
+from typing import Any
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from src import queries
+from src.database import Session as DBSession
+from src.database import engine
+from src.models import (
+    AcademicYear,
+    AccessRequest,
+    Course,
+    Department,
+    Enrollment,
+    File,
+    Material,
+    Program,
+    ProgramSemester,
+    ProgramSemesterCourse,
+    RoleName,
+    Semester,
+    User,
+)
+
+
+def samples(session: Session) -> dict[str, Any]:
+    """Argument values for the functions of `src.queries`, by parameter name"""
+    first = {
+        "program_id": Program.id,
+        "semester_id": Semester.id,
+        "user_id": User.id,
+        "telegram_id": User.telegram_id,
+        "access_request_id": AccessRequest.id,
+        "department_id": Department.id,
+        "course_id": Course.id,
+        "year_id": AcademicYear.id,
+        "enrollment_id": Enrollment.id,
+        "program_semester_id": ProgramSemester.id,
+        "program_semester_course_id": ProgramSemesterCourse.id,
+        "material_id": Material.id,
+    }
+    values: dict[str, Any] = {
+        name: session.scalar(select(column).order_by(column).limit(1))
+        for name, column in first.items()
+    }
+    values.update(
+        {
+            "academic_year_id": values["year_id"],
+            "programs_semester_course_id": values["program_semester_course_id"],
+            "academic_year": session.get(AcademicYear, values["year_id"]),
+            "course_ids": [values["course_id"]],
+            "role_name": RoleName.STUDENT,
+            "query": "a",
+            "file_unique_ids": [
+                session.scalar(select(File.file_unique_id).limit(1)) or "-"
+            ],
+        }
+    )
+    return values
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """The `Seq Scan` nodes of :paramref:`plan` that have a `Filter`"""
+    found = []
+    if plan["Node Type"] == "Seq Scan" and "Filter" in plan:
+        found.append(f"{plan['Relation Name']}: {plan['Filter']}")
+    for child in plan.get("Plans", ()):
+        found += seq_scans(child)
+    return found
+
+
+def explain(session: Session, function, values: dict[str, Any]) -> list[str]:
+    """Calls :paramref:`function` and explains the statements it executed"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    parameters = list(inspect.signature(function).parameters)[1:]
+    kwargs = {name: values[name] for name in parameters if name in values}
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with session.begin_nested():
+            function(session, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    connection = session.connection()
+    found = []
+    for statement, params in statements:
+        plan = connection.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, params
+        ).scalar()
+        found += seq_scans(plan[0]["Plan"])
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--seqscan",
+        action="store_true",
+        help="keep sequential scans enabled for the planner",
+    )
+    args = parser.parse_args()
+
+    flagged = 0
+    with DBSession() as session:
+        if not args.seqscan:
+            session.execute(text("SET LOCAL enable_seqscan = off"))
+        values = samples(session)
+
+        for name, function in inspect.getmembers(queries, inspect.isfunction):
+            if name.startswith("_") or function.__module__ != queries.__name__:
+                continue
+            parameters = list(inspect.signature(function).parameters.values())
+            required = [
+                parameter.name
+                for parameter in parameters[1:]
+                if parameter.default is inspect.Parameter.empty
+            ]
+            if missing := [p for p in required if p not in values]:
+                print(f"SKIP  {name} (no sample for {', '.join(missing)})")
+                continue
+
+            try:
+                found = explain(session, function, values)
+            except Exception as e:
+                print(f"ERROR {name}: {e!r}")
+                continue
+
+            if found:
+                flagged += 1
+                print(f"SEQ   {name}")
+                for scan in found:
+                    print(f"        {scan}")
+            else:
+                print(f"OK    {name}")
+
+        session.rollback()
+
+    print(f"\n{flagged} function(s) with sequential scans")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
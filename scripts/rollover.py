@@ -0,0 +1,46 @@
+"""Rolls the enrollments of an academic year over into the next one, see
+`src/rollover.py`. Prints what it would do, and only does it with `--apply`.
+
+    $ python -m scripts.rollover FROM_YEAR_ID TO_YEAR_ID [--apply]
+"""
+
+import argparse
+
+from src import rollover
+from src.database import Session as DBSession
+
+
+def print_report(report: rollover.Report) -> None:
+    print(f"{'enrollments':<32}{report.enrollments:>8}")
+    print(f"{'already enrolled':<32}{report.already_enrolled:>8}")
+    print(f"{'graduating':<32}{report.graduating:>8}")
+    print(f"{'to enroll':<32}{sum(report.to_enroll.values()):>8}")
+    for (program, semester), count in report.to_enroll.items():
+        print(f"  {program[:22]:<22} sem {semester:<3}{count:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("from_year_id", type=int)
+    parser.add_argument("to_year_id", type=int)
+    parser.add_argument(
+        "--apply", action="store_true", help="enroll the students, not only report"
+    )
+    args = parser.parse_args()
+
+    if not args.apply:
+        with DBSession() as session:
+            print_report(rollover.report(session, args.from_year_id, args.to_year_id))
+        print("\nDry run, pass --apply to enroll the students")
+        return
+
+    with DBSession.begin() as session:
+        report, enrolled = rollover.rollover(
+            session, args.from_year_id, args.to_year_id
+        )
+    print_report(report)
+    print(f"\nEnrolled {enrolled} students")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,113 @@
 """Contains wrapper functions for creating, running and register handlers
 for an application."""
 
+import asyncio
+import functools
 import os
-from datetime import time
-from typing import cast
+from datetime import time, timedelta
+from typing import Optional, cast
 from zoneinfo import ZoneInfo
 
 from telegram import Chat, Update
 from telegram.ext import (
     Application,
     ApplicationHandlerStop,
+    CallbackQueryHandler,
     ContextTypes,
     ExtBot,
+    InvalidCallbackData,
     MessageHandler,
     filters,
 )
 
-from src import commands, constants, conversations, jobs, queries
+from src import botrequest, cluster, constants, jobs, metrics, queries
+from src.callbackdata import Bot, invalid_callback_data
 from src.config import Config, ProductionConfig
 from src.customcontext import CustomContext
 from src.database import Session
-from src.errorhandler import error_handler
+from src.errorhandler import error_handler, report_errors
 from src.persistence import SQLPersistence
 from src.typehandler import typehandler
+from src.updateprocessor import ChatUpdateProcessor
+from src.utils import user_locale
 
 
 async def post_init(application: Application):
-    """Set bot bio, description in supported locales"""
+    """Set bot bio, description in supported locales, where they changed. Runs in
+    the background, so that updates are served meanwhile."""
     bot: ExtBot = application.bot
-    for language_code, translation in constants.Locales:
-        _ = translation.gettext
-        await bot.set_my_description(_("Bot description"), language_code)
-        await bot.set_my_short_description(_("Bot bio"), language_code)
-        if language_code == constants.EN:
-            await bot.set_my_description(_("Bot description"))
-            await bot.set_my_short_description(_("Bot bio"))
-
-
-def create() -> Application:
-    """Creates an instance of `telegram.ext.Application` and configures it."""
-    persistence = SQLPersistence()
+
+    async def update_profile(
+        language_code: Optional[str], description: str, short_description: str
+    ):
+        current, current_short = await asyncio.gather(
+            bot.get_my_description(language_code),
+            bot.get_my_short_description(language_code),
+        )
+        calls = []
+        if current.description != description:
+            calls.append(bot.set_my_description(description, language_code))
+        if current_short.short_description != short_description:
+            calls.append(bot.set_my_short_description(short_description, language_code))
+        await asyncio.gather(*calls)
+
+    async def update_profiles():
+        profiles = []
+        for language_code, translation in constants.Locales:
+            _ = translation.gettext
+            profiles.append((language_code, _("Bot description"), _("Bot bio")))
+            if language_code == constants.EN:
+                # the default, for users of other languages
+                profiles.append((None, _("Bot description"), _("Bot bio")))
+        await asyncio.gather(*(update_profile(*profile) for profile in profiles))
+
+    application.create_task(update_profiles())
+
+
+async def answer_busy(application: Application, update: Update):
+    """Answers a callback query shed under load, in the user's language"""
+    user_data = application.user_data.get(update.effective_user.id, {})
+    _ = user_locale(user_data.get("language_code")).gettext
+    await update.callback_query.answer(_("Busy, try again"))
+
+
+def create(worker: Optional[int] = None) -> Application:
+    """Creates an instance of `telegram.ext.Application` and configures it.
+    A :paramref:`worker` of a cluster gets its updates from the router, it has no
+    updater."""
+    persistence = SQLPersistence(worker)
+    processor = ChatUpdateProcessor(
+        Config.CONCURRENT_UPDATES, Config.CALLBACK_DEADLINE, Config.UPDATE_TTL
+    )
     context_types = ContextTypes(context=CustomContext)
-    return (
+    builder = (
         Application.builder()
-        .token(Config.BOT_TOKEN)
+        .bot(
+            Bot(
+                token=Config.BOT_TOKEN,
+                request=botrequest.create("bot.http", Config.BOT_POOL_SIZE),
+                bulk_request=botrequest.create(
+                    "bot.bulk_http", Config.BOT_BULK_POOL_SIZE
+                ),
+            )
+        )
         .post_init(post_init)
         .context_types(context_types)
         .persistence(persistence)
-        .build()
+        .concurrent_updates(processor)
     )
+    if worker is not None:
+        builder.updater(None)
+    application = builder.build()
+    processor.busy = functools.partial(answer_busy, application)
+    metrics.gauge("updates.queue", application.update_queue.qsize)
+    return application
 
 
 def register_handlers(application: Application):
+    # imported here, building the handler trees is a measured phase of the boot
+    from src import commands, conversations
+
     async def raise_app_handler_stop(_: Update, __: ContextTypes.DEFAULT_TYPE) -> None:
         raise ApplicationHandlerStop
 
@@ -61,26 +117,34 @@ def register_handlers(application: Application):
         )
         raise ApplicationHandlerStop
 
-    # Ignore updates from error error channel
+    own_channels = [
+        chat_id
+        for chat_id in (Config.ERROR_CHANNEL_CHAT_ID, Config.ARCHIVE_CHANNEL_CHAT_ID)
+        if chat_id is not None
+    ]
+
+    # Ignore updates from error and archive channels
     application.add_handler(
-        MessageHandler(
-            filters.Chat(chat_id=Config.ERROR_CHANNEL_CHAT_ID), raise_app_handler_stop
-        ),
+        MessageHandler(filters.Chat(chat_id=own_channels), raise_app_handler_stop),
         group=-2,
     )
 
-    # Leave all channels but error channel
+    # Leave all channels but error and archive channels
     application.add_handler(
         MessageHandler(
             filters.ChatType.CHANNEL
             & ~filters.StatusUpdate.LEFT_CHAT_MEMBER
-            & ~(filters.Chat(chat_id=Config.ERROR_CHANNEL_CHAT_ID)),
+            & ~(filters.Chat(chat_id=own_channels)),
             leave_chat,
         ),
         group=-2,
     )
 
     application.add_handler(typehandler, -1)
+    # Buttons whose long `callback_data` was evicted from the store
+    application.add_handler(
+        CallbackQueryHandler(invalid_callback_data, pattern=InvalidCallbackData)
+    )
     application.add_handlers(commands.handlers, 1)
     application.add_handlers(conversations.handlers, 2)
 
@@ -89,11 +153,36 @@ def register_handlers(application: Application):
     application.add_error_handler(error_handler)
 
 
-def schedule_jobs(application: Application):
+def schedule_jobs(application: Application, worker: Optional[int] = None):
     job_queue = application.job_queue
     zone = ZoneInfo("Africa/Khartoum")
 
-    # Assignment deadline reminders
+    if Config.METRICS_INTERVAL:
+        job_queue.run_repeating(
+            jobs.report_metrics,
+            Config.METRICS_INTERVAL,
+            first=Config.METRICS_INTERVAL,
+            name="REPORT_METRICS",
+        )
+
+    if Config.ERROR_CHANNEL_CHAT_ID is not None:
+        job_queue.run_repeating(
+            report_errors,
+            Config.ERROR_REPORT_INTERVAL,
+            first=Config.ERROR_REPORT_INTERVAL,
+            name="REPORT_ERRORS",
+        )
+
+    job_queue.run_repeating(
+        jobs.expire_conversations,
+        timedelta(days=1),
+        first=60,
+        name="EXPIRE_CONVERSATIONS",
+    )
+
+    # Assignment deadline reminders, sent by one worker of a cluster
+    if worker not in (None, 0):
+        return
     with Session.begin() as session:
         root = queries.user(session=session, telegram_id=Config.ROOTIDS[0])
         if root is None:
@@ -115,11 +204,13 @@ def schedule_jobs(application: Application):
             )
 
 
-def run(application: Application):
+def run(application: Application, worker: Optional[int] = None):
     """Runs the application.
     Will use `run_polling` in development environments, and `run_webhook`
-    in production"""
-    if os.getenv("ENV") == "production":
+    in production. A :paramref:`worker` of a cluster serves the router instead."""
+    if worker is not None:
+        cluster.work(application, worker)
+    elif os.getenv("ENV") == "production":
         application.run_webhook(
             listen="0.0.0.0",
             port=ProductionConfig.PORT,
@@ -0,0 +1,44 @@
+"""Measures the phases of the process start, from the first import to the bot
+serving updates.
+
+The start is expected to take at most :const:`BUDGET` seconds; a warning is
+logged when it takes longer. For a breakdown of the imports, run
+`python -X importtime main.py 2> imports.log`.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from src import metrics
+
+STARTED = time.perf_counter()
+"""When this module, the first one `main.py` imports, was imported"""
+
+BUDGET = 5.0
+"""Seconds within which the bot is expected to serve updates after the start"""
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Logs how long the code in the `with` block takes, as the boot phase
+    :paramref:`name`"""
+    start = time.perf_counter()
+    yield
+    duration = time.perf_counter() - start
+    metrics.summary(f"boot.{name}").observe(duration)
+    logger.info("Boot phase %s took %.3fs", name, duration)
+
+
+async def ready(_: object) -> None:
+    """Logs the time from :const:`STARTED` until now. Runs as a job, so once the
+    application has started and serves updates."""
+    duration = time.perf_counter() - STARTED
+    metrics.summary("boot.total").observe(duration)
+    if duration > BUDGET:
+        logger.warning("Ready in %.3fs, over the %.1fs budget", duration, BUDGET)
+    else:
+        logger.info("Ready in %.3fs", duration)
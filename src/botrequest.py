@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Optional
+
+from telegram.error import TimedOut
+from telegram.request import BaseRequest, HTTPXRequest, RequestData
+
+from src import metrics
+from src.config import Config
+
+
+class TimedRequest(HTTPXRequest):
+    """An :class:`telegram.request.HTTPXRequest` recording, under the metrics prefix
+    :paramref:`name`, how long requests wait for a connection of the pool and how
+    many of them time out.
+
+    The requests in flight are capped at :paramref:`connection_pool_size` by a
+    semaphore in front of `httpx`, so the wait is measured here rather than inside
+    `httpx`, where it is not exposed.
+    """
+
+    def __init__(self, name: str, connection_pool_size: int, **kwargs):
+        super().__init__(connection_pool_size=connection_pool_size, **kwargs)
+        self._pool_timeout: Optional[float] = kwargs.get("pool_timeout", 1.0)
+        self._pool_size = connection_pool_size
+        self._connections = asyncio.BoundedSemaphore(connection_pool_size)
+        self._in_use = 0
+        self._wait = metrics.summary(f"{name}.pool_wait")
+        self._timeouts = metrics.counter(f"{name}.pool_timeouts")
+        metrics.gauge(f"{name}.in_use", lambda: self._in_use)
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=BaseRequest.DEFAULT_NONE,
+        write_timeout=BaseRequest.DEFAULT_NONE,
+        connect_timeout=BaseRequest.DEFAULT_NONE,
+        pool_timeout=BaseRequest.DEFAULT_NONE,
+    ) -> tuple[int, bytes]:
+        if pool_timeout is BaseRequest.DEFAULT_NONE:
+            pool_timeout = self._pool_timeout
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._connections.acquire(), pool_timeout)
+        except TimeoutError as exc:
+            self._timeouts.inc()
+            raise TimedOut(
+                f"Pool timeout: all {self._pool_size} connections of the pool are in "
+                "use, the request was not sent."
+            ) from exc
+        finally:
+            self._wait.observe(time.perf_counter() - start)
+
+        self._in_use += 1
+        try:
+            return await super().do_request(
+                url,
+                method,
+                request_data=request_data,
+                read_timeout=read_timeout,
+                write_timeout=write_timeout,
+                connect_timeout=connect_timeout,
+                pool_timeout=pool_timeout,
+            )
+        finally:
+            self._in_use -= 1
+            self._connections.release()
+
+
+def create(name: str, pool_size: int) -> TimedRequest:
+    """A :class:`TimedRequest` with the timeouts and HTTP version of `Config`"""
+    return TimedRequest(
+        name,
+        connection_pool_size=pool_size,
+        pool_timeout=Config.BOT_POOL_TIMEOUT,
+        connect_timeout=Config.BOT_CONNECT_TIMEOUT,
+        read_timeout=Config.BOT_READ_TIMEOUT,
+        write_timeout=Config.BOT_WRITE_TIMEOUT,
+        http_version="2" if Config.BOT_HTTP2 else "1.1",
+    )
@@ -3,7 +3,7 @@ import random
 import re
 from collections.abc import Sequence
 from datetime import date, datetime, timedelta
-from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Union
+from typing import Callable, NamedTuple, Optional, Union
 from zoneinfo import ZoneInfo
 
 from babel.dates import format_date
@@ -35,9 +35,6 @@ from src.models import (
 from src.models.material import REVIEW_TYPES, get_review_type_name
 from src.utils import build_menu, user_locale
 
-if TYPE_CHECKING:
-    from src.customcontext import CustomContext
-
 
 calendar.setfirstweekday(6)
 
@@ -89,26 +86,25 @@ class Buttons:
         _ = self._gettext
         return InlineKeyboardButton(text="🗓️ " + _("Calendar"), callback_data=url)
 
-    async def user_list(
+    def user_list(
         self,
         users: Sequence[User],
         url: str,
-        context: "CustomContext",
         end: Optional[str] = None,
     ):
         """Builds a list of :class:`InlineKeyboardButton` for model :class:`User`
 
         Args:
-            user (Sequence[:obj:`User`]): A list of :obj:`User` objects
+            user (Sequence[:obj:`User`]): A list of :obj:`User` objects, with
+                `User.user_data` loaded.
             url (:obj:`str`): Callback data to be passed to
                 `InlineKeyboardButton.callback_data`.
         """
         _ = self._gettext
-        user_data = await context.application.persistence.get_user_data()
         return [
             InlineKeyboardButton(
                 (
-                    user_data.get(user.telegram_id, {}).get("full_name")
+                    (user.user_data and user.user_data.full_name)
                     or "[" + _("User") + "]"
                 ),
                 callback_data=f"{url}/{user.id}{end or ''}",
@@ -0,0 +1,261 @@
+"""Server side storage for `callback_data` that doesn't fit Telegram's limit, and
+the bot using it"""
+
+import functools
+import inspect
+import secrets
+from typing import Any, Optional
+
+from cachetools import LRUCache
+from telegram import (
+    CallbackQuery,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+    Update,
+)
+from telegram.constants import InlineKeyboardButtonLimit
+from telegram.error import BadRequest
+from telegram.ext import CallbackDataCache, ExtBot, InvalidCallbackData
+from telegram.request import BaseRequest
+
+from src import metrics
+from src.customcontext import CustomContext
+from src.viewcache import ViewCache, digest, key
+
+TOKEN_PREFIX = "#"
+"""Marks a `callback_data` as a token of the store. No url in this bot starts with
+it."""
+
+
+def _fits(data: Any) -> bool:
+    return (
+        isinstance(data, str)
+        and len(data.encode()) <= InlineKeyboardButtonLimit.MAX_CALLBACK_DATA
+    )
+
+
+def _tokenized(reply_markup: Any) -> bool:
+    """Whether :paramref:`reply_markup` has `callback_data` stored behind a token"""
+    if not isinstance(reply_markup, InlineKeyboardMarkup):
+        return False
+    return any(
+        button.callback_data is not None and not _fits(button.callback_data)
+        for row in reply_markup.inline_keyboard
+        for button in row
+    )
+
+
+class CallbackDataStore(CallbackDataCache):
+    """A :class:`telegram.ext.CallbackDataCache` that only keeps the `callback_data`
+    that can't be sent to Telegram as is.
+
+    Buttons whose data is a string of at most 64 bytes are left untouched. Any other
+    data is kept in an LRU store and replaced by a short opaque token, which is
+    turned back into the original data before the update reaches the handlers. This
+    way the path style urls and the patterns matching them keep working, while menus
+    are free to nest deeper than the limit would allow.
+
+    Tokens evicted from the store (or lost on restart) resolve to
+    :class:`telegram.ext.InvalidCallbackData`.
+    """
+
+    def __init__(self, bot: ExtBot, maxsize: int = 2048):
+        super().__init__(bot, maxsize=maxsize)
+        self._store: LRUCache[str, Any] = LRUCache(maxsize=maxsize)
+
+    def _tokenize(self, data: Any) -> str:
+        token = TOKEN_PREFIX + secrets.token_urlsafe(12)
+        self._store[token] = data
+        return token
+
+    def _resolve(self, data: Any) -> Any:
+        if isinstance(data, str) and data.startswith(TOKEN_PREFIX):
+            return self._store.get(data, InvalidCallbackData(data))
+        return data
+
+    def process_keyboard(
+        self, reply_markup: InlineKeyboardMarkup
+    ) -> InlineKeyboardMarkup:
+        keyboard = reply_markup.inline_keyboard
+        if all(
+            button.callback_data is None or _fits(button.callback_data)
+            for row in keyboard
+            for button in row
+        ):
+            return reply_markup
+
+        return InlineKeyboardMarkup(
+            [
+                [
+                    (
+                        button
+                        if button.callback_data is None or _fits(button.callback_data)
+                        else InlineKeyboardButton(
+                            button.text,
+                            callback_data=self._tokenize(button.callback_data),
+                        )
+                    )
+                    for button in row
+                ]
+                for row in keyboard
+            ]
+        )
+
+    def process_message(self, message: Message) -> None:
+        sender = message.via_bot or message.from_user
+        if sender is not None and sender != self.bot.bot:
+            return
+        if not isinstance(message.reply_markup, InlineKeyboardMarkup):
+            return
+
+        for row in message.reply_markup.inline_keyboard:
+            for button in row:
+                if button.callback_data is not None:
+                    button.update_callback_data(self._resolve(button.callback_data))
+
+    def process_callback_query(self, callback_query: CallbackQuery) -> None:
+        if callback_query.data:
+            with callback_query._unfrozen():
+                callback_query.data = self._resolve(callback_query.data)
+
+        if isinstance(callback_query.message, Message):
+            self.process_message(callback_query.message)
+
+
+_signature = functools.cache(inspect.signature)
+
+
+def _arguments(method, args: tuple, kwargs: dict) -> dict[str, Any]:
+    """The arguments of a call of the bot :paramref:`method`, by name"""
+    return _signature(method).bind(None, *args, **kwargs).arguments
+
+
+def _not_modified(exc: BadRequest) -> bool:
+    return "message is not modified" in exc.message.lower()
+
+
+class Bot(ExtBot):
+    """An :class:`telegram.ext.ExtBot` storing long `callback_data` in a
+    :class:`CallbackDataStore`.
+
+    Bulk sends go through :attr:`bulk`, with a connection pool of their own.
+
+    The messages it sends and edits are remembered in a :class:`ViewCache`, edits
+    that would leave a message as it is are skipped and return `True`, and so are
+    those Telegram rejects as "message is not modified". Edits with a keyboard
+    stored behind tokens are always sent: the tokens of the message shown may have
+    been evicted from the store, the edit replaces them with fresh ones.
+    """
+
+    def __init__(
+        self,
+        *args,
+        callback_data_maxsize: int = 2048,
+        bulk_request: Optional[BaseRequest] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, arbitrary_callback_data=callback_data_maxsize, **kwargs)
+        self._callback_data_cache: Optional[CallbackDataStore] = CallbackDataStore(
+            self, maxsize=callback_data_maxsize
+        )
+        self._views = ViewCache()
+        self._unchanged_edits = metrics.counter("edits.not_modified")
+
+        self.bulk: Bot = self
+        """The bot to send notifications, reminders and broadcasts with. With a
+        :paramref:`bulk_request`, a copy of this bot using it, which shares the
+        callback data and the views of this one."""
+        if bulk_request is not None:
+            self.bulk = Bot(self.token, request=bulk_request)
+            self.bulk._callback_data_cache = self._callback_data_cache
+            self.bulk._views = self._views
+
+    async def initialize(self) -> None:
+        await super().initialize()
+        if self.bulk is not self:
+            await self.bulk.initialize()
+
+    async def shutdown(self) -> None:
+        if self.bulk is not self:
+            await self.bulk.shutdown()
+        await super().shutdown()
+
+    @staticmethod
+    def _text(arguments: dict[str, Any]) -> bytes:
+        return digest(
+            arguments.get("text"),
+            arguments.get("parse_mode"),
+            arguments.get("entities"),
+            arguments.get("link_preview_options"),
+        )
+
+    async def send_message(self, *args, **kwargs):
+        message = await super().send_message(*args, **kwargs)
+        arguments = _arguments(ExtBot.send_message, args, kwargs)
+        self._views.remember(
+            key(message.chat_id, message.message_id),
+            self._text(arguments),
+            digest(arguments.get("reply_markup")),
+        )
+        return message
+
+    async def edit_message_text(self, *args, **kwargs):
+        arguments = _arguments(ExtBot.edit_message_text, args, kwargs)
+        message = key(arguments.get("chat_id"), arguments.get("message_id"))
+        text = self._text(arguments)
+        reply_markup = arguments.get("reply_markup")
+        markup = digest(reply_markup)
+        if not _tokenized(reply_markup) and self._views.shows(message, text, markup):
+            return True
+        try:
+            result = await super().edit_message_text(*args, **kwargs)
+        except BadRequest as exc:
+            if not _not_modified(exc):
+                self._views.forget(message)
+                raise
+            self._unchanged_edits.inc()
+            result = True
+        self._views.remember(message, text, markup)
+        return result
+
+    async def edit_message_reply_markup(self, *args, **kwargs):
+        arguments = _arguments(ExtBot.edit_message_reply_markup, args, kwargs)
+        message = key(arguments.get("chat_id"), arguments.get("message_id"))
+        reply_markup = arguments.get("reply_markup")
+        markup = digest(reply_markup)
+        if not _tokenized(reply_markup) and self._views.shows(message, None, markup):
+            return True
+        try:
+            result = await super().edit_message_reply_markup(*args, **kwargs)
+        except BadRequest as exc:
+            if not _not_modified(exc):
+                self._views.forget(message)
+                raise
+            self._unchanged_edits.inc()
+            result = True
+        self._views.update_markup(message, markup)
+        return result
+
+    # these change a message in ways the cache doesn't follow
+
+    async def edit_message_caption(self, *args, **kwargs):
+        arguments = _arguments(ExtBot.edit_message_caption, args, kwargs)
+        self._views.forget(key(arguments.get("chat_id"), arguments.get("message_id")))
+        return await super().edit_message_caption(*args, **kwargs)
+
+    async def edit_message_media(self, *args, **kwargs):
+        arguments = _arguments(ExtBot.edit_message_media, args, kwargs)
+        self._views.forget(key(arguments.get("chat_id"), arguments.get("message_id")))
+        return await super().edit_message_media(*args, **kwargs)
+
+    async def delete_message(self, *args, **kwargs):
+        arguments = _arguments(ExtBot.delete_message, args, kwargs)
+        self._views.forget(key(arguments.get("chat_id"), arguments.get("message_id")))
+        return await super().delete_message(*args, **kwargs)
+
+
+async def invalid_callback_data(update: Update, context: CustomContext):
+    """Runs on `callback_data` whose token is no longer in the store"""
+    _ = context.gettext
+    await update.callback_query.answer(_("Menu expired"), show_alert=True)
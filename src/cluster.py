@@ -0,0 +1,247 @@
+"""Runs the bot as a cluster: a router receiving the updates from Telegram, and
+`Config.CLUSTER_WORKERS` worker processes handling them.
+
+The router sends every update of a chat to the same worker, see :func:`shard`, and
+in the order they were received, so a user's conversations only ever live in one
+process. The workers share the database; :class:`src.persistence.SQLPersistence`
+tells the other workers when it writes a `user_data` or `chat_data`, so their
+copies are reloaded before they are used next.
+
+    $ python main.py               # router and workers on this machine
+    $ python main.py router        # the router only, see CLUSTER_WORKER_URLS
+    $ python main.py worker 2      # the worker with index 2 only
+
+Callback data stored by :class:`src.callbackdata.CallbackDataStore` is kept per
+process, buttons with long data sent to a chat of another worker expire.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+import httpx
+from telegram import Bot, Update
+from telegram.error import TelegramError
+from telegram.ext import Application
+from tornado.httpserver import HTTPServer
+from tornado.web import Application as WebApplication
+from tornado.web import RequestHandler
+
+from src import metrics
+from src.config import Config, ProductionConfig
+from src.updateprocessor import chat_key
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+logger = logging.getLogger(__name__)
+
+
+def shard(update: Update, workers: int) -> int:
+    """The index of the worker handling :paramref:`update`, by its
+    :func:`src.updateprocessor.chat_key`"""
+    if (key := chat_key(update)) is None:
+        key = update.update_id
+    return abs(key) % workers
+
+
+def worker_urls() -> list[str]:
+    return Config.CLUSTER_WORKER_URLS or [
+        f"http://{Config.CLUSTER_HOST}:{Config.CLUSTER_PORT + index}/"
+        for index in range(Config.CLUSTER_WORKERS)
+    ]
+
+
+class _UpdateHandler(RequestHandler):
+    """Receives updates as the JSON body of a `POST`"""
+
+    def initialize(
+        self, receive: Callable[[bytes], None], secret_token: Optional[str]
+    ) -> None:
+        self.receive = receive
+        self.secret_token = secret_token
+
+    def post(self) -> None:
+        if (
+            self.secret_token is not None
+            and self.request.headers.get(SECRET_HEADER) != self.secret_token
+        ):
+            self.send_error(403)
+            return
+        self.receive(self.request.body)
+
+
+def _serve(
+    receive: Callable[[bytes], None],
+    address: str,
+    port: int,
+    secret_token: Optional[str],
+) -> HTTPServer:
+    server = HTTPServer(
+        WebApplication(
+            [(r"/", _UpdateHandler, {"receive": receive, "secret_token": secret_token})]
+        )
+    )
+    server.listen(port, address)
+    return server
+
+
+async def _until_stopped() -> None:
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopped.set)
+    await stopped.wait()
+
+
+class Router:
+    """Queues the updates per worker, and posts each queue to its worker in order"""
+
+    def __init__(self, bot: Bot, urls: list[str]):
+        self.bot = bot
+        self.urls = urls
+        self.queues: list[asyncio.Queue[bytes]] = [asyncio.Queue() for _ in urls]
+        self.client = httpx.AsyncClient(timeout=30)
+        for index, queue in enumerate(self.queues):
+            metrics.gauge(f"cluster.queue.{index}", queue.qsize)
+
+    def route(self, body: bytes) -> None:
+        update = Update.de_json(json.loads(body), self.bot)
+        self.queues[shard(update, len(self.urls))].put_nowait(body)
+
+    async def forward(self, index: int) -> None:
+        """Posts the updates of the worker :paramref:`index`. An update is retried
+        until the worker accepts it, the updates after it wait, to keep the order."""
+        queue, url = self.queues[index], self.urls[index]
+        headers = {"Content-Type": "application/json"}
+        if Config.CLUSTER_SECRET_TOKEN:
+            headers[SECRET_HEADER] = Config.CLUSTER_SECRET_TOKEN
+        while True:
+            body = await queue.get()
+            delay = 1
+            while True:
+                try:
+                    response = await self.client.post(
+                        url, content=body, headers=headers
+                    )
+                    response.raise_for_status()
+                    break
+                except httpx.HTTPError as exc:
+                    logger.warning(
+                        "Worker %s failed (%s), retrying in %ss", index, exc, delay
+                    )
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30)
+
+    async def poll(self) -> None:
+        """Gets the updates with long polling, for development"""
+        await self.bot.delete_webhook()
+        offset = None
+        while True:
+            try:
+                updates = await self.bot.get_updates(
+                    offset, timeout=10, allowed_updates=Update.ALL_TYPES
+                )
+            except TelegramError as exc:
+                logger.warning("Getting updates failed: %s", exc)
+                await asyncio.sleep(1)
+                continue
+            for update in updates:
+                self.route(update.to_json().encode())
+                offset = update.update_id + 1
+
+
+async def _route() -> None:
+    bot = Bot(Config.BOT_TOKEN)
+    router = Router(bot, worker_urls())
+    async with bot, router.client:
+        tasks = [
+            asyncio.create_task(router.forward(index))
+            for index in range(len(router.urls))
+        ]
+        server = None
+        if os.getenv("ENV") == "production":
+            await bot.set_webhook(
+                ProductionConfig.WEBHOOK_URL,
+                secret_token=ProductionConfig.WEBHOOK_SERCRET_TOKEN,
+                allowed_updates=Update.ALL_TYPES,
+            )
+            server = _serve(
+                router.route,
+                "0.0.0.0",
+                ProductionConfig.PORT,
+                ProductionConfig.WEBHOOK_SERCRET_TOKEN,
+            )
+        else:
+            tasks.append(asyncio.create_task(router.poll()))
+        logger.info("Routing updates to %s workers", len(router.urls))
+
+        await _until_stopped()
+        if server is not None:
+            server.stop()
+        for task in tasks:
+            task.cancel()
+
+
+def route() -> None:
+    """Runs the router until it is stopped"""
+    asyncio.run(_route())
+
+
+async def _work(application: Application, index: int) -> None:
+    def receive(body: bytes) -> None:
+        update = Update.de_json(json.loads(body), application.bot)
+        application.update_queue.put_nowait(update)
+
+    async with application:
+        # the bot's profile is the same for all workers
+        if index == 0 and application.post_init:
+            await application.post_init(application)
+        await application.persistence.listen()
+        await application.start()
+        server = _serve(
+            receive,
+            Config.CLUSTER_HOST,
+            Config.CLUSTER_PORT + index,
+            Config.CLUSTER_SECRET_TOKEN,
+        )
+        logger.info("Worker %s is serving", index)
+
+        await _until_stopped()
+        server.stop()
+        await application.stop()
+
+
+def work(application: Application, index: int) -> None:
+    """Runs :paramref:`application` as the worker :paramref:`index` until it is
+    stopped"""
+    asyncio.run(_work(application, index))
+
+
+def run_local(workers: int) -> None:
+    """Runs the router and :paramref:`workers` workers as child processes, until
+    this process is stopped or one of them exits"""
+    main = sys.argv[0]
+    processes = [
+        subprocess.Popen([sys.executable, main, "worker", str(index)])
+        for index in range(workers)
+    ]
+    processes.append(subprocess.Popen([sys.executable, main, "router"]))
+    # raises `SystemExit`, so the children are stopped below
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while all(process.poll() is None for process in processes):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            process.wait()
@@ -5,10 +5,12 @@ from telegram.ext import CommandHandler
 
 from src import constants, messages, queries
 from src.customcontext import CustomContext
-from src.messages import bold
+from src.messages import Template, bold
 from src.models import Course, RoleName, Status
 from src.utils import build_menu, roles, session
 
+SETTINGS_TITLE = Template(lambda _: _("t-symbol") + " ⚙️ " + bold(_("Bot Settings")))
+
 # ------------------------------- Callbacks ---------------------------
 
 
@@ -141,9 +143,8 @@ async def settings(update: Update, context: CustomContext):
     ]
     keyboard = build_menu(menu, 2)
 
-    _ = context.gettext
     reply_markup = InlineKeyboardMarkup(keyboard)
-    message = _("t-symbol") + " ⚙️ " + bold(_("Bot Settings"))
+    message = SETTINGS_TITLE.render(context.language_code)
     if query:
         await query.edit_message_text(
             message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
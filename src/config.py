@@ -22,6 +22,61 @@ class Config:
     ERROR_CHANNEL_CHAT_ID = (
         int(id) if (id := os.getenv("ERROR_CHANNEL_CHAT_ID")) else None
     )
+    # seconds between two reports of the errors to the error channel
+    ERROR_REPORT_INTERVAL = int(os.getenv("ERROR_REPORT_INTERVAL", "60"))
+    # cap on the messages sent to the error channel
+    ERROR_REPORTS_PER_MINUTE = int(os.getenv("ERROR_REPORTS_PER_MINUTE", "5"))
+    # Optional channel where files are posted once, and then copied from
+    ARCHIVE_CHANNEL_CHAT_ID = (
+        int(id) if (id := os.getenv("ARCHIVE_CHANNEL_CHAT_ID")) else None
+    )
+    # Connection pool of the handlers and jobs
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # seconds to wait for a connection before giving up
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # seconds after which a connection is replaced, -1 to never replace
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    # test connections on checkout, so they survive postgres restarts
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+    # Connection pool of the persistence writes
+    DB_PERSISTENCE_POOL_SIZE = int(os.getenv("DB_PERSISTENCE_POOL_SIZE", "2"))
+    # Bot API connection pools: interactive replies, and bulk sends (notifications,
+    # reminders, broadcasts) which get their own so they can't starve the replies
+    BOT_POOL_SIZE = int(os.getenv("BOT_POOL_SIZE", "16"))
+    BOT_BULK_POOL_SIZE = int(os.getenv("BOT_BULK_POOL_SIZE", "4"))
+    # seconds, the pool timeout is the wait for a free connection
+    BOT_POOL_TIMEOUT = float(os.getenv("BOT_POOL_TIMEOUT", "5"))
+    BOT_CONNECT_TIMEOUT = float(os.getenv("BOT_CONNECT_TIMEOUT", "5"))
+    BOT_READ_TIMEOUT = float(os.getenv("BOT_READ_TIMEOUT", "5"))
+    BOT_WRITE_TIMEOUT = float(os.getenv("BOT_WRITE_TIMEOUT", "5"))
+    BOT_HTTP2 = os.getenv("BOT_HTTP2", "0") != "0"
+    # updates of different chats processed at the same time, each holds a connection
+    # of the pool while it runs
+    CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "8"))
+    # seconds a button tap may wait before it is answered with "busy, try again"
+    CALLBACK_DEADLINE = float(os.getenv("CALLBACK_DEADLINE", "5"))
+    # seconds after which a waiting background update (e.g. an edit) is dropped
+    UPDATE_TTL = float(os.getenv("UPDATE_TTL", "60"))
+    # days after which idle per message conversations are deleted
+    CONVERSATION_TTL_DAYS = int(os.getenv("CONVERSATION_TTL_DAYS", "30"))
+    # seconds between two metrics reports in the logs, 0 to disable them
+    METRICS_INTERVAL = int(os.getenv("METRICS_INTERVAL", "300"))
+
+    # worker processes, more than 1 runs the bot as a cluster, see `src/cluster.py`
+    CLUSTER_WORKERS = int(os.getenv("CLUSTER_WORKERS", "1"))
+    # address and first port the workers listen on, worker i listens on port + i
+    CLUSTER_HOST = os.getenv("CLUSTER_HOST", "127.0.0.1")
+    CLUSTER_PORT = int(os.getenv("CLUSTER_PORT", "8100"))
+    # urls of the CLUSTER_WORKERS workers, in index order, when they don't all run
+    # on the router's machine
+    CLUSTER_WORKER_URLS = (
+        [url.strip() for url in urls.split(",")]
+        if (urls := os.getenv("CLUSTER_WORKER_URLS"))
+        else None
+    )
+    # sent by the router to the workers, and checked by them
+    CLUSTER_SECRET_TOKEN = os.getenv("CLUSTER_SECRET_TOKEN")
 
     @classmethod
     def validate(cls):
@@ -32,6 +87,13 @@ class Config:
             raise ValueError(
                 f"Required environment variables are missing: {', '.join(missing_vars)}"
             )
+        # the router shards by the urls, the workers by CLUSTER_WORKERS
+        urls = cls.CLUSTER_WORKER_URLS
+        if urls is not None and len(urls) != cls.CLUSTER_WORKERS:
+            raise ValueError(
+                f"CLUSTER_WORKER_URLS lists {len(urls)} workers, but CLUSTER_WORKERS "
+                f"is {cls.CLUSTER_WORKERS}"
+            )
 
 
 class ProductionConfig(Config):
@@ -49,6 +111,13 @@ class ProductionConfig(Config):
             raise ValueError(
                 f"Required environment variables are missing: {', '.join(missing_vars)}"
             )
+        # the router shards by the urls, the workers by CLUSTER_WORKERS
+        urls = cls.CLUSTER_WORKER_URLS
+        if urls is not None and len(urls) != cls.CLUSTER_WORKERS:
+            raise ValueError(
+                f"CLUSTER_WORKER_URLS lists {len(urls)} workers, but CLUSTER_WORKERS "
+                f"is {cls.CLUSTER_WORKERS}"
+            )
 
 
 env_config = ProductionConfig if os.getenv("ENV") == "production" else Config
@@ -6,10 +6,7 @@ from typing import Callable, Optional
 from telegram import BotCommand
 
 ar_ = translation("base", localedir=Path("src", "locales"), languages=["ar"])
-ar_.install()
-
 en_ = translation("base", localedir=Path("src", "locales"), languages=["en"])
-en_.install()
 
 # Callback data
 PROGRAMS = "pr"
@@ -154,9 +154,7 @@ async def target(update: Update, context: CustomContext, session: Session):
     url = context.match.group()
     has_arabic = int(context.match.group("has_arabic"))
     has_english = int(context.match.group("has_english"))
-    program_id = (
-        int(program_id) if (program_id := context.match.group("program_id")) else None
-    )
+    program_id = context.ids["program_id"]
     _ = context.gettext
 
     if "&p_id=" not in url:
@@ -407,11 +405,11 @@ async def send_message(context: CustomContext) -> None:
             message_id = context.chat_data[DATA_KEY]["en_message_id"]
 
     with contextlib.suppress(Forbidden):
-        message = await context.bot.copy_message(
+        message = await context.bot.bulk.copy_message(
             user.chat_id, from_chat_id=job.chat_id, message_id=message_id
         )
         if option == "pin":
-            await context.bot.pin_chat_message(user.chat_id, message.message_id)
+            await context.bot.bulk.pin_chat_message(user.chat_id, message.message_id)
 
     if is_last:
         await context.bot.send_message(
@@ -6,7 +6,7 @@ from telegram.ext import CallbackQueryHandler, CommandHandler, ConversationHandl
 from src import constants, queries
 from src.conversations.updatematerial import updatematerials_
 from src.customcontext import CustomContext
-from src.messages import underline
+from src.messages import TREE_ROOT, underline
 from src.models import RoleName
 from src.utils import build_menu, roles, session
 
@@ -155,9 +155,9 @@ async def course_year_list(update: Update, context: CustomContext, session: Sess
         + "\n"
         + _("Semester {}").format(semester.number)
         + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + course.get_name(context.language_code)
+        + TREE_ROOT.render(
+            context.language_code, name=course.get_name(context.language_code)
+        )
     )
     await query.edit_message_text(
         message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
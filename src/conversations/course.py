@@ -3,7 +3,7 @@ from datetime import UTC, datetime
 from zoneinfo import ZoneInfo
 
 from babel.dates import format_datetime
-from sqlalchemy import and_, select, text
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
@@ -12,13 +12,8 @@ from telegram.ext import CallbackQueryHandler, ConversationHandler
 from src import commands, constants, messages, queries
 from src.conversations.material import files, material, sendall
 from src.customcontext import CustomContext
-from src.models import (
-    Assignment,
-    MaterialType,
-    ProgramSemesterCourse,
-    Semester,
-    UserOptionalCourse,
-)
+from src.models import MaterialType, UserOptionalCourse
+from src.pagination import CURSOR
 from src.utils import build_menu, session, time_remaining
 
 # ------------------------------- entry_points ---------------------------
@@ -67,14 +62,13 @@ async def course(update: Update, context: CustomContext, session: Session):
 
     keyboard += [[context.buttons.back(url, "/(\d+)$")]]
     reply_markup = InlineKeyboardMarkup(keyboard)
-    _ = context.gettext
 
     message = (
         messages.title(context.match, session, context=context)
         + "\n"
-        + _("t-symbol")
-        + "─ "
-        + course.get_name(context.language_code)
+        + messages.TREE_ROOT.render(
+            context.language_code, name=course.get_name(context.language_code)
+        )
     )
 
     await query.edit_message_text(
@@ -109,23 +103,12 @@ async def deadlines(update: Update, context: CustomContext, session: Session):
 
     zone = ZoneInfo("Africa/Khartoum")
     session.execute(text("SET TIME ZONE 'Africa/Khartoum'"))
-    assignments = session.scalars(
-        select(Assignment)
-        .join(
-            ProgramSemesterCourse,
-            and_(
-                ProgramSemesterCourse.course_id == Assignment.course_id,
-                ProgramSemesterCourse.program_id == enrollment.program.id,
-            ),
-        )
-        .join(Semester)
-        .filter(
-            Assignment.published,
-            Assignment.deadline >= datetime.now(zone),
-            Semester.number.in_(semester_numbers),
-        )
-        .order_by(Assignment.deadline.asc())
-    ).all()
+    assignments = queries.assignments(
+        session,
+        program_id=enrollment.program.id,
+        semester_numbers=semester_numbers,
+        start=datetime.now(zone),
+    )
     collapsed = bool(int(c)) if (c := context.match.group("collapsed")) else None
     collapsed = True if collapsed is None and len(assignments) > 2 else collapsed
 
@@ -218,25 +201,13 @@ async def assignments(update: Update, context: CustomContext, session: Session):
     _ = context.gettext
 
     session.execute(text("SET TIME ZONE 'Africa/Khartoum'"))
-    assignments = session.scalars(
-        select(Assignment)
-        .join(
-            ProgramSemesterCourse,
-            and_(
-                ProgramSemesterCourse.course_id == Assignment.course_id,
-                ProgramSemesterCourse.program_id == enrollment.program.id,
-            ),
-        )
-        .join(Semester)
-        .filter(
-            Semester.number.in_(semester_numbers),
-            Assignment.published,
-            Assignment.deadline >= datetime(year=year, month=month, day=day, hour=0),
-            Assignment.deadline
-            <= datetime(year=year, month=month, day=day, hour=23, minute=59, second=59),
-        )
-        .order_by(Assignment.deadline.asc())
-    ).all()
+    assignments = queries.assignments(
+        session,
+        program_id=enrollment.program.id,
+        semester_numbers=semester_numbers,
+        start=datetime(year=year, month=month, day=day, hour=0),
+        end=datetime(year=year, month=month, day=day, hour=23, minute=59, second=59),
+    )
 
     if len(assignments) == 0:
         await query.answer(_("Nothing for this day!"))
@@ -401,7 +372,8 @@ states = {
             material.material,
             pattern=rf"{constants.COURSES_}"
             rf"/{constants.ENROLLMENTS}/(?P<enrollment_id>\d+).*/{constants.DEADLINE}.+"
-            f"/(?P<material_type>{MaterialType.ASSIGNMENT})/(?P<material_id>\d+)$",
+            f"/(?P<material_type>{MaterialType.ASSIGNMENT})/(?P<material_id>\d+)"
+            f"(?:\?p=(?P<page>{CURSOR}))?$",
         ),
         CallbackQueryHandler(
             files.file,
@@ -1,5 +1,6 @@
 import re
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from telegram import CallbackQuery, InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
@@ -13,9 +14,10 @@ from telegram.ext import (
 
 from src import constants, queries
 from src.customcontext import CustomContext
-from src.messages import bold, underline
+from src.messages import Template, bold, underline
 from src.models import Course, RoleName
-from src.utils import Pager, build_menu, roles, session
+from src.pagination import CURSOR, paginate
+from src.utils import build_menu, roles, session
 
 URLPREFIX = constants.COURSE_MANAGEMENT_
 """Used as a prefix for all `callback_data` s in this conversation module"""
@@ -23,6 +25,21 @@ URLPREFIX = constants.COURSE_MANAGEMENT_
 DATA_KEY = constants.COURSE_MANAGEMENT_
 """Used as a key for read/wirte operations on `chat_data`, `user_data`, `bot_data`"""
 
+DEPARTMENT_TITLE = Template(
+    lambda _: underline(_("Course Management"))
+    + "\n\n"
+    + _("t-symbol")
+    + "─ {department}"
+)
+COURSE_TITLE = Template(
+    lambda _: underline(_("Course Management"))
+    + "\n\n"
+    + _("t-symbol")
+    + "─ {department}\n│ "
+    + _("corner-symbol")
+    + "── {course}"
+)
+
 
 # ------------------------------- entry_points ---------------------------
 
@@ -67,7 +84,7 @@ async def department_list(update: Update, context: CustomContext, session: Sessi
 @session
 async def course_list(update: Update, context: CustomContext, session: Session):
     """Runs on callback_data
-    `"^{URLPREFIX}/{constants.DEPARTMENTS}/(?P<department_id>\d+)(?:/{constants.COURSES})?(?:\?p=(\d+))?$`
+    `"^{URLPREFIX}/{constants.DEPARTMENTS}/(?P<department_id>\d+)(?:/{constants.COURSES})?(?:\?p=(?P<page>{CURSOR}))?$`
     """
 
     query = update.callback_query
@@ -75,30 +92,25 @@ async def course_list(update: Update, context: CustomContext, session: Session):
 
     department_id = int(context.match.group("department_id"))
     department = queries.department(session, department_id) if department_id else None
-    courses = queries.department_courses(
-        session, department_id if department_id else None
+    page = paginate(
+        session,
+        select(Course).where(
+            Course.department_id == (department_id if department_id else None)
+        ),
+        order_by=[Course.en_name, Course.id],
+        size=12,
+        cursor=context.match.group("page"),
     )
 
-    offset = int(page) if (page := context.match.group("page")) else 0
-    pager = Pager[Course](courses, offset, 12)
-
     # url here is calculated because this handler reenter with query params
     url = re.search(rf".*/{constants.DEPARTMENTS}/\d+", context.match.group()).group()
-    menu = context.buttons.courses_list(pager.items, url + f"/{constants.COURSES}")
+    menu = context.buttons.courses_list(page.items, url + f"/{constants.COURSES}")
 
     keyboard = build_menu(menu, 2)
-
-    if pager.has_next or pager.has_previous:
-        pager_keyboard = []
+    if pager_keyboard := page.navigation(
+        context.buttons, url, reverse=context.language_code == constants.AR
+    ):
         keyboard.append(pager_keyboard)
-        if pager.has_previous:
-            pager_keyboard.append(
-                context.buttons.previous_page(f"{url}?p={pager.previous_offset}")
-            )
-        if pager.has_next:
-            pager_keyboard.append(
-                context.buttons.next_page(f"{url}?p={pager.next_offset}")
-            )
 
     keyboard.extend(
         [
@@ -109,16 +121,13 @@ async def course_list(update: Update, context: CustomContext, session: Session):
     reply_markup = InlineKeyboardMarkup(keyboard)
     _ = context.gettext
 
-    message = (
-        underline(_("Course Management"))
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + (
+    message = DEPARTMENT_TITLE.render(
+        context.language_code,
+        department=(
             department.get_name(context.language_code)
             if department
             else _("General Department")
-        )
+        ),
     )
     await query.edit_message_text(
         message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
@@ -162,19 +171,15 @@ async def course(update: Update, context: CustomContext, session: Session):
     reply_markup = InlineKeyboardMarkup(keyboard)
     _ = context.gettext
     message = (
-        underline(_("Course Management"))
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + (
-            department.get_name(context.language_code)
-            if department
-            else _("General Department")
+        COURSE_TITLE.render(
+            context.language_code,
+            department=(
+                department.get_name(context.language_code)
+                if department
+                else _("General Department")
+            ),
+            course=course.get_name(context.language_code),
         )
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + course.get_name(context.language_code)
         + "\n\n"
         + _("Name in Arabic {} and English {}").format(course.ar_name, course.en_name)
         + "\n"
@@ -387,19 +392,15 @@ async def course_change_department(
     _ = context.gettext
 
     message = (
-        underline(_("Course Management"))
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + (
-            department.get_name(context.language_code)
-            if department
-            else _("General Department")
+        COURSE_TITLE.render(
+            context.language_code,
+            department=(
+                department.get_name(context.language_code)
+                if department
+                else _("General Department")
+            ),
+            course=course.get_name(context.language_code),
         )
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + course.get_name(context.language_code)
         + "\n\n"
         + _("Select {}").format(_("Department"))
     )
@@ -467,19 +468,15 @@ async def course_delete(update: Update, context: CustomContext, session: Session
     menu_buttons: list
     _ = context.gettext
     message = (
-        underline(_("Course Management"))
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + (
-            department.get_name(context.language_code)
-            if department
-            else _("General Department")
+        COURSE_TITLE.render(
+            context.language_code,
+            department=(
+                department.get_name(context.language_code)
+                if department
+                else _("General Department")
+            ),
+            course=course_name,
         )
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + course_name
         + "\n\n"
     )
 
@@ -524,7 +521,7 @@ states = {
         CallbackQueryHandler(
             course_list,
             pattern=f"^{URLPREFIX}/{constants.DEPARTMENTS}/(?P<department_id>\d+)"
-            f"(?:/{constants.COURSES})?(?:\?p=(?P<page>\d+))?$",
+            f"(?:/{constants.COURSES})?(?:\?p=(?P<page>{CURSOR}))?$",
         ),
         CallbackQueryHandler(
             course,
@@ -1,12 +1,14 @@
 import re
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
-from telegram import Document, InlineKeyboardMarkup, Update, Video
+from telegram import InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
 
 from src import constants, messages, queries
+from src.conversations.material import mediagroup, sendall
 from src.customcontext import CustomContext
+from src.database import Session as DBSession
 from src.models import (
     Enrollment,
     File,
@@ -33,7 +35,7 @@ async def handler(update: Update, context: CustomContext, session: Session, back
         enrollment = session.get(Enrollment, enrollment_id)
         academic_year_id = enrollment.academic_year_id
     elif year_id := context.match.group("year_id"):
-        academic_year_id = year_id
+        academic_year_id = int(year_id)
     course_id = int(context.match.group("course_id"))
     course = queries.course(session, course_id)
 
@@ -105,9 +107,9 @@ async def handler(update: Update, context: CustomContext, session: Session, back
         message = (
             messages.title(context.match, session, context=context)
             + "\n"
-            + _("t-symbol")
-            + "─ "
-            + course.get_name(context.language_code)
+            + messages.TREE_ROOT.render(
+                context.language_code, name=course.get_name(context.language_code)
+            )
             + "\n"
             + messages.material_type_text(context.match, context=context)
             + "\n"
@@ -145,14 +147,8 @@ async def receive_material_file(
     if media_type is None:
         return None
 
-    attachement = message.effective_attachment
-
-    file_name = (
-        attachement.file_name if isinstance(attachement, (Document, Video)) else None
-    )
-    file_id = (
-        attachement.file_id if isinstance(attachement, (Document, Video)) else None
-    )
+    values = mediagroup.file_values(message, media_type)
+    file_name = values["name"]
 
     _ = context.gettext
     course_id = int(match.group("course_id"))
@@ -160,13 +156,37 @@ async def receive_material_file(
         enrollment = session.get(Enrollment, enrollment_id)
         academic_year_id = enrollment.academic_year_id
     elif year_id := match.group("year_id"):
-        academic_year_id = year_id
+        academic_year_id = int(year_id)
+
+    if issubclass(MaterialClass, SingleFile) and message.media_group_id:
+        mediagroup.collect(
+            context,
+            message,
+            values,
+            receive_material_media_group,
+            data={
+                "url": url,
+                "material_type": material_type,
+                "course_id": course_id,
+                "academic_year_id": academic_year_id,
+                "uploader_user_id": context.user_data["id"],
+            },
+        )
+        return f"{constants.ADD} {constants.MATERIALS}"
+
+    if issubclass(MaterialClass, SingleFile) and queries.uploaded_files(
+        session,
+        [values["file_unique_id"]],
+        MaterialClass=MaterialClass,
+        course_id=course_id,
+        academic_year_id=academic_year_id,
+    ):
+        await message.reply_text(_("{} already added").format(file_name))
+        return f"{constants.ADD} {constants.MATERIALS}"
 
     if issubclass(MaterialClass, SingleFile):
         file = File(
-            telegram_id=file_id,
-            name=file_name,
-            type=media_type,
+            **values,
             source=None,
             uploader=session.get(User, context.user_data["id"]),
         )
@@ -179,6 +199,7 @@ async def receive_material_file(
         )
         session.add(material)
         session.flush()
+        sendall.invalidate(material)
 
         file_url = re.sub(
             f"/{constants.ADD}",
@@ -209,3 +230,56 @@ async def receive_material_file(
 
         return f"{constants.ADD} {constants.MATERIALS}"
     return None
+
+
+async def receive_material_media_group(context: CustomContext):
+    """Saves the files of a media group collected by :func:`receive_material_file`,
+    each as a new material"""
+    job = context.job
+    url: str = job.data["url"]
+    material_type: str = job.data["material_type"]
+    MaterialClass = get_material_class(material_type)
+
+    with DBSession.begin() as session:
+        uploaded = queries.uploaded_files(
+            session,
+            [item["file_unique_id"] for item in job.data["items"]],
+            MaterialClass=MaterialClass,
+            course_id=job.data["course_id"],
+            academic_year_id=job.data["academic_year_id"],
+        )
+        items, duplicates = mediagroup.partition(
+            job.data["items"], {file.file_unique_id for file in uploaded}
+        )
+        if items:
+            file_ids = session.scalars(
+                insert(File).returning(File.id, sort_by_parameter_order=True),
+                [
+                    {**item, "uploader_user_id": job.data["uploader_user_id"]}
+                    for item in items
+                ],
+            ).all()
+            materials = session.scalars(
+                insert(MaterialClass).returning(MaterialClass),
+                [
+                    {
+                        "type": MaterialClass.__mapper__.polymorphic_identity,
+                        "academic_year_id": job.data["academic_year_id"],
+                        "course_id": job.data["course_id"],
+                        "published": False,
+                        "file_id": file_id,
+                    }
+                    for file_id in file_ids
+                ],
+            ).all()
+            sendall.invalidate(materials[0])
+
+    _ = context.gettext
+    keyboard = [
+        [context.buttons.back(url, rf"/{constants.ADD}", text=_(f"{material_type}s"))],
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    message = mediagroup.summary(items, duplicates, _)
+    await context.bot.send_message(
+        job.chat_id, message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
+    )
@@ -60,15 +60,15 @@ async def edit(update: Update, context: CustomContext, session: Session):
     message = (
         messages.title(context.match, session, context=context)
         + "\n"
-        + _("t-symbol")
-        + "─ "
-        + course.get_name(context.language_code)
+        + messages.TREE_ROOT.render(
+            context.language_code, name=course.get_name(context.language_code)
+        )
         + "\n"
         + messages.material_type_text(context.match, context=context)
-        + "│   "
-        + _("corner-symbol")
-        + "── "
-        + messages.material_message_text(url, context, material)
+        + messages.TREE_LEAF.render(
+            context.language_code,
+            name=messages.material_message_text(url, context, material),
+        )
         + "\n\n"
         + _("Select {}").format(_("Date"))
         + " "
@@ -5,6 +5,7 @@ from telegram import InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
 
 from src import constants, messages
+from src.conversations.material import sendall
 from src.customcontext import CustomContext
 from src.models import HasNumber, Material, SingleFile
 from src.models.material import __classes__
@@ -46,16 +47,16 @@ async def handler(update: Update, context: CustomContext, session: Session):
     message = (
         messages.title(context.match, session, context=context)
         + "\n"
-        + _("t-symbol")
-        + "─ "
-        + course.get_name(context.language_code)
+        + messages.TREE_ROOT.render(
+            context.language_code, name=course.get_name(context.language_code)
+        )
         + "\n"
         + messages.material_type_text(context.match, context=context)
         + ("\n" if isinstance(material, SingleFile) else "")
-        + "│   "
-        + _("corner-symbol")
-        + "── "
-        + messages.material_message_text(url, context, material)
+        + messages.TREE_LEAF.render(
+            context.language_code,
+            name=messages.material_message_text(url, context, material),
+        )
         + "\n\n"
     )
     if has_confirmed is None:
@@ -65,6 +66,7 @@ async def handler(update: Update, context: CustomContext, session: Session):
         menu_buttons = context.buttons.confirm_delete_group(url=url)
         message += _("Confirm delete warning {}").format(material_title)
     elif has_confirmed == "1":
+        sendall.invalidate(material)
         session.delete(material)
         menu_buttons = [
             context.buttons.back(
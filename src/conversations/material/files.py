@@ -1,16 +1,23 @@
 import re
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from telegram import Document, InlineKeyboardMarkup, Update, Video, Voice
+from telegram import InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
 
-from src import constants, messages
+from src import constants, messages, queries
+from src.config import Config
+from src.conversations.material import mediagroup, sendall
 from src.customcontext import CustomContext
+from src.database import Session as DBSession
 from src.messages import italic
 from src.models import File, Material, User
 from src.models.material import get_material_class
 from src.utils import build_menu, session, user_mode
 
+PAGE_SIZE = 10
+"""number of files listed per page in a material's menu"""
+
 
 @session
 async def file(update: Update, context: CustomContext, session: Session):
@@ -43,19 +50,18 @@ async def file(update: Update, context: CustomContext, session: Session):
         reverse=context.language_code == constants.AR,
     )
     reply_markup = InlineKeyboardMarkup(keyboard)
-    _ = context.gettext
     message = (
         messages.title(context.match, session, context=context)
         + "\n"
-        + _("t-symbol")
-        + "─ "
-        + material.course.get_name(context.language_code)
+        + messages.TREE_ROOT.render(
+            context.language_code, name=material.course.get_name(context.language_code)
+        )
         + "\n"
         + messages.material_type_text(context.match, context=context)
-        + "│   "
-        + _("corner-symbol")
-        + "── "
-        + messages.material_message_text(url, context, material)
+        + messages.TREE_LEAF.render(
+            context.language_code,
+            name=messages.material_message_text(url, context, material),
+        )
         + "\n\n"
         + messages.file_text(file, context=context)
     )
@@ -84,6 +90,8 @@ async def delete(
     file_id = int(context.match.group("file_id"))
     file = session.get(File, file_id)
     file_name = file.name
+    if file.material_id is not None:
+        sendall.invalidate(session.get(Material, file.material_id))
     session.delete(file)
     session.flush()
     _ = context.gettext
@@ -134,6 +142,17 @@ async def display(
 
     caption = italic(file.name)
 
+    if file.archive_message_id and Config.ARCHIVE_CHANNEL_CHAT_ID:
+        await context.bot.copy_message(
+            update.effective_chat.id,
+            Config.ARCHIVE_CHANNEL_CHAT_ID,
+            file.archive_message_id,
+            reply_markup=reply_markup,
+            caption=caption if file.type != "voice" else None,
+            parse_mode=ParseMode.HTML,
+        )
+        return constants.ONE
+
     await sender(
         file.telegram_id,
         reply_markup=reply_markup,
@@ -182,41 +201,40 @@ async def receive_file(update: Update, context: CustomContext, session: Session)
     if media_type is None:
         return None
 
-    attachement = message.effective_attachment
+    values = mediagroup.file_values(message, media_type)
+    material_id = int(match.group("material_id"))
+    _ = context.gettext
 
-    file_name = (
-        attachement.file_name
-        if isinstance(attachement, (Document, Video))
-        else (
-            "voice message"
-            if isinstance(attachement, Voice)
-            else attachement[-1].file_unique_id
+    if message.media_group_id:
+        mediagroup.collect(
+            context,
+            message,
+            values,
+            receive_media_group,
+            data={
+                "url": url,
+                "material_id": material_id,
+                "uploader_user_id": context.user_data["id"],
+            },
         )
-    )
-    telegram_id = (
-        attachement.file_id
-        if isinstance(attachement, (Document, Video, Voice))
-        else attachement[-1].file_id
-    )
+        return constants.ADD
 
-    material_id = int(match.group("material_id"))
+    file_name = values["name"]
+    if queries.uploaded_files(
+        session, [values["file_unique_id"]], material_id=material_id
+    ):
+        await message.reply_text(_("{} already added").format(file_name))
+        return constants.ADD
 
-    file_type = (
-        "document"
-        if message.document
-        else "video" if message.video else "voice" if message.voice else "photo"
-    )
     file = File(
-        telegram_id=telegram_id,
-        type=file_type,
-        name=file_name,
+        **values,
         material_id=material_id,
         uploader=session.get(User, context.user_data["id"]),
     )
     session.add(file)
     session.flush()
+    sendall.invalidate(session.get(Material, material_id))
 
-    _ = context.gettext
     keyboard = build_menu(
         [
             context.buttons.edit(
@@ -239,6 +257,46 @@ async def receive_file(update: Update, context: CustomContext, session: Session)
     return constants.ADD
 
 
+async def receive_media_group(context: CustomContext):
+    """Saves the files of a media group collected by :func:`receive_file`"""
+    job = context.job
+    url: str = job.data["url"]
+    material_id: int = job.data["material_id"]
+
+    with DBSession.begin() as session:
+        uploaded = queries.uploaded_files(
+            session,
+            [item["file_unique_id"] for item in job.data["items"]],
+            material_id=material_id,
+        )
+        items, duplicates = mediagroup.partition(
+            job.data["items"], {file.file_unique_id for file in uploaded}
+        )
+        if items:
+            session.execute(
+                insert(File),
+                [
+                    {
+                        **item,
+                        "material_id": material_id,
+                        "uploader_user_id": job.data["uploader_user_id"],
+                    }
+                    for item in items
+                ],
+            )
+            sendall.invalidate(session.get(Material, material_id))
+
+    _ = context.gettext
+    keyboard = [
+        [context.buttons.back(url, rf"/{constants.FILES}/{constants.ADD}")],
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    message = mediagroup.summary(items, duplicates, _)
+    await context.bot.send_message(
+        job.chat_id, message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
+    )
+
+
 async def source_edit(update: Update, context: CustomContext):
     """
     Runs on callback_data
@@ -69,6 +69,7 @@ from src.models import (
     SingleFile,
 )
 from src.models.material import get_material_class
+from src.pagination import CURSOR, paginate
 from src.utils import build_menu, session, user_mode
 
 
@@ -88,16 +89,15 @@ async def material_list(update: Update, context: CustomContext, session: Session
     url = re.search(rf".*/({ALLTYPES})", context.match.group()).group()
 
     material_type = context.match.group("material_type")
-    course_id = int(context.match.group("course_id"))
+    course_id = context.ids["course_id"]
     course = queries.course(session, course_id)
 
     academic_year_id: int
-    if enrollment_id := context.match.group("enrollment_id"):
+    if enrollment_id := context.ids["enrollment_id"]:
         enrollment = session.get(Enrollment, enrollment_id)
         academic_year_id = enrollment.academic_year_id
     else:
-        year_id = context.match.group("year_id")
-        academic_year_id = year_id
+        academic_year_id = context.ids["year_id"]
 
     MaterialClass = get_material_class(material_type)
     filters = [
@@ -166,9 +166,9 @@ async def material_list(update: Update, context: CustomContext, session: Session
     message = (
         messages.title(context.match, session, context=context)
         + "\n"
-        + _("t-symbol")
-        + "─ "
-        + course.get_name(context.language_code)
+        + messages.TREE_ROOT.render(
+            context.language_code, name=course.get_name(context.language_code)
+        )
         + "\n"
         + messages.material_type_text(context.match, context=context)
     )
@@ -192,7 +192,7 @@ async def material(
 ):
     """
     {url_prefix}
-    /(?P<material_type>{TYPES})/(?P<material_id>\d+)$
+    /(?P<material_type>{TYPES})/(?P<material_id>\d+)(?:\?p=(?P<page>{CURSOR}))?$
     """
 
     query = update.callback_query
@@ -211,7 +211,7 @@ async def material(
     elif material_id:
         url = re.sub(rf"/{constants.ADD}.*$", f"/{material_id}", context.match.group())
 
-    material_id = material_id or context.match.group("material_id")
+    material_id = material_id or context.ids["material_id"]
     material = session.get(Material, material_id)
 
     # here we reply directly with the files.
@@ -226,14 +226,23 @@ async def material(
 
     keyboard: list[list] = []
     # First, list the files if material have them
+    files_count = 0
     if isinstance(material, RefFilesMixin):
-        menu_files = session.scalars(
-            select(File).where(File.material_id == material.id)
+        page = paginate(
+            session,
+            select(File).where(File.material_id == material.id),
             # hack to have the order as document, photo, video, voice then by file name
-            .order_by(File.type.asc(), File.name)
-        ).all()
-        files_menu = context.buttons.files_list(f"{url}/{constants.FILES}", menu_files)
+            order_by=[File.type, File.name, File.id],
+            size=files.PAGE_SIZE,
+            cursor=context.match.groupdict().get("page"),
+        )
+        files_count = page.count
+        files_menu = context.buttons.files_list(f"{url}/{constants.FILES}", page.items)
         keyboard += build_menu(files_menu, 1)
+        if pager_keyboard := page.navigation(
+            context.buttons, url, reverse=context.language_code == constants.AR
+        ):
+            keyboard.append(pager_keyboard)
         if not user_mode(url):
             keyboard += [[context.buttons.add_file(url=f"{url}/{constants.FILES}")]]
     # handle control buttons for number
@@ -274,11 +283,7 @@ async def material(
         ]
 
     # Send all button when on user mode:
-    if (
-        user_mode(url)
-        and isinstance(material, RefFilesMixin)
-        and len(material.files) > 1
-    ):
+    if user_mode(url) and files_count > 1:
         keyboard += [[context.buttons.send_all(url)]]
 
     # when on lectures and on user mode, hop two steps back
@@ -291,21 +296,24 @@ async def material(
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     is_publish_menu = not user_mode(url)
-    spaces = " " if not is_publish_menu and isinstance(material, Lecture) else "   "
+    branch = (
+        messages.TREE_BRANCH
+        if not is_publish_menu and isinstance(material, Lecture)
+        else messages.TREE_LEAF
+    )
     message = (
         messages.title(context.match, session, context=context)
         + "\n"
-        + _("t-symbol")
-        + "─ "
-        + material.course.get_name(context.language_code)
+        + messages.TREE_ROOT.render(
+            context.language_code, name=material.course.get_name(context.language_code)
+        )
         + "\n"
         + messages.material_type_text(context.match, context=context)
         + ("\n" if isinstance(material, SingleFile) else "")
-        + "│"
-        + spaces
-        + _("corner-symbol")
-        + "── "
-        + messages.material_message_text(url, context, material)
+        + branch.render(
+            context.language_code,
+            name=messages.material_message_text(url, context, material),
+        )
     )
 
     await query.edit_message_text(
@@ -331,7 +339,8 @@ def conversation(url_prefix: str):
         CallbackQueryHandler(
             material,
             pattern=f"{url_prefix}"
-            f"/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)$",
+            f"/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)"
+            f"(?:\?p=(?P<page>{CURSOR}))?$",
         ),
     ]
 
@@ -340,7 +349,8 @@ def conversation(url_prefix: str):
             CallbackQueryHandler(
                 material,
                 pattern=f"{url_prefix}"
-                f"/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)$",
+                f"/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)"
+                f"(?:\?p=(?P<page>{CURSOR}))?$",
             ),
             CallbackQueryHandler(
                 files.file,
@@ -0,0 +1,100 @@
+"""Collects the messages of a media group (an album) so that their files can be
+saved in one go, instead of one transaction and one reply per message."""
+
+from typing import Callable
+
+from telegram import Document, Message, Video, Voice
+
+from src.customcontext import CustomContext
+from src.messages import italic
+
+WINDOW = 2
+"""Seconds to wait, after the first message of a media group arrives, for the
+rest of the group before processing it."""
+
+
+def file_values(message: Message, media_type: str) -> dict:
+    """Extracts the `File` column values of the attachment of :paramref:`message`"""
+    attachement = message.effective_attachment
+    return {
+        "telegram_id": (
+            attachement.file_id
+            if isinstance(attachement, (Document, Video, Voice))
+            else attachement[-1].file_id
+        ),
+        "name": (
+            attachement.file_name
+            if isinstance(attachement, (Document, Video))
+            else (
+                "voice message"
+                if isinstance(attachement, Voice)
+                else attachement[-1].file_unique_id
+            )
+        ),
+        "type": media_type,
+        "file_unique_id": (
+            attachement.file_unique_id
+            if isinstance(attachement, (Document, Video, Voice))
+            else attachement[-1].file_unique_id
+        ),
+        "size": (
+            attachement.file_size
+            if isinstance(attachement, (Document, Video, Voice))
+            else attachement[-1].file_size
+        ),
+        "mime_type": getattr(attachement, "mime_type", None),
+    }
+
+
+def collect(
+    context: CustomContext,
+    message: Message,
+    item: dict,
+    callback: Callable,
+    data: dict,
+) -> None:
+    """Adds :paramref:`item` to the batch of :paramref:`message`'s media group.
+
+    The first message of a group schedules :paramref:`callback` to run after
+    :const:`WINDOW` seconds, with `job.data` being :paramref:`data` plus an
+    `"items"` list holding the items of all the messages of the group.
+    """
+    name = f"MEDIA_GROUP_{message.media_group_id}"
+    if jobs := context.job_queue.get_jobs_by_name(name):
+        jobs[0].data["items"].append(item)
+        return
+
+    context.job_queue.run_once(
+        callback,
+        when=WINDOW,
+        name=name,
+        data={**data, "items": [item]},
+        chat_id=message.chat_id,
+        user_id=message.from_user.id,
+    )
+
+
+def partition(items: list[dict], uploaded: set[str]) -> tuple[list[dict], list[dict]]:
+    """Splits :paramref:`items` into the new ones and the duplicates, being those
+    whose `file_unique_id` is in :paramref:`uploaded` or repeated in the batch."""
+    seen = set(uploaded)
+    new, duplicates = [], []
+    for item in items:
+        if item["file_unique_id"] in seen:
+            duplicates.append(item)
+            continue
+        seen.add(item["file_unique_id"])
+        new.append(item)
+    return new, duplicates
+
+
+def summary(items: list[dict], duplicates: list[dict], _: Callable) -> str:
+    """The reply sent once a media group is saved"""
+    message = ""
+    if items:
+        message += _("Success! {} files added").format(len(items)) + "\n\n"
+        message += "\n".join(italic(item["name"]) for item in items) + "\n\n"
+    message += "\n".join(
+        _("{} already added").format(italic(item["name"])) for item in duplicates
+    )
+    return message.strip()
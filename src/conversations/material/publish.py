@@ -23,7 +23,7 @@ from src.models import (
     SingleFile,
     User,
 )
-from src.utils import get_setting_value, session, user_locale
+from src.utils import session, user_locale
 
 
 @session
@@ -84,16 +84,16 @@ async def handler(update: Update, context: CustomContext, session: Session, back
         message = (
             messages.title(context.match, session, context)
             + "\n"
-            + _("t-symbol")
-            + "─ "
-            + course.get_name(context.language_code)
+            + messages.TREE_ROOT.render(
+                context.language_code, name=course.get_name(context.language_code)
+            )
             + "\n"
             + messages.material_type_text(context.match, context=context)
             + ("\n" if isinstance(material, SingleFile) else "")
-            + "│   "
-            + _("corner-symbol")
-            + "── "
-            + messages.material_message_text(url, context, material)
+            + messages.TREE_LEAF.render(
+                context.language_code,
+                name=messages.material_message_text(url, context, material),
+            )
             + "\n\n"
             + _("Publishing Options").format(material_title)
         )
@@ -124,6 +124,17 @@ async def register_jobs(update: Update, context: CustomContext, session: Session
     enrollment_id = context.match.group("enrollment_id")
     enrollment = session.get(Enrollment, enrollment_id)
     academic_year_id = enrollment.academic_year_id
+
+    setting_key = None
+    for sk in SettingKey.get_notification_keys():
+        if material.type in sk.key:
+            setting_key = sk
+
+    if setting_key is None:
+        raise ValueError(
+            f"no notification setting key found for material of type {material.type}"
+        )
+
     users = session.scalars(
         select(User)
         .select_from(Enrollment)
@@ -140,27 +151,11 @@ async def register_jobs(update: Update, context: CustomContext, session: Session
         .filter(
             Enrollment.academic_year_id == academic_year_id,
             Course.id == material.course_id,
+            User.notification_mask.bitwise_and(setting_key.bit) != 0,
         )
     ).all()
 
-    setting_key = None
-    for sk in SettingKey:
-        if material.type in sk.key:
-            setting_key = sk
-
-    if setting_key is None:
-        raise ValueError(
-            f"no notification setting key found for material of type {material.type}"
-        )
-
     for i, user in enumerate(users):
-        user_setting = get_setting_value(
-            session, user_id=user.id, setting_key=setting_key
-        )
-
-        if bool(user_setting) is False:
-            return
-
         JOBNAME = (
             str(context.user_data["telegram_id"])
             + "_NOTIFY_"
@@ -212,33 +207,26 @@ async def send_notification(context: CustomContext) -> None:
         session.add_all([material, user])
         with contextlib.suppress(Forbidden):
             url = f"{constants.NOTIFICATION_}/{material.type}"
-            message = (
-                translation.gettext("t-symbol")
-                + "─ 🔔 "
-                + material.course.get_name(user.language_code)
-                + "\n│ "
-                + translation.gettext("corner-symbol")
-                + "── "
-                + (
-                    messages.material_message_text(
-                        url,
-                        CustomContext(
-                            context.application,
-                            user_id=user.telegram_id,
-                            chat_id=user.chat_id,
-                        ),
-                        material,
-                    )
+            user_context = CustomContext(
+                context.application, user_id=user.telegram_id, chat_id=user.chat_id
+            )
+            # the user's data may have been changed by another worker
+            await user_context.refresh_data()
+            message = messages.NOTIFICATION.render(
+                user.language_code,
+                course=material.course.get_name(user.language_code),
+                text=(
+                    messages.material_message_text(url, user_context, material)
                     if not isinstance(material, SingleFile)
                     else translation.gettext(material.type)
-                )
+                ),
             )
 
             keyboard = [[buttons.show_more(f"{url}/{material.id}")]]
             if isinstance(material, (Review, SingleFile)):
                 keyboard = [[buttons.material(url, material)]]
             reply_markup = InlineKeyboardMarkup(keyboard)
-            await context.bot.send_message(
+            await context.bot.bulk.send_message(
                 user.chat_id,
                 text=message,
                 reply_markup=reply_markup,
@@ -1,13 +1,25 @@
+import asyncio
 from itertools import groupby
-from typing import Optional
+from typing import Optional, Union
+from weakref import WeakValueDictionary
 
+from cachetools import LRUCache
 from sqlalchemy import select
 from sqlalchemy.orm import Session
-from telegram import InputMedia, Update
+from telegram import Bot, InputMedia, Message, Update
 
 from src import constants, messages
+from src.config import Config
 from src.customcontext import CustomContext
-from src.models import Enrollment, File, HasNumber, RefFilesMixin, Review, SingleFile
+from src.models import (
+    Enrollment,
+    File,
+    HasNumber,
+    Material,
+    RefFilesMixin,
+    Review,
+    SingleFile,
+)
 from src.models.material import __classes__, get_material_class
 from src.utils import build_media_group, session
 
@@ -19,6 +31,21 @@ TYPES = "|".join(
     ]
 )
 
+CONCURRENCY = 8
+"""Maximum number of albums being sent at the same time, across all chats"""
+
+_payloads: LRUCache[tuple, list] = LRUCache(maxsize=256)
+"""The albums and voice notes to send, or the archived messages to copy, per
+material (or per course and academic year for single file materials), see
+:func:`invalidate`"""
+
+MAX_COPY = 100
+"""Maximum number of messages `copy_messages` accepts at once"""
+
+_semaphore = asyncio.Semaphore(CONCURRENCY)
+_build_locks: WeakValueDictionary[tuple, asyncio.Lock] = WeakValueDictionary()
+_chat_locks: WeakValueDictionary[int, asyncio.Lock] = WeakValueDictionary()
+
 
 @session
 async def send(
@@ -40,10 +67,41 @@ async def send(
     material = session.get(MaterialClass, material_id)
     _ = context.gettext
 
+    if issubclass(MaterialClass, RefFilesMixin):
+        key = (material_type, int(material_id))
+    elif issubclass(MaterialClass, SingleFile):
+        enrollment_id = context.match.group("enrollment_id")
+        course_id = context.match.group("course_id")
+        enrollment = session.get(Enrollment, enrollment_id)
+        key = (material_type, int(course_id), enrollment.academic_year_id)
+
+    lock = _build_locks.get(key)
+    if lock is None:
+        lock = _build_locks[key] = asyncio.Lock()
+    async with lock:
+        if (payloads := _payloads.get(key)) is None:
+            payloads = await _build_payloads(session, context.bot, MaterialClass, key)
+            _payloads[key] = payloads
+
+    caption = None
+    if isinstance(material, Review):
+        caption = messages.material_title_text(
+            context.match, material, context.language_code
+        )
+    context.application.create_task(
+        _send(query.message, payloads, caption, _("{} of {}")), update=update
+    )
+
+    return constants.ONE
+
+
+async def _build_payloads(
+    session: Session, bot: Bot, MaterialClass: type, key: tuple
+) -> list[tuple[str, Union[str, tuple]]]:
     files = []
 
     if issubclass(MaterialClass, RefFilesMixin):
-        material_id = context.match.group("material_id")
+        _, material_id = key
         files = session.scalars(
             select(File)
             .join(MaterialClass, MaterialClass.id == File.material_id)
@@ -52,15 +110,13 @@ async def send(
         ).all()
 
     elif issubclass(MaterialClass, SingleFile):
-        enrollment_id = context.match.group("enrollment_id")
-        course_id = context.match.group("course_id")
-        enrollment = session.get(Enrollment, enrollment_id)
+        _, course_id, academic_year_id = key
         files = session.scalars(
             select(File)
             .join(MaterialClass, MaterialClass.file_id == File.id)
             .where(
                 MaterialClass.course_id == course_id,
-                MaterialClass.academic_year_id == enrollment.academic_year_id,
+                MaterialClass.academic_year_id == academic_year_id,
             )
             .order_by(File.type.asc(), File.name)
         ).all()
@@ -72,26 +128,105 @@ async def send(
             return "document"
         return "voice"
 
+    groups: list[list[File]] = []
     for group, group_files in groupby(files, key=keygetter):
         if group == "voice":
-            for file in group_files:
-                await update.effective_message.reply_voice(file.telegram_id)
+            groups.extend([file] for file in group_files)
             continue
-        albums = build_media_group(
-            [InputMedia(file.type, file.telegram_id) for file in group_files]
-        )
-        caption = None
-        for i, album in enumerate(albums):
-            if isinstance(material, Review):
-                caption = messages.material_title_text(
-                    context.match, material, context.language_code
-                )
-                caption += (
-                    "\n" + _("{} of {}").format(i + 1, len(albums))
-                    if len(albums) > 1
-                    else ""
-                )
-
-            await query.message.reply_media_group(media=album, caption=caption)
+        groups.extend(build_media_group(list(group_files)))
 
-    return constants.ONE
+    if Config.ARCHIVE_CHANNEL_CHAT_ID is None or issubclass(MaterialClass, Review):
+        return [
+            (
+                ("voice", group[0].telegram_id)
+                if group[0].type == "voice"
+                else ("album", tuple(InputMedia(f.type, f.telegram_id) for f in group))
+            )
+            for group in groups
+        ]
+
+    await _archive(bot, groups)
+    # an album copied in two calls arrives as two albums, the chunks end between
+    # albums
+    chunks: list[list[int]] = [[]]
+    for group in groups:
+        if len(chunks[-1]) + len(group) > MAX_COPY:
+            chunks.append([])
+        chunks[-1].extend(file.archive_message_id for file in group)
+    return [("copy", tuple(chunk)) for chunk in chunks if chunk]
+
+
+async def _archive(bot: Bot, groups: list[list[File]]) -> None:
+    """Posts :paramref:`groups` to `Config.ARCHIVE_CHANNEL_CHAT_ID`, one album per
+    group, and records the message of each file in `File.archive_message_id`.
+
+    Nothing is posted if the files are already archived in the same order. Otherwise
+    all of them are posted again, so that they can be copied with a single range of
+    ascending message ids and keep their albums.
+    """
+    message_ids = [file.archive_message_id for group in groups for file in group]
+    if None not in message_ids and all(
+        a < b for a, b in zip(message_ids, message_ids[1:])
+    ):
+        return
+
+    chat_id = Config.ARCHIVE_CHANNEL_CHAT_ID
+    for group in groups:
+        if len(group) == 1:
+            file = group[0]
+            sender = getattr(bot, f"send_{file.type}")
+            sent = [await sender(chat_id, file.telegram_id)]
+        else:
+            sent = await bot.send_media_group(
+                chat_id, [InputMedia(f.type, f.telegram_id) for f in group]
+            )
+        for file, message in zip(group, sent):
+            file.archive_message_id = message.message_id
+
+
+async def _send(
+    message: Message,
+    payloads: list[tuple[str, Union[str, tuple]]],
+    caption: Optional[str],
+    counter: str,
+):
+    """Sends :paramref:`payloads` in order as replies to :paramref:`message`.
+
+    Sends of the same chat are serialized, so that albums don't interleave when
+    "send all" is pressed more than once, while sends to different chats run
+    concurrently, up to :const:`CONCURRENCY` at a time.
+    """
+    lock = _chat_locks.get(message.chat_id)
+    if lock is None:
+        lock = _chat_locks[message.chat_id] = asyncio.Lock()
+
+    number_of_albums = sum(1 for kind, _ in payloads if kind == "album")
+    async with lock:
+        album_number = 0
+        for kind, payload in payloads:
+            async with _semaphore:
+                if kind == "voice":
+                    await message.reply_voice(payload)
+                    continue
+                if kind == "copy":
+                    await message.get_bot().copy_messages(
+                        message.chat_id, Config.ARCHIVE_CHANNEL_CHAT_ID, payload
+                    )
+                    continue
+                album_number += 1
+                album_caption = caption
+                if caption is not None and number_of_albums > 1:
+                    album_caption += "\n" + counter.format(
+                        album_number, number_of_albums
+                    )
+                await message.reply_media_group(media=payload, caption=album_caption)
+
+
+def invalidate(material: Material) -> None:
+    """Drops the cached albums :paramref:`material`'s files are part of. Must be
+    called whenever files are added to or removed from it."""
+    if isinstance(material, SingleFile):
+        key = (material.type, material.course_id, material.academic_year_id)
+    else:
+        key = (material.type, material.id)
+    _payloads.pop(key, None)
@@ -1,5 +1,7 @@
 """Contains callbacks and handlers for the NOTIFICATION_ conversaion"""
 
+import re
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 from telegram import InlineKeyboardMarkup, Update
@@ -10,6 +12,7 @@ from src import constants, messages
 from src.conversations.material import files, sendall
 from src.customcontext import CustomContext
 from src.models import File, Material, MaterialType, RefFilesMixin, Review, SingleFile
+from src.pagination import CURSOR, paginate
 from src.utils import build_menu, session
 
 # ------------------------- Callbacks -----------------------------
@@ -25,13 +28,14 @@ async def material(
 ):
     """
     Runs on callback_data
-    ^{URLPREFIX}/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)$
+    ^{URLPREFIX}/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)
+    (?:\?p=(?P<page>{CURSOR}))?$
     """
 
     query = update.callback_query
     await query.answer()
 
-    url = context.match.group()
+    url = re.sub(r"\?.*$", "", context.match.group())
     material_id = context.match.group("material_id")
     material = session.get(Material, material_id)
 
@@ -46,28 +50,29 @@ async def material(
     keyboard: list[list] = []
 
     if isinstance(material, RefFilesMixin):
-        menu_files = session.scalars(
-            select(File).where(File.material_id == material.id)
+        page = paginate(
+            session,
+            select(File).where(File.material_id == material.id),
             # hack to have the order as document, photo, video then by file name
-            .order_by(File.type.asc(), File.name)
-        ).all()
-        files_menu = context.buttons.files_list(f"{url}/{constants.FILES}", menu_files)
+            order_by=[File.type, File.name, File.id],
+            size=files.PAGE_SIZE,
+            cursor=context.match.group("page"),
+        )
+        files_menu = context.buttons.files_list(f"{url}/{constants.FILES}", page.items)
         keyboard += build_menu(files_menu, 1)
-
-    if isinstance(material, RefFilesMixin) and len(material.files) > 1:
-        keyboard += [[context.buttons.send_all(url)]]
+        if pager_keyboard := page.navigation(
+            context.buttons, url, reverse=context.language_code == constants.AR
+        ):
+            keyboard.append(pager_keyboard)
+        if page.count > 1:
+            keyboard += [[context.buttons.send_all(url)]]
 
     keyboard += [[context.buttons.show_less(url + "?collapse=1")]]
     reply_markup = InlineKeyboardMarkup(keyboard)
-    _ = context.gettext
-    message = (
-        _("t-symbol")
-        + "─ 🔔 "
-        + material.course.get_name(context.language_code)
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + messages.material_message_text(url, context, material)
+    message = messages.NOTIFICATION.render(
+        context.language_code,
+        course=material.course.get_name(context.language_code),
+        text=messages.material_message_text(url, context, material),
     )
 
     await query.edit_message_text(
@@ -94,16 +99,11 @@ async def collapse_material(
     url = context.match.group()
     material_id = context.match.group("material_id")
     material = session.get(Material, material_id)
-    _ = context.gettext
-
-    message = (
-        _("t-symbol")
-        + "─ 🔔 "
-        + material.course.get_name(context.language_code)
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + messages.material_message_text(url, context, material)
+
+    message = messages.NOTIFICATION.render(
+        context.language_code,
+        course=material.course.get_name(context.language_code),
+        text=messages.material_message_text(url, context, material),
     )
     keyboard = [
         [context.buttons.show_more(f"{URLPREFIX}/{material.type}/{material.id}")]
@@ -136,7 +136,8 @@ notifications_ = ConversationHandler(
     entry_points=[
         CallbackQueryHandler(
             material,
-            pattern=f"^{URLPREFIX}/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)$",
+            pattern=f"^{URLPREFIX}/(?P<material_type>{ALLTYPES})/(?P<material_id>\d+)"
+            f"(?:\?p=(?P<page>{CURSOR}))?$",
         ),
     ],
     states={
@@ -1,5 +1,6 @@
 import re
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from telegram import CallbackQuery, InlineKeyboardMarkup, Update
 from telegram.constants import ParseMode
@@ -13,9 +14,10 @@ from telegram.ext import (
 
 from src import constants, queries
 from src.customcontext import CustomContext
-from src.messages import bold
+from src.messages import Template, bold
 from src.models import Course, Program, ProgramSemester, ProgramSemesterCourse, RoleName
-from src.utils import Pager, build_menu, roles, session
+from src.pagination import CURSOR, paginate
+from src.utils import build_menu, roles, session
 
 URLPREFIX = constants.PROGRAM_
 """Used as a prefix for all `callback_data` s in this conversation module"""
@@ -28,6 +30,17 @@ STATEONE = f"{constants.PROGRAM_} {constants.ONE}"
 STATEADD = f"{constants.PROGRAM_} {constants.ADD}"
 STATEEDIT = f"{constants.PROGRAM_} {constants.EDIT}"
 
+CURRICULUM_TITLE = Template(
+    lambda _: _("Carriculam") + "\n\n" + _("t-symbol") + "─ {program}"
+)
+SEMESTER_BRANCH = Template(
+    lambda _: "\n│ "
+    + _("corner-symbol")
+    + "── "
+    + _("Semester {}").format("{semester}")
+)
+COURSE_LEAF = Template(lambda _: "\n│   " + _("corner-symbol") + "── {course}")
+
 
 # ------------------------------- entry_points ---------------------------
 
@@ -78,7 +91,7 @@ async def program(update: Update, context: CustomContext, session: Session):
     await query.answer()
 
     url = context.match.group()
-    program_id = int(context.match.group("program_id"))
+    program_id = context.ids["program_id"]
     program = queries.program(
         session,
         program_id,
@@ -176,7 +189,7 @@ async def program_semester_list(
 
     url = context.match.group()
 
-    program_id = int(context.match.group("program_id"))
+    program_id = context.ids["program_id"]
     program = queries.program(session, program_id)
     semesters = queries.semesters(session, program_id=program_id)
     semester_buttons = context.buttons.semester_list(
@@ -194,14 +207,9 @@ async def program_semester_list(
         footer_buttons=context.buttons.back(url, f"/{constants.SEMESTERS}"),
     )
     reply_markup = InlineKeyboardMarkup(keyboard)
-    _ = context.gettext
 
-    message = (
-        _("Carriculam")
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + program.get_name(context.language_code)
+    message = CURRICULUM_TITLE.render(
+        context.language_code, program=program.get_name(context.language_code)
     )
     await query.edit_message_text(message, reply_markup=reply_markup)
 
@@ -224,7 +232,7 @@ async def semester_course_list(
     # handler (`program_course_unlink`), and thus altering the url
     url = re.search(rf".*/{constants.SEMESTERS}/\d+", context.match.group()).group()
 
-    program_id = int(context.match.group("program_id"))
+    program_id = context.ids["program_id"]
     program = queries.program(session, program_id)
 
     semester_id = int(context.match.groups()[1])
@@ -255,18 +263,12 @@ async def semester_course_list(
     )
     keyboard += [[context.buttons.back(url, "/\d+$")]]
     reply_markup = InlineKeyboardMarkup(keyboard)
-    _ = context.gettext
 
     message = (
-        _("Carriculam")
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + program.get_name(context.language_code)
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + _("Semester {}").format(semester.number)
+        CURRICULUM_TITLE.render(
+            context.language_code, program=program.get_name(context.language_code)
+        )
+        + SEMESTER_BRANCH.render(context.language_code, semester=semester.number)
         + (" ✅" if available else "")
     )
     await query.edit_message_text(message, reply_markup=reply_markup)
@@ -284,8 +286,8 @@ async def semester_activate(update: Update, context: CustomContext, session: Ses
     query = update.callback_query
     await query.answer()
 
-    program_id = int(context.match.group("program_id"))
-    semester_id = int(context.match.group("semester_id"))
+    program_id = context.ids["program_id"]
+    semester_id = context.ids["semester_id"]
     program = queries.program(session, program_id)
     semester = queries.semester(session, semester_id)
     activate = int(context.match.group("activate"))
@@ -337,9 +339,9 @@ async def program_course(update: Update, context: CustomContext, session: Sessio
     # url here is calculated because this handler reenter with query params
     url = re.search(rf".*/{constants.COURSES}/\d+", context.match.group()).group()
 
-    program_id = int(context.match.group("program_id"))
-    semester_id = int(context.match.group("semester_id"))
-    course_id = int(context.match.group("course_id"))
+    program_id = context.ids["program_id"]
+    semester_id = context.ids["semester_id"]
+    course_id = context.ids["course_id"]
     _ = context.gettext
 
     psc = queries.program_semester_course(session, course_id)
@@ -380,20 +382,14 @@ async def program_course(update: Update, context: CustomContext, session: Sessio
 
     reply_markup = InlineKeyboardMarkup(keyboard)
     message = (
-        _("Carriculam")
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + program.get_name(context.language_code)
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + _("Semester {}").format(semester.number)
+        CURRICULUM_TITLE.render(
+            context.language_code, program=program.get_name(context.language_code)
+        )
+        + SEMESTER_BRANCH.render(context.language_code, semester=semester.number)
         + (" ✅" if available else "")
-        + "\n│   "
-        + _("corner-symbol")
-        + "── "
-        + course.get_name(context.language_code)
+        + COURSE_LEAF.render(
+            context.language_code, course=course.get_name(context.language_code)
+        )
     )
     await query.edit_message_text(
         message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
@@ -419,22 +415,18 @@ async def course_semester_edit(
     # url here is calculated because this handler reenter with query params
     url = re.search(rf".*/{constants.EDIT}", context.match.group()).group()
 
-    program_id = int(context.match.group("program_id"))
-    semester_id = int(context.match.group("semester_id"))
-    course_id = int(context.match.group("course_id"))
-    s_id = int(s) if (s := context.match.group("s_id")) else None
+    program_id = context.ids["program_id"]
+    semester_id = context.ids["semester_id"]
+    course_id = context.ids["course_id"]
+    s_id = context.ids["s_id"]
     _ = context.gettext
 
     program = queries.program(session, program_id)
     old_semester = queries.semester(session, semester_id)
     course = queries.program_semester_course(session, course_id).course
 
-    message = (
-        _("Carriculam")
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + program.get_name(context.language_code)
+    message = CURRICULUM_TITLE.render(
+        context.language_code, program=program.get_name(context.language_code)
     )
     if s_id is None:
         semesters = queries.semesters(session, program_id=program_id)
@@ -442,14 +434,10 @@ async def course_semester_edit(
             semesters, url, selected_ids=semester_id, sep="?s_id="
         )
         message += (
-            "\n│ "
-            + _("corner-symbol")
-            + "── "
-            + _("Semester {}").format(old_semester.number)
-            + "\n│   "
-            + _("corner-symbol")
-            + "── "
-            + course.get_name(context.language_code)
+            SEMESTER_BRANCH.render(context.language_code, semester=old_semester.number)
+            + COURSE_LEAF.render(
+                context.language_code, course=course.get_name(context.language_code)
+            )
             + "\n\n"
             + _("Select {}").format(_("Semester"))
         )
@@ -465,14 +453,10 @@ async def course_semester_edit(
         psc.semester_id = s_id
         new_semester = queries.semester(session, s_id)
         message += (
-            "\n│ "
-            + _("corner-symbol")
-            + "── "
-            + _("Semester {}").format(new_semester.number)
-            + "\n│   "
-            + _("corner-symbol")
-            + "── "
-            + course.get_name(context.language_code)
+            SEMESTER_BRANCH.render(context.language_code, semester=new_semester.number)
+            + COURSE_LEAF.render(
+                context.language_code, course=course.get_name(context.language_code)
+            )
             + "\n\n"
             + _("Success! {} updated").format(_("Semester"))
         )
@@ -516,7 +500,7 @@ async def program_course_unlink(
 
     query = update.callback_query
 
-    course_id = int(context.match.group("course_id"))
+    course_id = context.ids["course_id"]
 
     psc = queries.program_semester_course(session, course_id)
     session.delete(psc)
@@ -542,13 +526,14 @@ async def course_link(update: Update, context: CustomContext, session: Session):
     # url here is calculated because this handler reenter with query params
     url = re.search(rf".*/{constants.ADD}", context.match.group()).group()
 
-    program_id = int(context.match.group("program_id"))
-    semester_id = int(context.match.group("semester_id"))
-    d_id, page, c_id = (
-        int(d) if (d := context.match.group("d_id")) else None,
-        int(p) if (p := context.match.group("page")) else None,
-        int(c) if (c := context.match.group("c_id")) else None,
+    program_id = context.ids["program_id"]
+    semester_id = context.ids["semester_id"]
+    d_id, cursor, c_id = (
+        context.ids["d_id"],
+        context.match.group("page"),
+        context.ids["c_id"],
     )
+    page_param = f"&p={cursor}" if cursor else ""
 
     program = queries.program(session, program_id)
     semester = queries.semester(session, semester_id)
@@ -558,15 +543,10 @@ async def course_link(update: Update, context: CustomContext, session: Session):
     _ = context.gettext
 
     message = (
-        _("Carriculam")
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + program.get_name(context.language_code)
-        + "\n│ "
-        + _("corner-symbol")
-        + "── "
-        + _("Semester {}").format(semester.number)
+        CURRICULUM_TITLE.render(
+            context.language_code, program=program.get_name(context.language_code)
+        )
+        + SEMESTER_BRANCH.render(context.language_code, semester=semester.number)
     )
 
     if d_id is None:
@@ -582,39 +562,34 @@ async def course_link(update: Update, context: CustomContext, session: Session):
         message += "\n\n" + _("Select {}").format(_("Course"))
     if d_id is not None and c_id is None:
         await query.answer()
-        offset = int(page) if page else 0
-        deptartment_courses = queries.department_courses(
-            session, department_id=d_id if d_id != 0 else None
+        page = paginate(
+            session,
+            select(Course).where(
+                Course.department_id == (d_id if d_id != 0 else None)
+            ),
+            order_by=[Course.en_name, Course.id],
+            size=12,
+            cursor=cursor,
         )
-        queries.program_semester_courses(session, program_id=program_id)
         p_courses = {
             psc.course_id: psc.semester.number
             for psc in queries.program_semester_courses(session, program_id=program_id)
         }
-        pager = Pager[Course](deptartment_courses, offset, 12)
 
         menu = context.buttons.program_courses(
-            courses=pager.items,
+            courses=page.items,
             course_semester=p_courses,
             url=url,
-            sep=f"?d_id={d_id}&p={offset}&c_id=",
+            sep=f"?d_id={d_id}{page_param}&c_id=",
         )
         keyboard = build_menu(menu, 2)
-        if pager.has_next or pager.has_previous:
-            pager_keyboard = []
+        if pager_keyboard := page.navigation(
+            context.buttons,
+            url,
+            sep=f"?d_id={d_id}&p=",
+            reverse=context.language_code == constants.AR,
+        ):
             keyboard.append(pager_keyboard)
-            if pager.has_previous:
-                pager_keyboard.append(
-                    context.buttons.previous_page(
-                        f"{url}?d_id={d_id}&p={pager.previous_offset}"
-                    )
-                )
-            if pager.has_next:
-                pager_keyboard.append(
-                    context.buttons.next_page(
-                        f"{url}?d_id={d_id}&p={pager.next_offset}"
-                    )
-                )
         keyboard.extend([[context.buttons.back(url, pattern="\?.*")]])
         message += "\n\n" + _("Select {}").format(_("Course"))
     if c_id:
@@ -645,10 +620,11 @@ async def course_link(update: Update, context: CustomContext, session: Session):
             keyboard = [
                 [
                     context.buttons.update_to_semester(
-                        f"{url}?d_id={d_id}&p={page}&c_id={c_id}&u=1", semester.number
+                        f"{url}?d_id={d_id}{page_param}&c_id={c_id}&u=1",
+                        semester.number,
                     )
                 ],
-                [context.buttons.back(absolute_url=f"{url}?d_id={d_id}&p={page}")],
+                [context.buttons.back(absolute_url=f"{url}?d_id={d_id}{page_param}")],
             ]
         else:
             psc.semester_id = semester_id
@@ -811,7 +787,7 @@ states = {
             course_link,
             pattern=f"^{URLPREFIX}/{constants.PROGRAMS}/(?P<program_id>\d+)"
             f"/{constants.SEMESTERS}/(?P<semester_id>\d+)/{constants.ADD}(?:\?(?:d_id=(?P<d_id>\d+))?"
-            f"(?:&p=(?P<page>\d+))?(?:&c_id=(?P<c_id>\d+))?(?:&u=(?P<should_update>1))?)?$",
+            f"(?:&p=(?P<page>{CURSOR}))?(?:&c_id=(?P<c_id>\d+))?(?:&u=(?P<should_update>1))?)?$",
         ),
         CallbackQueryHandler(
             program_delete,
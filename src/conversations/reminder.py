@@ -1,5 +1,6 @@
 """Contains callbacks and handlers for the NOTIFICATION_ conversaion"""
 
+import re
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -15,12 +16,23 @@ from src.conversations.material import files, sendall
 from src.customcontext import CustomContext
 from src.models import File, MaterialType
 from src.models.material import Assignment
+from src.pagination import CURSOR, paginate
 from src.utils import build_menu, session
 
 # ------------------------- Callbacks -----------------------------
 
 URLPREFIX = constants.REMINDER_
 
+REMINDER = messages.Template(
+    lambda _: "⏰ "
+    + _("Reminder")
+    + "\n\n"
+    + _("t-symbol")
+    + "─ {course}\n│ "
+    + _("corner-symbol")
+    + " {material}"
+)
+
 
 @session
 async def assignment(
@@ -30,42 +42,43 @@ async def assignment(
 ):
     """
     Runs on callback_data
-    ^{URLPREFIX}/(?P<material_type>{TYPES})/(?P<material_id>\d+)$
+    ^{URLPREFIX}/(?P<material_type>{TYPES})/(?P<material_id>\d+)
+    (?:\?p=(?P<page>{CURSOR}))?$
     """
 
     query = update.callback_query
     await query.answer()
 
-    url = context.match.group()
+    url = re.sub(r"\?.*$", "", context.match.group())
     material_id = context.match.group("material_id")
     material = session.get(Assignment, material_id)
 
     keyboard: list[list] = []
 
-    menu_files = session.scalars(
-        select(File).where(File.material_id == material.id).order_by(File.name)
-    ).all()
-    files_menu = context.buttons.files_list(f"{url}/{constants.FILES}", menu_files)
+    page = paginate(
+        session,
+        select(File).where(File.material_id == material.id),
+        order_by=[File.name, File.id],
+        size=files.PAGE_SIZE,
+        cursor=context.match.group("page"),
+    )
+    files_menu = context.buttons.files_list(f"{url}/{constants.FILES}", page.items)
     keyboard += build_menu(files_menu, 1)
+    if pager_keyboard := page.navigation(
+        context.buttons, url, reverse=context.language_code == constants.AR
+    ):
+        keyboard.append(pager_keyboard)
 
-    if len(material.files) > 1:
+    if page.count > 1:
         keyboard += [[context.buttons.send_all(url)]]
 
     keyboard += [[context.buttons.show_less(url + "?collapse=1")]]
     reply_markup = InlineKeyboardMarkup(keyboard)
-    _ = context.gettext
 
-    message = (
-        "⏰ "
-        + _("Reminder")
-        + "\n\n"
-        + _("t-symbol")
-        + "─ "
-        + material.course.get_name(context.language_code)
-        + "\n│ "
-        + _("corner-symbol")
-        + " "
-        + messages.material_message_text(url, context, material)
+    message = REMINDER.render(
+        context.language_code,
+        course=material.course.get_name(context.language_code),
+        material=messages.material_message_text(url, context, material),
     )
 
     await query.edit_message_text(
@@ -163,7 +176,8 @@ reminder_ = ConversationHandler(
     entry_points=[
         CallbackQueryHandler(
             assignment,
-            pattern=f"^{URLPREFIX}/(?P<material_type>{TYPES})/(?P<material_id>\d+)$",
+            pattern=f"^{URLPREFIX}/(?P<material_type>{TYPES})/(?P<material_id>\d+)"
+            f"(?:\?p=(?P<page>{CURSOR}))?$",
         ),
     ],
     states={
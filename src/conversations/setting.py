@@ -9,20 +9,39 @@ from telegram.ext import CallbackQueryHandler, ConversationHandler
 
 from src import commands, constants, queries
 from src.customcontext import CustomContext
-from src.messages import bold
+from src.messages import Template, bold
 from src.models import SettingKey
 from src.utils import (
     build_menu,
-    get_setting_value,
+    get_notification_settings,
     session,
     set_my_commands,
-    set_setting_value,
+    set_notification_settings,
 )
 
 # ------------------------- Callbacks -----------------------------
 
 URLPREFIX = constants.SETTINGS_
 
+LANGUAGE_TITLE = Template(
+    lambda _: _("t-symbol")
+    + " ⚙️ "
+    + bold(_("Bot Settings"))
+    + "\n"
+    + _("corner-symbol")
+    + "──  🌍 "
+    + bold(_("Language"))
+)
+NOTIFICATIONS_TITLE = Template(
+    lambda _: _("t-symbol")
+    + " ⚙️ "
+    + bold(_("Bot Settings"))
+    + "\n"
+    + _("corner-symbol")
+    + "──  🔔 "
+    + bold(_("Notifications"))
+)
+
 
 @session
 async def language(update: Update, context: CustomContext, session: Session) -> None:
@@ -50,16 +69,7 @@ async def language(update: Update, context: CustomContext, session: Session) ->
     )
     reply_markup = InlineKeyboardMarkup(keyboard)
 
-    _ = context.gettext
-    message = (
-        _("t-symbol")
-        + " ⚙️ "
-        + bold(_("Bot Settings"))
-        + "\n"
-        + _("corner-symbol")
-        + "──  🌍 "
-        + bold(_("Language"))
-    )
+    message = LANGUAGE_TITLE.render(context.language_code)
 
     await query.edit_message_text(
         message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
@@ -105,10 +115,8 @@ async def notifications(
     url = re.search(rf".*/{constants.NOTIFICATIONS}", context.match.group()).group()
 
     menu: list = []
-    for notification_setting in SettingKey.get_notification_keys():
-        value = get_setting_value(
-            session, context.user_data["id"], notification_setting
-        )
+    settings = get_notification_settings(session, context.user_data["id"])
+    for notification_setting, value in settings.items():
         menu.append(
             context.buttons.notification_setting_item(
                 notification_setting,
@@ -124,16 +132,7 @@ async def notifications(
     )
     reply_markup = InlineKeyboardMarkup(keyboard)
 
-    _ = context.gettext
-    message = (
-        _("t-symbol")
-        + " ⚙️ "
-        + bold(_("Bot Settings"))
-        + "\n"
-        + _("corner-symbol")
-        + "──  🔔 "
-        + bold(_("Notifications"))
-    )
+    message = NOTIFICATIONS_TITLE.render(context.language_code)
     await query.edit_message_text(
         message, reply_markup=reply_markup, parse_mode=ParseMode.HTML
     )
@@ -152,26 +151,19 @@ async def edit_notification(
     _ = context.gettext
 
     if name == "all":
-        updated = False
-        for setting in SettingKey.get_notification_keys():
-            value = get_setting_value(session, context.user_data["id"], setting)
-            if value:
-                set_setting_value(session, context.user_data["id"], setting, False)
-                updated = True
+        updated = set_notification_settings(
+            session,
+            context.user_data["id"],
+            {setting: False for setting in SettingKey.get_notification_keys()},
+        )
+        await query.answer(_("Success! All notifications are Off"))
         if not updated:
-            await query.answer(_("Success! All notifications are Off"))
             return constants.ONE
-        await query.answer(_("Success! All notifications are Off"))
         return await notifications.__wrapped__(update, context, session)
 
     new_value = bool(int(context.match.group("value")))
-    setting_member = SettingKey[name]
-    old_value = get_setting_value(session, context.user_data["id"], setting_member)
-    if new_value == old_value:
-        await query.answer(_("Success!"))
-        return await notifications.__wrapped__(update, context, session)
-    setting = set_setting_value(
-        session, context.user_data["id"], setting_member, new_value
+    set_notification_settings(
+        session, context.user_data["id"], {SettingKey[name]: new_value}
     )
     await query.answer(_("Success!"))
     return await notifications.__wrapped__(update, context, session)
@@ -98,13 +98,12 @@ async def course(update: Update, context: CustomContext, session: Session):
     keyboard = context.buttons.material_groups(url=url, groups=list(MaterialType))
     keyboard.append([context.buttons.back(url, "/(\d+)$")])
     reply_markup = InlineKeyboardMarkup(keyboard)
-    _ = context.gettext
     message = (
         messages.title(context.match, session, context=context)
         + "\n"
-        + _("t-symbol")
-        + "─ "
-        + course.get_name(context.language_code)
+        + messages.TREE_ROOT.render(
+            context.language_code, name=course.get_name(context.language_code)
+        )
     )
 
     await query.edit_message_text(
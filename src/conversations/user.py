@@ -17,8 +17,8 @@ from src import constants, queries
 from src.constants import COMMANDS
 from src.customcontext import CustomContext
 from src.models import RoleName
-from src.models.user import User
-from src.utils import Pager, build_menu, roles, session
+from src.pagination import CURSOR
+from src.utils import build_menu, roles, session
 
 URLPREFIX = constants.USER_
 """used as a prefix for all `callback data` in this conversation"""
@@ -26,6 +26,9 @@ URLPREFIX = constants.USER_
 DATA_KEY = constants.USER_
 """used as a key for read/wirte operations on `chat_data`, `user_data`, `bot_data`"""
 
+PAGE_SIZE = 30
+"""number of users shown per page"""
+
 
 # ------------------------------- entry_points ---------------------------
 @roles(RoleName.ROOT)
@@ -38,7 +41,7 @@ async def user_list(
 ):
     """Runs with messages.test `'/users'` or on callback_data
     `^{URLPREFIX}/{constants.USERS}
-    (?:\?(p=(?P<page>\d+))?(?:&)?(?:q=(?P<query>\w+))?)?
+    (?:\?(p=(?P<page>{CURSOR}))?(?:&)?(?:q=(?P<query>\w+))?)?
     (?:/{constants.IGNORE})?$`
     """
 
@@ -50,22 +53,22 @@ async def user_list(
 
     url = f"{URLPREFIX}/{constants.USERS}"
 
-    offset = 0
+    cursor = None
     if context.match:
         if context.match.group().endswith(constants.IGNORE):
             return constants.ONE
 
-        offset = int(page) if (page := context.match.group("page")) else 0
+        cursor = context.match.group("page")
         if search_query is None:
             search_query = context.match.group("query") or None
-    users = queries.users(session, query=search_query)
 
-    pager = Pager[User](users, offset, 30)
+    page = queries.users_page(
+        session, query=search_query, cursor=cursor, size=PAGE_SIZE
+    )
 
-    user_button_list = await context.buttons.user_list(
-        pager.items,
+    user_button_list = context.buttons.user_list(
+        page.items,
         url,
-        context=context,
         end=f"?q={search_query}" if search_query else None,
     )
     keyboard = build_menu(
@@ -73,27 +76,14 @@ async def user_list(
         3,
         reverse=context.language_code == constants.AR,
     )
-    if pager.has_next or pager.has_previous:
-        pager_keyboard = []
+    if pager_keyboard := page.navigation(
+        context.buttons,
+        url,
+        end=f"&q={search_query}" if search_query else "",
+        ignore_url=f"{url}/{constants.IGNORE}",
+        reverse=context.language_code == constants.AR,
+    ):
         keyboard.append(pager_keyboard)
-        search_param = f"&q={search_query}" if search_query else ""
-        if pager.has_previous:
-            pager_keyboard.append(
-                context.buttons.previous_page(
-                    f"{url}?p={pager.previous_offset}{search_param}"
-                )
-            )
-        pager_keyboard.append(
-            context.buttons.current_page(
-                pager.current_page, pager.number_of_pages, f"{url}/{constants.IGNORE}"
-            )
-        )
-        if pager.has_next:
-            pager_keyboard.append(
-                context.buttons.next_page(f"{url}?p={pager.next_offset}{search_param}")
-            )
-        if context.language_code == constants.AR:
-            pager_keyboard.reverse()
 
     if search_query is None:
         keyboard += [[context.buttons.search(f"{url}/{constants.SEARCH}")]]
@@ -101,7 +91,7 @@ async def user_list(
     reply_markup = InlineKeyboardMarkup(keyboard)
     _ = context.gettext
     message = _("Results") if search_query is not None else _("Users")
-    message += f" [{len(users)}]"
+    message += f" [{page.count}]"
 
     if query:
         await query.edit_message_text(message, reply_markup=reply_markup)
@@ -123,7 +113,7 @@ async def user(update: Update, context: CustomContext, session: Session):
     search_query = context.match.group("query")
     user_id = context.match.group("user_id")
     user = queries.user(session, user_id=user_id)
-    user_data: dict = user.user_data.data
+    user_data = user.user_data
 
     search_param = ("?q=" + search_query) if search_query else ""
     keyboard = [
@@ -136,10 +126,10 @@ async def user(update: Update, context: CustomContext, session: Session):
 
     reply_markup = InlineKeyboardMarkup(keyboard)
     _ = context.gettext
-    message = _("Full name") + f": {user_data.get('full_name')}"
+    message = _("Full name") + f": {user_data.full_name}"
     message += (
         ("\n" + _("Username") + f": @{username}")
-        if (username := user_data.get("username"))
+        if (username := user_data.username)
         else ""
     )
     message += "\n" + _("Telegram id") + f": {user.telegram_id}"
@@ -184,7 +174,7 @@ entry_points = [
     CallbackQueryHandler(
         user_list,
         pattern=f"^{URLPREFIX}/{constants.USERS}"
-        f"(?:\?(p=(?P<page>\d+))?(?:&)?(?:q=(?P<query>\w+))?)?(?:/{constants.IGNORE})?$",
+        f"(?:\?(p=(?P<page>{CURSOR}))?(?:&)?(?:q=(?P<query>\w+))?)?(?:/{constants.IGNORE})?$",
     ),
 ]
 
@@ -1,3 +1,4 @@
+import re
 from typing import Optional
 
 from telegram.ext import Application, CallbackContext, ExtBot
@@ -17,6 +18,7 @@ class CustomContext(CallbackContext[ExtBot, dict, dict, dict]):
     ):
         super().__init__(application=application, chat_id=chat_id, user_id=user_id)
         self._message_id: Optional[int] = None
+        self._ids: tuple[Optional[re.Match], dict[str, Optional[int]]] = (None, {})
 
     @property
     def buttons(self) -> Buttons:
@@ -25,6 +27,20 @@ class CustomContext(CallbackContext[ExtBot, dict, dict, dict]):
         buttons: Buttons = ar_buttons if user_lang == constants.AR else en_buttons
         return buttons
 
+    @property
+    def ids(self) -> dict[str, Optional[int]]:
+        """The `..._id` named groups of :attr:`match` as `int`, or `None` for those
+        not in the url, parsed once per match"""
+        match, ids = self._ids
+        if match is not self.match:
+            ids = {
+                name: int(value) if value is not None else None
+                for name, value in self.match.groupdict().items()
+                if name.endswith("_id")
+            }
+            self._ids = (self.match, ids)
+        return ids
+
     @property
     def gettext(self):
         user_lang = self.user_data.get("language_code")
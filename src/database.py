@@ -1,11 +1,64 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
+from src import metrics
 from src.config import Config
 from src.models import Base
 
-engine = create_engine(Config.DATABASE_URL, connect_args={"options": "-c timezone=utc"})
+
+def timed_pool(name: str) -> type[QueuePool]:
+    """A :class:`QueuePool` recording, under the metrics prefix :paramref:`name`,
+    how long checkouts wait for a connection and how many of them time out."""
+    wait = metrics.summary(f"{name}.checkout_wait")
+    timeouts = metrics.counter(f"{name}.checkout_timeouts")
+
+    class TimedQueuePool(QueuePool):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                timeouts.inc()
+                raise
+            finally:
+                wait.observe(time.perf_counter() - start)
+
+    return TimedQueuePool
+
+
+def _create_engine(name: str, pool_size: int, max_overflow: int) -> Engine:
+    engine = create_engine(
+        Config.DATABASE_URL,
+        connect_args={"options": "-c timezone=utc"},
+        poolclass=timed_pool(name),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=Config.DB_POOL_PRE_PING,
+    )
+    # read through `engine.pool`, which is replaced when the engine is disposed
+    metrics.gauge(f"{name}.checked_out", lambda: engine.pool.checkedout())
+    metrics.gauge(f"{name}.overflow", lambda: max(0, engine.pool.overflow()))
+    return engine
+
+
+engine = _create_engine("db.pool", Config.DB_POOL_SIZE, Config.DB_MAX_OVERFLOW)
 Session = sessionmaker(engine)
 
+# Persistence writes after every update, it gets its own small pool so that
+# bursts of handlers can't starve it and the other way around.
+persistence_engine = _create_engine(
+    "db.persistence_pool", Config.DB_PERSISTENCE_POOL_SIZE, max_overflow=0
+)
+
 
-Base.metadata.create_all(engine)
+def create_schema() -> None:
+    """Creates the missing tables, for development databases. In production the
+    schema is owned by alembic, a new database is created with it and then stamped
+    with `alembic stamp head`."""
+    Base.metadata.create_all(engine)
@@ -1,67 +1,156 @@
+"""Error reporting to the error channel.
+
+Errors are not sent as they happen: they are grouped by :func:`fingerprint`,
+counted, and sent as one report per group by :func:`report_errors`, which runs every
+`Config.ERROR_REPORT_INTERVAL` seconds. At most `Config.ERROR_REPORTS_PER_MINUTE`
+reports are sent per minute, the groups left over wait for the next run. A storm of
+identical errors, e.g. while the database is unreachable, so costs a single message
+instead of one per failed update, and never eats the rate limit of the bot.
+"""
+
 import html
-import json
 import logging
+import time
 import traceback
-from typing import cast
+from collections import deque
+from pathlib import Path
 
 from telegram import Update
 from telegram.constants import ParseMode
-from telegram.error import BadRequest
+from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
+from src import metrics
 from src.config import Config
 
 logger = logging.getLogger(__name__)
 
+ROOT = str(Path(__file__).parent.parent)
+"""The errors are located at the deepest frame within the project"""
+
+MAX_GROUPS = 100
+"""Groups kept until the next report, the errors of any further group are only
+logged and counted"""
+
+errors_counter = metrics.counter("errors")
+dropped_counter = metrics.counter("errors.unreported")
+
+
+class _Group:
+    """The errors sharing a fingerprint since the last report, with the traceback
+    and update of the first of them as an example"""
+
+    __slots__ = ("count", "first_seen", "last_seen", "traceback", "update")
+
+    def __init__(self, error: BaseException, update: object):
+        self.count = 0
+        self.first_seen = self.last_seen = time.time()
+        self.traceback = "".join(
+            traceback.format_exception(None, error, error.__traceback__)
+        )
+        self.update = update.to_json() if isinstance(update, Update) else str(update)
+
+
+_groups: dict[str, _Group] = {}
+_logged: set[str] = set()
+"""Fingerprints whose traceback was logged, they are as many as the places errors
+are raised at"""
+_sent: deque[float] = deque()
+"""`time.monotonic()` of the reports sent in the last minute"""
+
+
+def fingerprint(error: BaseException) -> str:
+    """The type of :paramref:`error` and where it was raised, as the deepest frame
+    of the traceback within the project, e.g.
+    `sqlalchemy.exc.OperationalError at src/queries.py:42 in user`"""
+    frames = traceback.extract_tb(error.__traceback__)
+    own = [frame for frame in frames if frame.filename.startswith(ROOT)]
+    location = ""
+    if frame := (own or frames or [None])[-1]:
+        filename = Path(frame.filename)
+        if frame.filename.startswith(ROOT):
+            filename = filename.relative_to(ROOT)
+        location = f" at {filename}:{frame.lineno} in {frame.name}"
+    error_type = type(error)
+    return f"{error_type.__module__}.{error_type.__qualname__}{location}"
+
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Log the error and send a telegram message to notify the developer."""
-    # Log the error before we do anything else, so we can see it even if something
-    # breaks.
-    logger.error(msg="Exception while handling an update:", exc_info=context.error)
+    """Log the error and count it towards the next report of its group."""
+    error = context.error
+    errors_counter.inc()
+    key = fingerprint(error)
+
+    # the traceback is logged the first time only, the reports carry it
+    if key in _logged:
+        logger.error("Exception while handling an update: %s (repeated)", key)
+    else:
+        _logged.add(key)
+        logger.error(msg="Exception while handling an update:", exc_info=error)
 
     if Config.ERROR_CHANNEL_CHAT_ID is None:
         return
+    group = _groups.get(key)
+    if group is None:
+        if len(_groups) >= MAX_GROUPS:
+            dropped_counter.inc()
+            return
+        group = _groups[key] = _Group(error, update)
+    group.count += 1
+    group.last_seen = time.time()
 
-    # traceback.format_exception returns the usual python message about an exception,
-    # but as a list of strings rather than a single string, so we have to join them
-    # together.
-    tb_list = traceback.format_exception(
-        None, context.error, cast(Exception, context.error).__traceback__
-    )
-    tb_string = "".join(tb_list)
-
-    # Build the message with some markup and additional information about what happened.
-    # You might need to add some logic to deal with messages longer than the 4096
-    # character limit.
-    update_str = update.to_dict() if isinstance(update, Update) else str(update)
-    message_1 = (
-        f"An exception was raised while handling an update\n\n"
-        "<pre>"
-        f"update = {html.escape(json.dumps(update_str, indent=2, ensure_ascii=False))}"
-        "</pre>"
+
+def _truncate(text: str, length: int, tail: bool = False) -> str:
+    if len(text) <= length:
+        return text
+    return "…" + text[-length:] if tail else text[:length] + "…"
+
+
+def _report(key: str, group: _Group) -> str:
+    first = time.strftime("%H:%M:%S", time.gmtime(group.first_seen))
+    last = time.strftime("%H:%M:%S", time.gmtime(group.last_seen))
+    # well within the 4096 characters of a message, which are counted without the
+    # markup and escapes
+    return (
+        f"<b>{html.escape(key)}</b>\n"
+        f"{group.count} times, {first} - {last} UTC\n\n"
+        f"<pre>update = {html.escape(_truncate(group.update, 1000))}</pre>\n"
+        # the end of the traceback is where the error is
+        f"<pre>{html.escape(_truncate(group.traceback, 2500, tail=True))}</pre>"
     )
-    message_2 = f"<pre>{html.escape(tb_string)}</pre>"
-
-    # Finally, send the messages
-    # We send update and traceback in two parts to reduce the chance of hitting
-    # max length
-    try:
-        sent_message = await context.bot.send_message(
-            chat_id=Config.ERROR_CHANNEL_CHAT_ID,
-            text=message_1,
-            parse_mode=ParseMode.HTML,
-        )
-        await sent_message.reply_html(message_2)
-    except BadRequest as exc:
-        if "too long" in str(exc):
-            message = (
-                "Hey.\n"
-                f"The error <code>{html.escape(str(context.error))}</code> happened."
-                f" The traceback is too long to send, but it was written to the log."
-            )
+
+
+def _can_send() -> bool:
+    now = time.monotonic()
+    while _sent and now - _sent[0] > 60:
+        _sent.popleft()
+    return len(_sent) < Config.ERROR_REPORTS_PER_MINUTE
+
+
+async def report_errors(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Sends a report of each group of errors to the error channel, as long as the
+    rate limit allows"""
+    if Config.ERROR_CHANNEL_CHAT_ID is None:
+        return
+
+    for key in list(_groups):
+        if not _can_send():
+            break
+        group = _groups[key]
+        reported = group.count
+        try:
             await context.bot.send_message(
-                chat_id=Config.ERROR_CHANNEL_CHAT_ID, text=message
+                chat_id=Config.ERROR_CHANNEL_CHAT_ID,
+                text=_report(key, group),
+                parse_mode=ParseMode.HTML,
             )
-        else:
-            raise exc
+        except TelegramError:
+            # don't report the reporting, the group is tried again next time and
+            # the groups after it are not held up
+            logger.exception("Could not report %s", key)
+            continue
+        _sent.append(time.monotonic())
+        # errors that happened while sending are reported next time
+        group.count -= reported
+        if group.count == 0:
+            del _groups[key]
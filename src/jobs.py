@@ -1,26 +1,24 @@
 import contextlib
 import datetime
+import logging
 from zoneinfo import ZoneInfo
 
 from babel.dates import format_timedelta
-from sqlalchemy import and_, select
-from sqlalchemy.orm import aliased
 from telegram import InlineKeyboardMarkup
 from telegram.error import Forbidden
+from telegram.ext import ConversationHandler
 
-from src import constants
+from src import constants, metrics, queries
 from src.buttons import ar_buttons, en_buttons
+from src.config import Config
 from src.customcontext import CustomContext
 from src.database import Session
 from src.models import Assignment
-from src.models.course import Course
-from src.models.enrollment import Enrollment
-from src.models.program_semester import ProgramSemester
-from src.models.program_semester_course import ProgramSemesterCourse
-from src.models.semester import Semester
 from src.models.user import User
 from src.utils import user_locale
 
+logger = logging.getLogger(__name__)
+
 
 def remove_job_if_exists(name: str, context: CustomContext) -> bool:
     """Remove job with given name. Returns whether job was removed."""
@@ -32,6 +30,47 @@ def remove_job_if_exists(name: str, context: CustomContext) -> bool:
     return True
 
 
+async def report_metrics(_: CustomContext):
+    """Logs the metrics collected since the previous run"""
+    logger.info(
+        "Metrics: %s",
+        " ".join(
+            f"{name}={value:.4g}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in metrics.collect().items()
+        ),
+    )
+
+
+async def expire_conversations(context: CustomContext):
+    """Evicts the states of per message conversations that have been idle for
+    `Config.CONVERSATION_TTL_DAYS`, e.g. those of old notification messages, from
+    the database and from the conversation handlers"""
+    handlers = {
+        handler.name: handler
+        for group in context.application.handlers.values()
+        for handler in group
+        if isinstance(handler, ConversationHandler)
+        and handler.persistent
+        and handler.per_message
+    }
+    expired = await context.application.persistence.expire_conversations(
+        list(handlers), datetime.timedelta(days=Config.CONVERSATION_TTL_DAYS)
+    )
+    evicted = 0
+    for name, key in expired:
+        # the handlers' states dict tracks this delete, the persistence update it
+        # triggers finds the row already gone
+        if handlers[name]._conversations.pop(key, None) is not None:
+            evicted += 1
+
+    metrics.counter("conversations.expired").inc(len(expired))
+    logger.info(
+        "Expired %s idle conversations, %s of them were held in memory",
+        len(expired),
+        evicted,
+    )
+
+
 async def deadline_reminder(context: CustomContext):
     job = context.job
     await context.bot.send_message(
@@ -41,66 +80,18 @@ async def deadline_reminder(context: CustomContext):
     )
     current_time = datetime.datetime.now(datetime.UTC)
     with Session.begin() as session:
-        assignments: list[Assignment] = session.scalars(
-            select(Assignment).where(
-                Assignment.published,
-                Assignment.deadline is not None,
-                Assignment.deadline > current_time,
-                and_(
-                    and_(
-                        Assignment.deadline
-                        >= current_time + datetime.timedelta(hours=36),
-                        Assignment.deadline
-                        < current_time + datetime.timedelta(hours=48),
-                    ),
-                ),
-            )
-        ).all()
+        assignments = queries.due_assignments(
+            session,
+            start=current_time + datetime.timedelta(hours=36),
+            end=current_time + datetime.timedelta(hours=48),
+        )
         when = 2
         for i, assignment in enumerate(assignments):
-            sub_semester = aliased(Semester)
-            sub_program_semester = aliased(ProgramSemester)
-            academic_year_id = assignment.academic_year_id
-            users: list[User] = session.scalars(
-                select(User)
-                .select_from(Assignment)
-                .join(Course)
-                .join(ProgramSemesterCourse)
-                .join(
-                    ProgramSemester,
-                    and_(
-                        ProgramSemester.program_id == ProgramSemesterCourse.program_id,
-                        ProgramSemester.semester_id
-                        == ProgramSemesterCourse.semester_id,
-                    ),
-                )
-                .join(Semester)
-                .join(
-                    Enrollment,
-                    Enrollment.program_semester_id.in_(
-                        select(sub_program_semester.id)
-                        .join(sub_semester)
-                        .where(
-                            sub_program_semester.program_id
-                            == ProgramSemester.program_id,
-                            sub_semester.number.in_(
-                                [
-                                    Semester.number,
-                                    Semester.number
-                                    + (1 if Semester.number % 2 == 1 else -1),
-                                ]
-                            ),
-                        )
-                        .subquery()
-                    ),
-                )
-                .join(User, Enrollment.user_id == User.id)
-                .where(
-                    Assignment.id == assignment.id,
-                    Enrollment.academic_year_id == academic_year_id,
-                )
-                .group_by(User)
-            ).all()
+            users = queries.assignment_users(
+                session,
+                assignment_id=assignment.id,
+                academic_year_id=assignment.academic_year_id,
+            )
             zone = ZoneInfo("Africa/Khartoum")
             delta = assignment.deadline.astimezone(zone) - datetime.datetime.now(zone)
             session.expunge(assignment)
@@ -190,7 +181,7 @@ async def send_reminder(context: CustomContext) -> None:
                 ]
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
-            await context.bot.send_message(
+            await context.bot.bulk.send_message(
                 user.chat_id, text=message, reply_markup=reply_markup
             )
 
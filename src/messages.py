@@ -1,6 +1,7 @@
 import gettext as pygettext
 import re
-from typing import Optional
+from functools import cache
+from typing import Callable, Optional
 from zoneinfo import ZoneInfo
 
 from babel.dates import format_datetime
@@ -25,6 +26,31 @@ from src.models import (
 from src.utils import user_locale, user_mode
 
 
+class Template:
+    """
+    A message shape, compiled once per language into a `str.format` string with its
+    translations already resolved, and rendered from a few values.
+
+    Args:
+        build (Callable[[gettext], :obj:`str`]): Builds the format string of a
+            language from its `gettext`. Translated texts become part of the format
+            string, so their `{}` fields are named with `.format("{name}")`.
+    """
+
+    def __init__(self, build: Callable[[Callable[[str], str]], str]):
+        self._build = build
+        self._compiled: dict[str, str] = {}
+
+    def compile(self, language_code: str) -> str:
+        if (compiled := self._compiled.get(language_code)) is None:
+            compiled = self._build(user_locale(language_code).gettext)
+            self._compiled[language_code] = compiled
+        return compiled
+
+    def render(self, language_code: str, **values) -> str:
+        return self.compile(language_code).format_map(values)
+
+
 def successfull_request_action(
     request: AccessRequest, chat: Chat, context: CustomContext
 ):
@@ -48,11 +74,71 @@ def underline(text):
     return f"<u>{text}</u>"
 
 
+TITLES = {
+    constants.UPDATE_MATERIALS_: Template(lambda _: underline(_("Editor Menu"))),
+    constants.EDITOR_: Template(lambda _: underline(_("Editor Access"))),
+    constants.CONETENT_MANAGEMENT_: Template(
+        lambda _: underline(_("Content Management"))
+    ),
+}
+YEAR_TITLE = Template(
+    lambda _: "\n\n{program}\n"
+    + _("Semester {}").format("{semester}")
+    + "\n"
+    + _("Year {} - {}").format("{start}", "{end}")
+    + "\n"
+)
+TREE_ROOT = Template(lambda _: _("t-symbol") + "─ {name}")
+"""The first line of a tree, e.g. the course of a material"""
+TREE_BRANCH = Template(lambda _: "│ " + _("corner-symbol") + "── {name}")
+TREE_LEAF = Template(lambda _: "│   " + _("corner-symbol") + "── {name}")
+
+
+def _material_type(material_type: MaterialType) -> Template:
+    return Template(
+        lambda _: "│ "
+        + _("corner-symbol")
+        + "── "
+        + _(f"{material_type}s")
+        + "\n"
+    )
+
+
+MATERIAL_TYPES = {
+    material_type: _material_type(material_type) for material_type in MaterialType
+}
+PUBLISHED = Template(lambda _: italic(_("Published true")))
+UNPUBLISHED = Template(lambda _: italic(_("Published false")))
+ASSIGNMENT = Template(lambda _: "{type} {number} " + _("due by") + " {deadline}")
+NO_VALUE = Template(lambda _: "[" + _("No value") + "]")
+FILE = Template(lambda _: "{name} " + _("Source") + " {source}")
+FILE_NO_SOURCE = Template(lambda _: "{name} " + _("Source") + " " + _("No value"))
+ENROLLMENT = Template(
+    lambda _: _("Year {} - {}").format("{start}", "{end}") + "\n{program}\n{level}\n"
+)
+NOTIFICATION = Template(
+    lambda _: _("t-symbol")
+    + "─ 🔔 {course}\n│ "
+    + _("corner-symbol")
+    + "── {text}"
+)
+
+
 def help(
     user_roles: set[RoleName],
     language_code: str,
     new: Optional[RoleName] = None,
 ):
+    return _help(frozenset(user_roles), language_code, new)
+
+
+@cache
+def _help(
+    user_roles: frozenset[RoleName],
+    language_code: str,
+    new: Optional[RoleName] = None,
+):
+    """:func:`help`, memoized, there are only a few role sets and languages"""
     message: str
     _ = user_locale(language_code).gettext
     cmds = constants.Commands(_)
@@ -105,7 +191,6 @@ def help(
 
 
 def title(match: re.Match, session: Session, context: CustomContext):
-    _ = context.gettext
     url: str = match.group()
 
     if url.startswith(constants.COURSES_):
@@ -113,12 +198,11 @@ def title(match: re.Match, session: Session, context: CustomContext):
 
     text = ""
 
-    if url.startswith(constants.UPDATE_MATERIALS_):
-        text += underline(_("Editor Menu"))
-    elif url.startswith(constants.EDITOR_):
-        text += underline(_("Editor Access"))
-    elif url.startswith(constants.CONETENT_MANAGEMENT_):
-        text += underline(_("Content Management"))
+    language_code = context.language_code
+    for prefix, template in TITLES.items():
+        if url.startswith(prefix):
+            text += template.render(language_code)
+            break
 
     if match.group("enrollment_id"):
         text += "\n\n" + enrollment_text(match, session, context=context)
@@ -129,14 +213,12 @@ def title(match: re.Match, session: Session, context: CustomContext):
         program = queries.program(session, program_id)
         semester = queries.semester(session, semester_id)
         year = queries.academic_year(session, year_id)
-        text += (
-            "\n\n"
-            + program.get_name(context.language_code)
-            + "\n"
-            + _("Semester {}").format(semester.number)
-            + "\n"
-            + _("Year {} - {}").format(year.start, year.end)
-            + "\n"
+        text += YEAR_TITLE.render(
+            language_code,
+            program=program.get_name(language_code),
+            semester=semester.number,
+            start=year.start,
+            end=year.end,
         )
     return text
 
@@ -145,9 +227,7 @@ def material_type_text(match: re.Match, context: CustomContext):
     material_type: str = match.group("material_type")
     if user_mode(match.group()) and material_type == MaterialType.LECTURE:
         return ""
-    _ = context.gettext
-    type_name = f"{material_type}s"
-    return "│ " + _("corner-symbol") + "── " + _(type_name) + "\n"
+    return MATERIAL_TYPES[material_type].render(context.language_code)
 
 
 def material_message_text(
@@ -161,39 +241,34 @@ def material_message_text(
     is_published = ""
     if not user_mode(url):
         is_published = (
-            italic(_("Published true"))
-            if material.published
-            else italic(_("Published false"))
-        )
+            PUBLISHED if material.published else UNPUBLISHED
+        ).render(language_code)
 
     material_type = _(material.type)
     if isinstance(material, Assignment):
         datestr = (
-            (
-                "<b>"
-                + format_datetime(
+            bold(
+                format_datetime(
                     d.astimezone(ZoneInfo("Africa/Khartoum")),
                     "E d MMM hh:mm a ZZZZ",
-                    locale=context.language_code,
+                    locale=language_code,
                 )
-                + "</b>"
             )
             if (d := material.deadline)
-            else "[" + _("No value") + "]"
+            else NO_VALUE.render(language_code)
+        )
+        message = ASSIGNMENT.render(
+            language_code, type=material_type, number=material.number, deadline=datestr
         )
-        text = f"{material_type} {material.number} " + _("due by") + f" {datestr}"
-        message = text
     elif isinstance(material, HasNumber):
-        text = f"{material_type} {material.number}"
-        message = text
+        message = f"{material_type} {material.number}"
     elif isinstance(material, SingleFile):
         file = material.file
         return file_text(file, context) + " " + is_published
     elif isinstance(material, Review):
-        text = material.get_name(language_code) + (
+        message = material.get_name(language_code) + (
             " " + str(d.year) if (d := material.date) else ""
         )
-        message = text
 
     message += " " + is_published
     return message
@@ -223,14 +298,11 @@ def material_title_text(
 
 
 def file_text(file: File, context: CustomContext):
-    _ = context.gettext
-    return (
-        file.name
-        + " "
-        + _("Source")
-        + " "
-        + (f'[<a href="{s}">url</a>]' if (s := file.source) else _("No value"))
-    )
+    if s := file.source:
+        return FILE.render(
+            context.language_code, name=file.name, source=f'[<a href="{s}">url</a>]'
+        )
+    return FILE_NO_SOURCE.render(context.language_code, name=file.name)
 
 
 def enrollment_text(
@@ -254,11 +326,14 @@ def enrollment_text(
 
     program_name = (
         program.en_name
-        if context.user_data["language_code"] == constants.EN
+        if context.language_code == constants.EN
         else program.ar_name
     )
 
-    return (
-        _("Year {} - {}").format(year.start, year.end)
-        + f"\n{program_name}\n{level_name}\n"
+    return ENROLLMENT.render(
+        context.language_code,
+        start=year.start,
+        end=year.end,
+        program=program_name,
+        level=level_name,
     )
@@ -0,0 +1,97 @@
+"""In process metrics, reported in the logs every `Config.METRICS_INTERVAL` seconds
+by :func:`src.jobs.report_metrics`"""
+
+import threading
+from typing import Callable, Union
+
+Number = Union[int, float]
+
+
+class Summary:
+    """The count, sum and maximum of the values observed since the last
+    :meth:`collect`"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: Number) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.maximum = max(self.maximum, value)
+
+    def collect(self) -> dict[str, Number]:
+        with self._lock:
+            values = {
+                f"{self.name}.count": self.count,
+                f"{self.name}.avg": self.total / self.count if self.count else 0.0,
+                f"{self.name}.max": self.maximum,
+            }
+            self._reset()
+        return values
+
+
+class Counter:
+    """Counts events since the last :meth:`collect`"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def collect(self) -> dict[str, Number]:
+        with self._lock:
+            values = {self.name: self.value}
+            self.value = 0
+        return values
+
+
+class Gauge:
+    """Reads a current value, e.g. the number of checked out connections, when
+    collected"""
+
+    def __init__(self, name: str, function: Callable[[], Number]):
+        self.name = name
+        self.function = function
+
+    def collect(self) -> dict[str, Number]:
+        return {self.name: self.function()}
+
+
+_registry: dict[str, Union[Summary, Counter, Gauge]] = {}
+
+
+def summary(name: str) -> Summary:
+    """Get or create the :class:`Summary` named :paramref:`name`"""
+    return _registry.setdefault(name, Summary(name))
+
+
+def counter(name: str) -> Counter:
+    """Get or create the :class:`Counter` named :paramref:`name`"""
+    return _registry.setdefault(name, Counter(name))
+
+
+def gauge(name: str, function: Callable[[], Number]) -> Gauge:
+    """Register :paramref:`function` as the :class:`Gauge` named :paramref:`name`"""
+    _registry[name] = Gauge(name, function)
+    return _registry[name]
+
+
+def collect() -> dict[str, Number]:
+    """The current values of all metrics, sorted by name. Resets the summaries and
+    counters."""
+    values = {}
+    for metric in _registry.values():
+        values.update(metric.collect())
+    return dict(sorted(values.items()))
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DDL, ForeignKey, UniqueConstraint, event
+from sqlalchemy import DDL, ForeignKey, Index, UniqueConstraint, event
 from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -19,6 +19,12 @@ class Enrollment(Base):
     __tablename__ = "enrollment"
     __table_args__ = (
         UniqueConstraint("user_id", "academic_year_id", name="_user_academic_year_uc"),
+        Index(
+            "enrollment_academic_year_id_program_semester_id_idx",
+            "academic_year_id",
+            "program_semester_id",
+            postgresql_include=["user_id"],
+        ),
     )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True, autoincrement=True)
@@ -66,24 +72,25 @@ class Enrollment(Base):
         )
 
 
+# Statement level, so that an `INSERT ... SELECT` of many enrollments (see
+# `src/rollover.py`) is checked by a single query over all its rows
 check_odd_semester = DDL(
     "CREATE OR REPLACE FUNCTION check_odd_semester() "
     "RETURNS TRIGGER AS $$ "
-    "DECLARE "
-    "semester_number INT; "
     "BEGIN "
-    "SELECT s.number INTO semester_number FROM program_semester AS ps "
+    "IF EXISTS (SELECT FROM new_enrollment AS e "
+    "INNER JOIN program_semester AS ps ON e.program_semester_id = ps.id "
     "INNER JOIN semester as s ON ps.semester_id = s.id "
-    "WHERE ps.id = NEW.program_semester_id; "
-    "IF MOD(semester_number, 2) = 0 THEN "
+    "WHERE MOD(s.number, 2) = 0) THEN "
     "RAISE EXCEPTION 'Cannot insert: Semester number must be odd'; "
     "END IF;"
-    "RETURN NEW; "
+    "RETURN NULL; "
     "END; $$ LANGUAGE PLPGSQL"
 )
 odd_semester = DDL(
-    "CREATE TRIGGER odd_semester BEFORE INSERT ON enrollment "
-    "FOR EACH ROW EXECUTE PROCEDURE check_odd_semester();"
+    "CREATE TRIGGER odd_semester AFTER INSERT ON enrollment "
+    "REFERENCING NEW TABLE AS new_enrollment "
+    "FOR EACH STATEMENT EXECUTE PROCEDURE check_odd_semester();"
 )
 
 
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -11,12 +11,29 @@ if TYPE_CHECKING:
 
 class File(Base):
     __tablename__ = "file"
+    __table_args__ = (
+        # matches the order files of a material are listed and paginated in
+        Index(
+            "file_material_id_type_name_id_idx", "material_id", "type", "name", "id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True, autoincrement=True)
     telegram_id: Mapped[str] = mapped_column(String(200), nullable=False)
     name: Mapped[str] = mapped_column(String(150), nullable=False)
     type: Mapped[str] = mapped_column(String(30), nullable=False)
     source: Mapped[str] = mapped_column(String(200), nullable=True, default=None)
+    # stable across bots and uploads, unlike `telegram_id`. Not unique, a file
+    # row belongs to a single material and the same file may be in several.
+    file_unique_id: Mapped[str] = mapped_column(
+        String(100), nullable=True, default=None, index=True
+    )
+    size: Mapped[int] = mapped_column(BigInteger, nullable=True, default=None)
+    mime_type: Mapped[str] = mapped_column(String(100), nullable=True, default=None)
+    # id of the message holding this file in `Config.ARCHIVE_CHANNEL_CHAT_ID`
+    archive_message_id: Mapped[int] = mapped_column(
+        Integer, nullable=True, default=None
+    )
 
     material_id: Mapped[int] = mapped_column(
         ForeignKey("material.id"),
@@ -5,7 +5,16 @@ from datetime import datetime
 from enum import unique
 from typing import TYPE_CHECKING, ClassVar
 
-from sqlalchemy import TIMESTAMP, Boolean, Date, ForeignKey, Integer, String
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.orm import Mapped, declared_attr, mapped_column, relationship
 from telegram.constants import MessageAttachmentType
 
@@ -49,6 +58,14 @@ class MaterialType(StringEnum):
 
 class Material(Base):
     __tablename__ = "material"
+    __table_args__ = (
+        Index(
+            "material_course_id_academic_year_id_type_idx",
+            "course_id",
+            "academic_year_id",
+            "type",
+        ),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
     type: Mapped[str] = mapped_column(init=False)
 
@@ -133,6 +150,13 @@ class Lab(HasId, Material, HasNumber, RefFilesMixin):
 
 class Assignment(HasId, Material, HasNumber, RefFilesMixin):
     __tablename__ = "assignment"
+    __table_args__ = (
+        Index(
+            "assignment_deadline_idx",
+            "deadline",
+            postgresql_where=text("deadline IS NOT NULL"),
+        ),
+    )
     deadline: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), nullable=True, default=None, sort_order=999
     )
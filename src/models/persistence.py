@@ -1,6 +1,19 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import JSON, ForeignKey, String, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    JSON,
+    TIMESTAMP,
+    BigInteger,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -25,11 +38,34 @@ class ChatData(Base):
 
 class UserData(Base):
     __tablename__ = "user_data"
+    __table_args__ = (
+        # serves keyset pagination of the users list, see `queries.users_page`
+        Index("user_data_full_name_user_id_idx", "full_name", "user_id"),
+        Index(
+            "user_data_full_name_trgm_idx",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "user_data_username_trgm_idx",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
+
     id: Mapped[int] = mapped_column(init=False, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("user.id"), nullable=False, default=None
     )
     data: Mapped[JSON] = mapped_column(JSON, nullable=False, default=None)
+    # `full_name` and `username` are denormalized copies of the values in `data`
+    # so that searching and sorting users can be served by an index.
+    full_name: Mapped[str] = mapped_column(
+        String(150), nullable=False, default="", server_default=""
+    )
+    username: Mapped[str] = mapped_column(String(50), nullable=True, default=None)
 
     user: Mapped["User"] = relationship(default=None, back_populates="user_data")
 
@@ -37,14 +73,35 @@ class UserData(Base):
         return f"UserData(id={self.id!r}, user={self.user!r}, data={self.data!r})"
 
 
+# trigram indexes on `user_data` depend on the pg_trgm extension
+create_pg_trgm = DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+event.listen(
+    UserData.__table__,
+    "before_create",
+    create_pg_trgm.execute_if(dialect="postgresql"),
+)
+
+
 class Conversation(Base):
     __tablename__ = "conversation"
-    __table_args__ = (UniqueConstraint("name", "key", name="_name_key_uc"),)
+    __table_args__ = (
+        UniqueConstraint("name", "key", name="_name_key_uc"),
+        # serves expiring the idle conversations of a handler
+        Index("conversation_name_updated_at_idx", "name", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(20), nullable=False)
-    key: Mapped[str] = mapped_column(String(100), nullable=False)
-    new_state: Mapped[str] = mapped_column(String(100), nullable=True, default=None)
+    # the `ConversationHandler` key, e.g. `(chat_id, user_id, message_id)`
+    key: Mapped[list[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    # ended conversations are deleted, so there is always a state
+    state: Mapped[JSON] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        init=False,
+        server_default=func.now(),
+    )
 
     def __repr__(self):
         return f"<Conversation (id={self.id})>"
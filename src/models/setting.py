@@ -18,6 +18,8 @@ class SettingKey(enum.Enum):
 
     # Enum members with (key, default value) as their values
     # Notification settings will automatically prepend the prefix
+    # Notification settings are stored as bits of `User.notification_mask`, in the
+    # order they are defined here, so new ones must be added last
     LECTURE = (NOTIFICATION_PREFIX + MaterialType.LECTURE, True)
     TUTORIAL = (NOTIFICATION_PREFIX + MaterialType.TUTORIAL, True)
     LAB = (NOTIFICATION_PREFIX + MaterialType.LAB, True)
@@ -41,6 +43,15 @@ class SettingKey(enum.Enum):
             and setting.key != cls.NOTIFICATION_PREFIX.key
         ]
 
+    @property
+    def bit(self) -> int:
+        """The bit of this notification setting in `User.notification_mask`"""
+        return 1 << SettingKey.get_notification_keys().index(self)
+
+
+ALL_NOTIFICATIONS = sum(key.bit for key in SettingKey.get_notification_keys())
+"""`User.notification_mask` with all notifications on, the default"""
+
 
 class Setting(Base):
     __tablename__ = "setting"
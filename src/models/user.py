@@ -1,11 +1,12 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, String
+from sqlalchemy import BigInteger, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src import constants
 
 from .base import Base
+from .setting import ALL_NOTIFICATIONS
 from .user_role import user_role
 
 if TYPE_CHECKING:
@@ -24,6 +25,13 @@ class User(Base):
     language_code: Mapped[str] = mapped_column(
         String(5), nullable=False, default=constants.EN
     )
+    # a bit per notification setting, see `SettingKey.bit`
+    notification_mask: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=ALL_NOTIFICATIONS,
+        server_default=str(ALL_NOTIFICATIONS),
+    )
 
     roles: Mapped[list["Role"]] = relationship(
         default_factory=list,
@@ -0,0 +1,166 @@
+"""Keyset pagination of SQLAlchemy selects for long inline keyboard menus"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Generic, Optional, TypeVar
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.orm import Session
+from telegram import InlineKeyboardButton
+
+if TYPE_CHECKING:
+    from src.buttons import Buttons
+
+T = TypeVar("T")
+
+CURSOR = r"[ab]\d+\.\d+"
+"""Pattern of a page cursor in `callback_data`. Handlers capture it with
+`(?:\?p=(?P<page>{CURSOR}))?`"""
+
+
+def parse_cursor(cursor: Optional[str]) -> tuple[Optional[str], Optional[int], int]:
+    """
+    Split a page cursor into its parts.
+
+    A cursor looks like `a12.3` (the page after the item with id `12`, which is page
+    number `3`) or `b12.1` (the page before the item with id `12`).
+
+    Returns:
+        tuple[:obj:`str` | :obj:`None`, :obj:`int` | :obj:`None`, :obj:`int`]: The
+        direction (`"a"` or `"b"`), the id of the item at the page boundary, and the
+        page number.
+    """
+    if not cursor:
+        return None, None, 1
+    item_id, number = cursor[1:].split(".")
+    return cursor[0], int(item_id), int(number)
+
+
+@dataclass
+class Page(Generic[T]):
+    items: Sequence[T]
+    count: int
+    number: int
+    number_of_pages: int
+    has_next: bool
+    has_previous: bool
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not (self.has_next and self.items):
+            return None
+        return f"a{self.items[-1].id}.{self.number + 1}"
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not (self.has_previous and self.items):
+            return None
+        return f"b{self.items[0].id}.{self.number - 1}"
+
+    def navigation(
+        self,
+        buttons: "Buttons",
+        url: str,
+        sep: str = "?p=",
+        end: str = "",
+        ignore_url: Optional[str] = None,
+        reverse: bool = False,
+    ) -> list[InlineKeyboardButton]:
+        """
+        Build the navigation row of this page.
+
+        Args:
+            buttons (:class:`Buttons`): Used to create the buttons.
+            url (:obj:`str`): The url of the paginated screen.
+            sep (:obj:`str`): Put between :paramref:`url` and the cursor.
+            end (:obj:`str`): Appended after the cursor, e.g. other query params.
+            ignore_url (:obj:`str`, optional): When given, a `current page` button
+                with this `callback_data` is put between the arrows.
+            reverse (:obj:`bool`): Reverse the row, for right-to-left languages.
+
+        Returns:
+            list[:class:`InlineKeyboardButton`]: Empty when there is only one page.
+        """
+        row = []
+        if not (self.has_next or self.has_previous):
+            return row
+        if cursor := self.previous_cursor:
+            row.append(buttons.previous_page(f"{url}{sep}{cursor}{end}"))
+        if ignore_url is not None:
+            row.append(
+                buttons.current_page(self.number, self.number_of_pages, ignore_url)
+            )
+        if cursor := self.next_cursor:
+            row.append(buttons.next_page(f"{url}{sep}{cursor}{end}"))
+        if reverse:
+            row.reverse()
+        return row
+
+
+def paginate(
+    session: Session,
+    stmt: Select,
+    order_by: Sequence,
+    size: int,
+    cursor: Optional[str] = None,
+    options: Sequence = (),
+) -> Page:
+    """
+    Fetch one page of the entities selected by :paramref:`stmt`.
+
+    Rows are located by their sort key rather than an offset, so only the page itself
+    is read whatever page the user is on.
+
+    Args:
+        session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
+        stmt (:obj:`Select`): A select of a single entity, without an `ORDER BY`.
+        order_by (Sequence): Ascending sort expressions. The last one must be the
+            primary key of the selected entity so that the order is total.
+        size (:obj:`int`): The page size.
+        cursor (:obj:`str`, optional): The cursor of the page, as produced by
+            :attr:`Page.next_cursor` or :attr:`Page.previous_cursor`. The first page
+            is returned when omitted.
+        options (Sequence): Loader options applied when fetching the items.
+
+    Returns:
+        :class:`Page`
+    """
+    direction, item_id, number = parse_cursor(cursor)
+
+    count = session.scalar(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    )
+    number_of_pages = max(1, -(-count // size))
+
+    page_stmt = stmt
+    if item_id is not None:
+        values = session.execute(
+            stmt.with_only_columns(*order_by, maintain_column_froms=True).where(
+                order_by[-1] == item_id
+            )
+        ).one_or_none()
+        if values is None:
+            # the boundary item is gone, start over
+            direction, number = None, 1
+        else:
+            row, bound = tuple_(*order_by), tuple_(*values)
+            page_stmt = stmt.where(row < bound if direction == "b" else row > bound)
+
+    backwards = direction == "b"
+    keys = [key.desc() for key in order_by] if backwards else order_by
+    items = list(
+        session.scalars(page_stmt.options(*options).order_by(*keys).limit(size + 1))
+    )
+    has_more = len(items) > size
+    items = items[:size]
+    if backwards:
+        items.reverse()
+
+    return Page(
+        items=items,
+        count=count,
+        number=min(number, number_of_pages),
+        number_of_pages=number_of_pages,
+        has_next=True if backwards else has_more,
+        has_previous=has_more if backwards else direction is not None,
+    )
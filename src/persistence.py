@@ -1,139 +1,414 @@
+import asyncio
+import hashlib
 import json
-from collections import defaultdict
+import time
+import uuid
+from collections.abc import Sequence
+from datetime import timedelta
 from logging import getLogger
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import select
-from sqlalchemy.orm import scoped_session, sessionmaker
-from telegram.ext import DictPersistence, PersistenceInput
+from sqlalchemy import delete, func, insert, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import sessionmaker
+from telegram.ext import BasePersistence, PersistenceInput
 
-from src import queries
-from src.database import engine
+from src.config import Config
+from src.database import persistence_engine
 from src.models import ChatData, Conversation, User, UserData
 
+TOUCH_INTERVAL = 24 * 60 * 60
+"""Seconds after which an unchanged conversation state is written again, to keep
+its `updated_at` fresh for :meth:`SQLPersistence.expire_conversations`"""
 
-class SQLPersistence(DictPersistence):
-    def __init__(
-        self,
-    ) -> None:
+CHANNEL = "persistence"
+"""The postgres channel the workers of a cluster announce their writes on"""
 
-        self.logger = getLogger(__name__)
+PROCESS = uuid.uuid4().hex
+"""Tells this process' announcements from the other workers'"""
+
+
+def _digest(data: dict) -> bytes:
+    """A fingerprint of :paramref:`data` as it is stored, compared against the live
+    data to tell whether it changed since it was written, without keeping a copy"""
+    serialized = json.dumps(data, sort_keys=True).encode()
+    return hashlib.blake2b(serialized, digest_size=16).digest()
+
+
+class _Row:
+    """The primary key of a persisted row and the :func:`_digest` of what was
+    written to it"""
+
+    __slots__ = ("id", "written")
+
+    def __init__(self, id: int, written: Optional[bytes]):
+        self.id = id
+        self.written = written
+
+
+class _Stale:
+    """The ids whose data another worker wrote since this one loaded it"""
+
+    __slots__ = ("everything", "fresh", "ids")
+
+    def __init__(self) -> None:
+        self.ids: set[int] = set()
+        # when announcements may have been missed, every id is stale but the ones
+        # refreshed since
+        self.everything = False
+        self.fresh: set[int] = set()
+
+    def add(self, id: int) -> None:
+        self.ids.add(id)
+        self.fresh.discard(id)
+
+    def add_all(self) -> None:
+        self.everything = True
+        self.ids.clear()
+        self.fresh.clear()
+
+    def pop(self, id: int) -> bool:
+        """Whether :paramref:`id` is stale, it is no longer afterwards"""
+        if self.everything:
+            if id in self.fresh:
+                return False
+            self.fresh.add(id)
+            return True
+        if id in self.ids:
+            self.ids.remove(id)
+            return True
+        return False
+
+
+class SQLPersistence(BasePersistence[dict, dict, dict]):
+    """Persists `user_data`, `chat_data` and conversation states to the
+    `user_data`, `chat_data` and `conversation` tables.
 
-        self.session = scoped_session(sessionmaker(bind=engine, autoflush=False))
-        chat_data_json = json.dumps(self._load_chat_data())
-        user_data_json = json.dumps(self._load_user_data())
-        conversations_json = json.dumps(self._load_conversations())
-        self.logger.info("Database loaded successfully!")
+    The data itself lives only in the application's dicts, which are handed over
+    as loaded. This class keeps, per persisted row, its primary key and a digest
+    of the last write, so that an unchanged dict costs no query and a changed one
+    a single `UPDATE` by primary key. Conversation states are upserted by
+    `(name, key)`, and deleted when the conversation ends.
 
+    In a cluster, see `src/cluster.py`, only the conversations of the chats routed
+    to :paramref:`worker` are loaded and expired, and the writes are announced with
+    `NOTIFY`, so that the other workers reload their copy of the data before it is
+    used next.
+
+    Args:
+        worker (:obj:`int`, optional): The index of this worker of the cluster.
+    """
+
+    def __init__(self, worker: Optional[int] = None) -> None:
         super().__init__(
-            chat_data_json=chat_data_json,
-            user_data_json=user_data_json,
-            conversations_json=conversations_json,
             store_data=PersistenceInput(
                 user_data=True, chat_data=True, bot_data=False, callback_data=False
-            ),
+            )
         )
+        self.logger = getLogger(__name__)
+        self.Session = sessionmaker(bind=persistence_engine, autoflush=False)
+        self.worker = worker
+
+        self._user_rows: dict[int, _Row] = {}
+        self._chat_rows: dict[int, _Row] = {}
+        # the state and `time.monotonic()` of the last write of each conversation
+        self._conversations: dict[
+            tuple[str, tuple[int, ...]], tuple[object, float]
+        ] = {}
+        self._stale_users = _Stale()
+        self._stale_chats = _Stale()
+        self._reconnecting: Optional[asyncio.Task] = None
+
+    def _owned(self):
+        """Filters the conversations routed to this worker, by their chat id or,
+        without one, user id, as :func:`src.cluster.shard` does"""
+        if self.worker is None:
+            return true()
+        return func.abs(Conversation.key[1]) % Config.CLUSTER_WORKERS == self.worker
+
+    def _announce(self, session, kind: str, id: int) -> None:
+        if self.worker is not None:
+            session.execute(select(func.pg_notify(CHANNEL, f"{PROCESS} {kind} {id}")))
+
+    # ---------------------------- announcements ------------------------------
+
+    async def listen(self) -> None:
+        """Starts receiving the writes announced by the other workers"""
+        self._listen()
 
-    def _load_user_data(self) -> dict:
+    def _listen(self) -> None:
+        dialect = persistence_engine.dialect
+        args, kwargs = dialect.create_connect_args(persistence_engine.url)
+        connection = dialect.connect(*args, **kwargs)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        asyncio.get_running_loop().add_reader(
+            connection.fileno(), self._receive, connection
+        )
+
+    def _receive(self, connection) -> None:
+        try:
+            connection.poll()
+        except Exception:
+            self.logger.exception("Lost the announcements connection, reconnecting")
+            asyncio.get_running_loop().remove_reader(connection.fileno())
+            connection.close()
+            self._stale_users.add_all()
+            self._stale_chats.add_all()
+            self._reconnecting = asyncio.create_task(self._reconnect())
+            return
+        while connection.notifies:
+            process, kind, id = connection.notifies.pop(0).payload.split()
+            if process == PROCESS:
+                continue
+            (self._stale_users if kind == "user" else self._stale_chats).add(int(id))
+
+    async def _reconnect(self) -> None:
+        delay = 1
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                self._listen()
+            except Exception:
+                delay = min(delay * 2, 60)
+                self.logger.exception(
+                    "Could not listen for announcements, retrying in %ss", delay
+                )
+                continue
+            # the announcements sent until `LISTEN` are lost, everything is reloaded
+            self._stale_users.add_all()
+            self._stale_chats.add_all()
+            self.logger.info("Listening for announcements again")
+            return
+
+    # ------------------------------ loading ----------------------------------
+
+    async def get_user_data(self) -> dict[int, dict]:
         data = {}
-        user_datas = self.session.query(UserData).all()
-        for user_data in user_datas:
-            data[user_data.user.telegram_id] = user_data.data
+        with self.Session() as session:
+            for telegram_id, row_id, user_data in session.execute(
+                select(User.telegram_id, UserData.id, UserData.data).join(User)
+            ):
+                data[telegram_id] = user_data
+                self._user_rows[telegram_id] = _Row(row_id, _digest(user_data))
+        self.logger.info("Loaded %s user_data", len(data))
         return data
 
-    def _load_chat_data(self) -> dict:
+    async def get_chat_data(self) -> dict[int, dict]:
         data = {}
-        chat_datas = self.session.query(ChatData).all()
-        for chat_data in chat_datas:
-            data[chat_data.user.chat_id] = chat_data.data
+        with self.Session() as session:
+            for chat_id, row_id, chat_data in session.execute(
+                select(User.chat_id, ChatData.id, ChatData.data).join(User)
+            ):
+                data[chat_id] = chat_data
+                self._chat_rows[chat_id] = _Row(row_id, _digest(chat_data))
+        self.logger.info("Loaded %s chat_data", len(data))
         return data
 
-    def _load_conversations(self) -> dict:
-        data = defaultdict(dict)
-        conversations = (
-            self.session.query(Conversation).order_by(Conversation.name).all()
-        )
-        for conversation in conversations:
-            data[conversation.name][conversation.key] = json.loads(
-                conversation.new_state
-            )
-        return data
+    async def get_bot_data(self) -> dict:
+        return {}
 
-    async def update_user_data(self, user_id: int, data: dict) -> None:
-        """Will update the user_data (if changed).
-        Args:
-            user_id (:obj:`int`): The user the data might have been changed for.
-            data (:obj:`dict`): The :attr:`telegram.ext.Dispatcher.user_data`
-            ``[user_id]``.
-        """
-        await super().update_user_data(user_id, data)
-        user_data = self.session.scalar(
-            select(UserData).join(User).filter(User.telegram_id == user_id)
-        )
+    async def get_callback_data(self) -> None:
+        return None
 
-        if user_data is None:
-            user_data = UserData(
-                user=queries.user(self.session, telegram_id=user_id),
-                data={},
-            )
-            self.session.add(user_data)
+    async def get_conversations(self, name: str) -> dict[tuple[int, ...], object]:
+        data = {}
+        now = time.monotonic()
+        with self.Session() as session:
+            for key, state in session.execute(
+                select(Conversation.key, Conversation.state).where(
+                    Conversation.name == name, self._owned()
+                )
+            ):
+                data[tuple(key)] = state
+                self._conversations[(name, tuple(key))] = (state, now)
+        return data
+
+    # ------------------------------ writing ----------------------------------
 
-        if user_data.data == data:
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        row = self._user_rows.get(user_id)
+        digest = _digest(data)
+        if row is not None and row.written == digest:
             return
 
-        user_data.data = data
-        self.session.commit()
+        values = {
+            "data": data,
+            "full_name": data.get("full_name") or "",
+            "username": data.get("username"),
+        }
+        with self.Session.begin() as session:
+            if row is not None:
+                session.execute(
+                    update(UserData).where(UserData.id == row.id).values(values)
+                )
+            else:
+                db_user_id = data.get("id") or session.scalar(
+                    select(User.id).where(User.telegram_id == user_id)
+                )
+                if db_user_id is None:
+                    return
+                row = _Row(
+                    session.scalar(
+                        insert(UserData)
+                        .values(user_id=db_user_id, **values)
+                        .returning(UserData.id)
+                    ),
+                    None,
+                )
+            self._announce(session, "user", user_id)
+        row.written = digest
+        self._user_rows[user_id] = row
 
     async def update_chat_data(self, chat_id: int, data: dict) -> None:
-        """Will update the chat_data (if changed).
-        Args:
-            chat_id (:obj:`int`): The chat the data might have been changed for.
-            data (:obj:`dict`): The :attr:`telegram.ext.Dispatcher.chat_data`
-            ``[chat_id]``.
-        """
-        await super().update_chat_data(chat_id, data)
-        chat_data = self.session.scalar(
-            select(ChatData).join(User).filter(User.chat_id == chat_id)
-        )
-
-        if chat_data is None:
-            chat_data = ChatData(
-                user=self.session.scalar(select(User).where(User.chat_id == chat_id)),
-                data={},
-            )
-            self.session.add(chat_data)
-
-        if chat_data.data == data:
+        row = self._chat_rows.get(chat_id)
+        digest = _digest(data)
+        if row is not None and row.written == digest:
             return
 
-        chat_data.data = data
-        self.session.commit()
+        with self.Session.begin() as session:
+            if row is not None:
+                session.execute(
+                    update(ChatData).where(ChatData.id == row.id).values(data=data)
+                )
+            else:
+                db_user_id = session.scalar(
+                    select(User.id).where(User.chat_id == chat_id)
+                )
+                if db_user_id is None:
+                    return
+                row = _Row(
+                    session.scalar(
+                        insert(ChatData)
+                        .values(user_id=db_user_id, data=data)
+                        .returning(ChatData.id)
+                    ),
+                    None,
+                )
+            self._announce(session, "chat", chat_id)
+        row.written = digest
+        self._chat_rows[chat_id] = row
 
     async def update_conversation(
         self, name: str, key: tuple[int, ...], new_state: Optional[object]
     ) -> None:
-        """Will update the conversations for the given handler.
-        Args:
-            name (:obj:`str`): The handler's name.
-            key (:obj:`tuple`): The key the state is changed for.
-            new_state (:obj:`tuple` | :obj:`any`): The new state for the given key.
-        """
-        await super().update_conversation(name, key, new_state)
-        key_json = json.dumps(key)
-        new_state_json = json.dumps(new_state)
-        conv = self.session.scalar(
-            select(Conversation).filter(
-                (Conversation.name == name) & (Conversation.key == key_json)
+        written = self._conversations.get((name, key))
+        if new_state is None:
+            if written is None:
+                return
+            with self.Session.begin() as session:
+                session.execute(
+                    delete(Conversation).where(
+                        Conversation.name == name, Conversation.key == list(key)
+                    )
+                )
+            del self._conversations[(name, key)]
+            return
+
+        now = time.monotonic()
+        if (
+            written is not None
+            and written[0] == new_state
+            and now - written[1] < TOUCH_INTERVAL
+        ):
+            return
+
+        with self.Session.begin() as session:
+            session.execute(
+                pg_insert(Conversation)
+                .values(name=name, key=list(key), state=new_state)
+                .on_conflict_do_update(
+                    constraint="_name_key_uc",
+                    set_={"state": new_state, "updated_at": func.now()},
+                )
             )
-        )
+        self._conversations[(name, key)] = (new_state, now)
 
-        if conv is None:
-            conv = Conversation(name=name, key=key_json)
-            self.session.add(conv)
+    async def expire_conversations(
+        self, names: Sequence[str], idle: timedelta
+    ) -> list[tuple[str, tuple[int, ...]]]:
+        """Deletes the conversations of the handlers named :paramref:`names` that
+        were not updated for :paramref:`idle`.
 
-        if conv.new_state == new_state_json:
+        Returns:
+            list[tuple[:obj:`str`, tuple[:obj:`int`, ...]]]: The names and keys of
+            the deleted conversations.
+        """
+        with self.Session.begin() as session:
+            expired = [
+                (name, tuple(key))
+                for name, key in session.execute(
+                    delete(Conversation)
+                    .where(
+                        Conversation.name.in_(names),
+                        Conversation.updated_at < func.now() - idle,
+                        self._owned(),
+                    )
+                    .returning(Conversation.name, Conversation.key)
+                )
+            ]
+        for name_key in expired:
+            self._conversations.pop(name_key, None)
+        return expired
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def drop_user_data(self, user_id: int) -> None:
+        if (row := self._user_rows.pop(user_id, None)) is None:
+            return
+        with self.Session.begin() as session:
+            session.execute(delete(UserData).where(UserData.id == row.id))
+            self._announce(session, "user", user_id)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        if (row := self._chat_rows.pop(chat_id, None)) is None:
+            return
+        with self.Session.begin() as session:
+            session.execute(delete(ChatData).where(ChatData.id == row.id))
+            self._announce(session, "chat", chat_id)
+
+    # the database is only written by this class, only what other workers wrote
+    # is refreshed
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        if not self._stale_users.pop(user_id):
+            return
+        with self.Session() as session:
+            row = session.execute(
+                select(UserData.id, UserData.data)
+                .join(User)
+                .where(User.telegram_id == user_id)
+            ).one_or_none()
+        user_data.clear()
+        if row is None:
+            self._user_rows.pop(user_id, None)
+            return
+        user_data.update(row.data)
+        self._user_rows[user_id] = _Row(row.id, _digest(row.data))
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        if not self._stale_chats.pop(chat_id):
+            return
+        with self.Session() as session:
+            row = session.execute(
+                select(ChatData.id, ChatData.data)
+                .join(User)
+                .where(User.chat_id == chat_id)
+            ).one_or_none()
+        chat_data.clear()
+        if row is None:
+            self._chat_rows.pop(chat_id, None)
             return
+        chat_data.update(row.data)
+        self._chat_rows[chat_id] = _Row(row.id, _digest(row.data))
 
-        conv.new_state = new_state_json
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
 
-        self.session.commit()
+    async def flush(self) -> None:
+        pass
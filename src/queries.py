@@ -1,15 +1,18 @@
 from collections.abc import Sequence
+from datetime import datetime
 from typing import Optional, Union
 
-from sqlalchemy import String, and_, case, cast, or_, select
-from sqlalchemy.orm import InstrumentedAttribute, Session, aliased
+from sqlalchemy import Numeric, Select, and_, case, cast, func, lambda_stmt, or_, select
+from sqlalchemy.orm import InstrumentedAttribute, Session, aliased, contains_eager
 
 from src.models import (
     AcademicYear,
     AccessRequest,
+    Assignment,
     Course,
     Department,
     Enrollment,
+    File,
     Lecture,
     Material,
     Program,
@@ -23,6 +26,14 @@ from src.models import (
     UserData,
     UserOptionalCourse,
 )
+from src.pagination import Page, paginate
+
+# Hot queries are built with `lambda_stmt`: their lambdas run once, later calls
+# only extract the values of their closure variables as bound parameters and
+# reuse the cached statement and its compiled SQL.
+
+_sub_semester = aliased(Semester)
+_sub_program_semester = aliased(ProgramSemester)
 
 
 def semesters(
@@ -109,37 +120,78 @@ def semester(
     )
 
 
-def users(session: Session, query: Optional[str] = None) -> list[User]:
+def _users_statement(query: Optional[str] = None) -> tuple[Select, list]:
+    """
+    Build the statement listing :obj:`User`s along with the expressions it is
+    sorted by, optionally filtered and ranked by :paramref:`query`.
+
+    The sort keys are all ascending and end with `UserData.user_id`, so they
+    uniquely order the rows and can be used as a keyset cursor.
+    """
+    stmt = select(User).join(UserData)
+    keys = [UserData.full_name, UserData.user_id]
+    if query is None:
+        return stmt, keys
+
+    telegram_id = int(query) if query.isnumeric() else None
+    pattern = f"%{query}%"
+    # `similarity` is a float4, which doesn't survive the round trip through the
+    # keyset cursor as a float8, `numeric` compares equal to itself
+    rank = cast(
+        func.greatest(
+            func.similarity(UserData.full_name, query),
+            func.similarity(func.coalesce(UserData.username, ""), query),
+        ),
+        Numeric,
+    )
+    stmt = stmt.filter(
+        or_(
+            User.telegram_id == telegram_id,
+            UserData.username.ilike(pattern),
+            UserData.full_name.ilike(pattern),
+        )
+    )
+    keys.insert(0, -rank)
+    if telegram_id is not None:
+        keys.insert(0, case((User.telegram_id == telegram_id, 0), else_=1))
+    return stmt, keys
+
+
+def users_page(
+    session: Session,
+    query: Optional[str] = None,
+    cursor: Optional[str] = None,
+    size: int = 30,
+) -> Page[User]:
     """
-    Query all :obj:`User`s
+    Query a single page of :obj:`User`s, with their `User.user_data` loaded in the
+    same query.
+
+    Users are searched by telegram id, username or full name, with `ILIKE` on the
+    indexed `UserData.full_name` and `UserData.username` columns (served by their
+    pg_trgm indexes), and ranked by trigram similarity to :paramref:`query`. An
+    exact telegram id match always comes first.
 
     Args:
         session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
-        query (:obj:`str`): A string to filter users against. Could be either
-            `User.telegram_id`, `UserData.username`, or `UserData.full_name`.
+        query (:obj:`str`, optional): A string to filter users against. Could be
+            either `User.telegram_id`, `UserData.username`, or `UserData.full_name`.
+        cursor (:obj:`str`, optional): The page cursor, see
+            :func:`src.pagination.paginate`.
+        size (:obj:`int`): The page size.
 
     Returns:
-        List[:obj:`User`]
+        :class:`Page` [:obj:`User`]
     """
-    order = cast(UserData.data["full_name"], String).asc()
-    if query is None:
-        return session.scalars(
-            select(User).select_from(UserData).join(User).order_by(order)
-        ).all()
-    telegram_id = int(query) if query.isnumeric() else None
-    return session.scalars(
-        select(User)
-        .select_from(UserData)
-        .join(User)
-        .filter(
-            or_(
-                User.telegram_id == telegram_id,
-                cast(UserData.data["username"], String).ilike(f"%{query}%"),
-                cast(UserData.data["full_name"], String).ilike(f"%{query}%"),
-            )
-        )
-        .order_by(order)
-    ).all()
+    stmt, keys = _users_statement(query)
+    return paginate(
+        session,
+        stmt,
+        order_by=keys,
+        size=size,
+        cursor=cursor,
+        options=[contains_eager(User.user_data)],
+    )
 
 
 def user(
@@ -375,35 +427,44 @@ def user_courses(
 
     """
     # Temporarly return courses for the two semesters
-    number = session.scalar(select(Semester.number).where(Semester.id == semester_id))
+    number = session.scalar(
+        lambda_stmt(lambda: select(Semester.number).where(Semester.id == semester_id))
+    )
     numbers = [number, number + (-1 if number % 2 == 0 else 1)]
     return session.scalars(
-        select(Course)
-        .select_from(ProgramSemesterCourse)
-        .outerjoin(
-            UserOptionalCourse,
-            (UserOptionalCourse.program_semester_course_id == ProgramSemesterCourse.id)
-            & (UserOptionalCourse.user_id == user_id),
-        )
-        .join(Course)
-        .join(Semester)
-        .where(
-            and_(
-                ProgramSemesterCourse.program_id == program_id,
-                Semester.number.in_(numbers),
-                or_(
-                    ProgramSemesterCourse.optional == False,  # noqa: E712
-                    and_(
-                        (ProgramSemesterCourse.optional == True),  # noqa: E712
-                        (
-                            UserOptionalCourse.program_semester_course_id
-                            == ProgramSemesterCourse.id
+        lambda_stmt(
+            lambda: select(Course)
+            .select_from(ProgramSemesterCourse)
+            .outerjoin(
+                UserOptionalCourse,
+                (
+                    UserOptionalCourse.program_semester_course_id
+                    == ProgramSemesterCourse.id
+                )
+                & (UserOptionalCourse.user_id == user_id),
+            )
+            .join(Course)
+            .join(Semester)
+            .where(
+                and_(
+                    ProgramSemesterCourse.program_id == program_id,
+                    Semester.number.in_(numbers),
+                    or_(
+                        ProgramSemesterCourse.optional == False,  # noqa: E712
+                        and_(
+                            (ProgramSemesterCourse.optional == True),  # noqa: E712
+                            (
+                                UserOptionalCourse.program_semester_course_id
+                                == ProgramSemesterCourse.id
+                            ),
                         ),
                     ),
                 ),
-            ),
+            )
+            .order_by(
+                ProgramSemesterCourse.optional, Semester.number.desc(), sort_attr
+            )
         )
-        .order_by(ProgramSemesterCourse.optional, Semester.number.desc(), sort_attr)
     ).all()
 
 
@@ -422,35 +483,39 @@ def all_have_editors(
     Returns:
         :obj:`bool`
     """
-    sub_semester = aliased(Semester)
+    course_ids, academic_year_id = list(course_ids), academic_year.id
     courses_with_editors = session.scalars(
-        select(ProgramSemesterCourse.course_id)
-        .join(Semester)
-        .join(
-            ProgramSemester,
-            and_(
-                ProgramSemester.program_id == ProgramSemesterCourse.program_id,
-                ProgramSemester.semester_id.in_(
-                    select(sub_semester.id).filter(
-                        sub_semester.number.in_(
-                            [
-                                Semester.number,
-                                Semester.number
-                                + case((Semester.number % 2 == 0, -1), else_=1),
-                            ]
+        lambda_stmt(
+            lambda: select(ProgramSemesterCourse.course_id)
+            .join(Semester)
+            .join(
+                ProgramSemester,
+                and_(
+                    ProgramSemester.program_id == ProgramSemesterCourse.program_id,
+                    ProgramSemester.semester_id.in_(
+                        select(_sub_semester.id).filter(
+                            _sub_semester.number.in_(
+                                [
+                                    Semester.number,
+                                    Semester.number
+                                    + case((Semester.number % 2 == 0, -1), else_=1),
+                                ]
+                            )
                         )
-                    )
+                    ),
                 ),
-            ),
-        )
-        .join(Enrollment, Enrollment.program_semester_id == ProgramSemester.id)
-        .join(AccessRequest, AccessRequest.enrollment_id == Enrollment.id, full=True)
-        .filter(
-            ProgramSemesterCourse.course_id.in_(list(course_ids)),
-            Enrollment.academic_year_id == academic_year.id,
-            AccessRequest.status == Status.GRANTED,
+            )
+            .join(Enrollment, Enrollment.program_semester_id == ProgramSemester.id)
+            .join(
+                AccessRequest, AccessRequest.enrollment_id == Enrollment.id, full=True
+            )
+            .filter(
+                ProgramSemesterCourse.course_id.in_(course_ids),
+                Enrollment.academic_year_id == academic_year_id,
+                AccessRequest.status == Status.GRANTED,
+            )
+            .group_by(ProgramSemesterCourse.course_id)
         )
-        .group_by(ProgramSemesterCourse.course_id)
     ).all()
 
     return set(course_ids) == set(courses_with_editors)
@@ -559,28 +624,6 @@ def enrollment(session: Session, enrollment_id: int) -> Enrollment:
     return session.get(Enrollment, enrollment_id)
 
 
-def department_courses(
-    session: Session, department_id: Optional[int] = None
-) -> list[Course]:
-    """
-    Query multiple :obj:`Course`s of a particular `Department` sorted descendingly by
-    `Course.en_name`.
-
-    Args:
-        session (:class:`Session`): An `sqlalchemy.orm.Session` instance.
-        department_id (:obj:`int`, optional): The department id to filter against`
-
-    Returns:
-        list[:obj:`Course`]:
-
-    """
-    return session.scalars(
-        select(Course)
-        .where(Course.department_id == department_id)
-        .order_by(Course.en_name)
-    ).all()
-
-
 def has_optional_courses(
     session: Session,
     program_id: int,
@@ -812,6 +855,167 @@ def lectures(session: Session, course_id: int, year_id: int) -> list[str]:
     ).all()
 
 
+def assignments(
+    session: Session,
+    program_id: int,
+    semester_numbers: Sequence[int],
+    start: datetime,
+    end: Optional[datetime] = None,
+) -> list[Assignment]:
+    """
+    Query published :obj:`Assignment`s of the courses of a program in the given
+    semesters, whose deadline is in a given range, ordered by deadline.
+
+    Args:
+        session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
+        program_id (:obj:`int`): The program id.
+        semester_numbers (Sequence[:obj:`int`]): The semester numbers.
+        start (:obj:`datetime`): The earliest deadline.
+        end (:obj:`datetime`, optional): The latest deadline.
+
+    Returns:
+        list[:obj:`Assignment`]
+    """
+    semester_numbers = list(semester_numbers)
+    stmt = lambda_stmt(
+        lambda: select(Assignment)
+        .join(
+            ProgramSemesterCourse,
+            and_(
+                ProgramSemesterCourse.course_id == Assignment.course_id,
+                ProgramSemesterCourse.program_id == program_id,
+            ),
+        )
+        .join(Semester)
+        .where(
+            Assignment.published,
+            Assignment.deadline >= start,
+            Semester.number.in_(semester_numbers),
+        )
+    )
+    if end is not None:
+        stmt += lambda s: s.where(Assignment.deadline <= end)
+    stmt += lambda s: s.order_by(Assignment.deadline.asc())
+    return session.scalars(stmt).all()
+
+
+def due_assignments(
+    session: Session, start: datetime, end: datetime
+) -> list[Assignment]:
+    """
+    Query published :obj:`Assignment`s whose deadline is in `[start, end)`.
+
+    Args:
+        session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
+        start (:obj:`datetime`): The earliest deadline.
+        end (:obj:`datetime`): The deadline upper bound, excluded.
+
+    Returns:
+        list[:obj:`Assignment`]
+    """
+    return session.scalars(
+        lambda_stmt(
+            lambda: select(Assignment).where(
+                Assignment.published,
+                Assignment.deadline >= start,
+                Assignment.deadline < end,
+            )
+        )
+    ).all()
+
+
+def assignment_users(
+    session: Session, assignment_id: int, academic_year_id: int
+) -> list[User]:
+    """
+    Query the :obj:`User`s enrolled, in a given year, in the program and semester
+    (or its pair semester) of an :obj:`Assignment`'s course.
+
+    Args:
+        session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
+        assignment_id (:obj:`int`): The assignment id.
+        academic_year_id (:obj:`int`): The academic year id.
+
+    Returns:
+        list[:obj:`User`]
+    """
+    return session.scalars(
+        lambda_stmt(
+            lambda: select(User)
+            .select_from(Assignment)
+            .join(Course)
+            .join(ProgramSemesterCourse)
+            .join(
+                ProgramSemester,
+                and_(
+                    ProgramSemester.program_id == ProgramSemesterCourse.program_id,
+                    ProgramSemester.semester_id == ProgramSemesterCourse.semester_id,
+                ),
+            )
+            .join(Semester)
+            .join(
+                Enrollment,
+                Enrollment.program_semester_id.in_(
+                    select(_sub_program_semester.id)
+                    .join(_sub_semester)
+                    .where(
+                        _sub_program_semester.program_id == ProgramSemester.program_id,
+                        _sub_semester.number.in_(
+                            [
+                                Semester.number,
+                                Semester.number
+                                + case((Semester.number % 2 == 0, -1), else_=1),
+                            ]
+                        ),
+                    )
+                ),
+            )
+            .join(User, Enrollment.user_id == User.id)
+            .where(
+                Assignment.id == assignment_id,
+                Enrollment.academic_year_id == academic_year_id,
+            )
+            .group_by(User)
+        )
+    ).all()
+
+
+def uploaded_files(
+    session: Session,
+    file_unique_ids: Sequence[str],
+    material_id: Optional[int] = None,
+    MaterialClass: Optional[type[Material]] = None,
+    course_id: Optional[int] = None,
+    academic_year_id: Optional[int] = None,
+) -> list[File]:
+    """
+    Query the :obj:`File`s with any of the given `File.file_unique_id`s, that are
+    already uploaded either to a material, or as single file materials of a course
+    in a given year.
+
+    Args:
+        session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
+        file_unique_ids (Sequence[:obj:`str`]): The `file_unique_id`s to look for.
+        material_id (:obj:`int`, optional): The material the files belong to.
+        MaterialClass (type[:obj:`Material`], optional): A `SingleFile` material
+            class. Requires :paramref:`course_id` and :paramref:`academic_year_id`.
+        course_id (:obj:`int`, optional): The course id.
+        academic_year_id (:obj:`int`, optional): The academic year id.
+
+    Returns:
+        list[:obj:`File`]
+    """
+    stmt = select(File).where(File.file_unique_id.in_(file_unique_ids))
+    if material_id is not None:
+        stmt = stmt.where(File.material_id == material_id)
+    if MaterialClass is not None:
+        stmt = stmt.join(MaterialClass, MaterialClass.file_id == File.id).where(
+            MaterialClass.course_id == course_id,
+            MaterialClass.academic_year_id == academic_year_id,
+        )
+    return session.scalars(stmt).all()
+
+
 def user_optional_courses(session: Session, user_id: int) -> list[UserOptionalCourse]:
     """
     Query multiple :obj:`UserOptionalCourse`s of a given user.
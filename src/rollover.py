@@ -0,0 +1,182 @@
+"""Enrolls the students of an academic year in the next one, all at once, instead
+of each of them re-enrolling through /enrollments at the start of the year.
+
+A student enrolled in a year is enrolled in the next one in the first semester of
+their next level, in the same program. Students whose program has no such semester
+(i.e. graduates) and those already enrolled in the next year are left out.
+"""
+
+from typing import NamedTuple
+
+from sqlalchemy import Select, and_, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from src.models import AcademicYear, Enrollment, Program, ProgramSemester, Semester
+
+
+def _candidates(from_year_id: int, to_year_id: int) -> Select:
+    """A row per enrollment of the year :paramref:`from_year_id`, with the program
+    semester to enroll its student in (`None` when there is none), and whether the
+    student is already enrolled in the year :paramref:`to_year_id`"""
+    current_program_semester = aliased(ProgramSemester)
+    current_semester = aliased(Semester)
+    next_semester = aliased(Semester)
+    next_program_semester = aliased(ProgramSemester)
+    enrolled = aliased(Enrollment)
+    return (
+        select(
+            Enrollment.user_id,
+            current_program_semester.program_id,
+            next_semester.number,
+            next_program_semester.id.label("program_semester_id"),
+            enrolled.id.is_not(None).label("enrolled"),
+        )
+        .join(
+            current_program_semester,
+            Enrollment.program_semester_id == current_program_semester.id,
+        )
+        .join(
+            current_semester,
+            current_program_semester.semester_id == current_semester.id,
+        )
+        # the odd semester of the next level, for the odd and the even semester of a
+        # level: 1, 2 -> 3
+        .outerjoin(
+            next_semester,
+            next_semester.number == (current_semester.number + 1) // 2 * 2 + 1,
+        )
+        .outerjoin(
+            next_program_semester,
+            and_(
+                next_program_semester.program_id == current_program_semester.program_id,
+                next_program_semester.semester_id == next_semester.id,
+            ),
+        )
+        .outerjoin(
+            enrolled,
+            and_(
+                enrolled.user_id == Enrollment.user_id,
+                enrolled.academic_year_id == to_year_id,
+            ),
+        )
+        .where(Enrollment.academic_year_id == from_year_id)
+    )
+
+
+class Report(NamedTuple):
+    """What :func:`rollover` does, or did"""
+
+    enrollments: int
+    """Enrollments of the year rolled over"""
+    already_enrolled: int
+    """Students already enrolled in the next year"""
+    graduating: int
+    """Students whose program has no next level"""
+    to_enroll: dict[tuple[str, int], int]
+    """Students to enroll, by program name and semester number"""
+
+
+def _check_years(session: Session, from_year_id: int, to_year_id: int) -> None:
+    from_year = session.get(AcademicYear, from_year_id)
+    to_year = session.get(AcademicYear, to_year_id)
+    if from_year is None or to_year is None:
+        raise ValueError("Unknown academic year")
+    if to_year.start < from_year.end:
+        raise ValueError(
+            f"Year {to_year.start} - {to_year.end} doesn't follow "
+            f"{from_year.start} - {from_year.end}"
+        )
+
+
+def report(session: Session, from_year_id: int, to_year_id: int) -> Report:
+    """
+    Reports, without changing anything, what rolling the year
+    :paramref:`from_year_id` over into :paramref:`to_year_id` would do.
+
+    Args:
+        session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
+        from_year_id (:obj:`int`): The academic year rolled over.
+        to_year_id (:obj:`int`): The academic year to enroll the students in.
+
+    Raises:
+        `ValueError` when a year doesn't exist, or :paramref:`to_year_id` doesn't
+            come after :paramref:`from_year_id`
+
+    Returns:
+        :obj:`Report`
+    """
+    _check_years(session, from_year_id, to_year_id)
+    candidates = _candidates(from_year_id, to_year_id).subquery()
+    rows = session.execute(
+        select(
+            Program.en_name,
+            candidates.c.number,
+            candidates.c.program_semester_id.is_not(None),
+            candidates.c.enrolled,
+            func.count(),
+        )
+        .select_from(candidates)
+        .join(Program, Program.id == candidates.c.program_id)
+        .group_by(
+            Program.en_name,
+            candidates.c.number,
+            candidates.c.program_semester_id.is_not(None),
+            candidates.c.enrolled,
+        )
+    )
+
+    enrollments = already_enrolled = graduating = 0
+    to_enroll: dict[tuple[str, int], int] = {}
+    for program_name, number, has_next, enrolled, count in rows:
+        enrollments += count
+        if enrolled:
+            already_enrolled += count
+        elif not has_next:
+            graduating += count
+        else:
+            to_enroll[(program_name, number)] = count
+    return Report(
+        enrollments, already_enrolled, graduating, dict(sorted(to_enroll.items()))
+    )
+
+
+def rollover(
+    session: Session, from_year_id: int, to_year_id: int
+) -> tuple[Report, int]:
+    """
+    Enrolls the students of the year :paramref:`from_year_id` in
+    :paramref:`to_year_id`, with a single `INSERT ... SELECT`. Students that enroll
+    themselves meanwhile are skipped rather than failing the statement.
+
+    Args:
+        session (:obj:`Session`): An `sqlalchemy.orm.Session` instance.
+        from_year_id (:obj:`int`): The academic year rolled over.
+        to_year_id (:obj:`int`): The academic year to enroll the students in.
+
+    Raises:
+        `ValueError` when a year doesn't exist, or :paramref:`to_year_id` doesn't
+            come after :paramref:`from_year_id`
+
+    Returns:
+        tuple[:obj:`Report`, :obj:`int`]: The :func:`report` of the rollover, taken
+        before it, and the number of students enrolled.
+    """
+    before = report(session, from_year_id, to_year_id)
+    candidates = _candidates(from_year_id, to_year_id).subquery()
+    result = session.execute(
+        pg_insert(Enrollment)
+        .from_select(
+            ["user_id", "academic_year_id", "program_semester_id"],
+            select(
+                candidates.c.user_id,
+                literal(to_year_id),
+                candidates.c.program_semester_id,
+            ).where(
+                candidates.c.program_semester_id.is_not(None),
+                candidates.c.enrolled.is_(False),
+            ),
+        )
+        .on_conflict_do_nothing(constraint="_user_academic_year_uc")
+    )
+    return before, result.rowcount
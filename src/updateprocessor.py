@@ -0,0 +1,250 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Coroutine
+from datetime import UTC, datetime
+from typing import Any, Callable, Optional
+
+from telegram import MessageEntity, Update
+from telegram.error import TelegramError
+from telegram.ext import BaseUpdateProcessor
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, MESSAGE, BACKGROUND = range(3)
+"""Priorities of the updates, lowest first, see :func:`priority`"""
+
+
+def chat_key(update: object) -> Optional[int]:
+    """The id of the chat of :paramref:`update`, or of its user for updates without
+    a chat (e.g. inline queries). `None` for updates of neither."""
+    if not isinstance(update, Update):
+        return None
+    if chat := update.effective_chat:
+        return chat.id
+    if user := update.effective_user:
+        return user.id
+    return None
+
+
+def priority(update: object) -> int:
+    """:const:`INTERACTIVE` for button taps and commands, someone is waiting for
+    them. :const:`MESSAGE` for the other messages, :const:`BACKGROUND` for the rest,
+    e.g. edits and chat member updates."""
+    if not isinstance(update, Update):
+        return BACKGROUND
+    if update.callback_query:
+        return INTERACTIVE
+    if message := update.message:
+        entities = message.entities
+        if entities and entities[0].type == MessageEntity.BOT_COMMAND:
+            return INTERACTIVE
+        return MESSAGE
+    return BACKGROUND
+
+
+class _Chat:
+    """The lock ordering the updates of a chat, and how many of them hold or wait
+    for it"""
+
+    __slots__ = ("lock", "updates")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.updates = 0
+
+
+class _Slots:
+    """A semaphore letting its waiters in by priority, then in order of arrival"""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # cancelled after it was let in, the slot goes to the next one
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        # cancelled waiters are skipped here, rather than looked up when cancelled
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+
+class ChatUpdateProcessor(BaseUpdateProcessor):
+    """Processes the updates of different chats concurrently, and the updates of a
+    chat one after the other, in the order they were received. Conversation states
+    and the `chat_data` of a chat are so never used by two updates at once.
+
+    An update is admitted when less than :paramref:`max_pending_updates` are, then
+    waits for the earlier updates of its chat, then for one of the
+    :paramref:`max_concurrent_updates` slots. Waiting for its chat before taking a
+    slot, a busy chat can't hold the slots other chats need. The slots go to the
+    waiting updates by :func:`priority`.
+
+    Under a backlog, updates are shed rather than processed late: a callback query
+    still waiting after :paramref:`callback_deadline` is handed to :attr:`busy`,
+    which tells the user to try again, and a :const:`BACKGROUND` update older than
+    :paramref:`update_ttl` when its turn comes is dropped. Messages and commands are
+    always processed, however late, someone may be waiting for them.
+
+    Args:
+        max_concurrent_updates (:obj:`int`): Updates processed at the same time.
+        callback_deadline (:obj:`float`): Seconds a callback query may wait.
+        update_ttl (:obj:`float`): Seconds after which a background update is
+            dropped.
+        max_pending_updates (:obj:`int`): Updates admitted, being processed or
+            waiting for their chat or a slot.
+
+    Attributes:
+        busy (Callable[[:class:`telegram.Update`], Awaitable]): Answers the shed
+            callback queries.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_updates: int,
+        callback_deadline: float,
+        update_ttl: float,
+        max_pending_updates: int = 1024,
+    ):
+        super().__init__(max_pending_updates)
+        self._slots = _Slots(max_concurrent_updates)
+        self._chats: dict[int, _Chat] = {}
+        self.callback_deadline = callback_deadline
+        self.update_ttl = update_ttl
+        self.busy: Optional[Callable[[Update], Awaitable[Any]]] = None
+
+        self._admitted = 0
+        self._running = 0
+        self._wait = metrics.summary("updates.wait")
+        self._duration = metrics.summary("updates.duration")
+        self._shed = metrics.counter("updates.shed")
+        self._expired = metrics.counter("updates.expired")
+        metrics.gauge("updates.running", lambda: self._running)
+        # admitted, waiting for their chat or a slot
+        metrics.gauge("updates.pending", lambda: self._admitted - self._running)
+        metrics.gauge("updates.busy_chats", lambda: len(self._chats))
+
+    async def do_process_update(
+        self, update: object, coroutine: Coroutine[Any, Any, Any]
+    ) -> None:
+        admitted = time.monotonic()
+        self._admitted += 1
+        try:
+            await self._process_in_order(update, coroutine, admitted)
+        finally:
+            self._admitted -= 1
+
+    async def _process_in_order(
+        self, update: object, coroutine: Coroutine[Any, Any, Any], admitted: float
+    ) -> None:
+        key = chat_key(update)
+        chat = None
+        if key is not None:
+            chat = self._chats.get(key)
+            if chat is None:
+                chat = self._chats[key] = _Chat()
+            chat.updates += 1
+        try:
+            deadline = None
+            if isinstance(update, Update) and update.callback_query:
+                deadline = admitted + self.callback_deadline
+            update_priority = priority(update)
+            try:
+                async with asyncio.timeout_at(self._loop_time(deadline)):
+                    await self._acquire(chat, update_priority)
+            except TimeoutError:
+                coroutine.close()
+                self._shed.inc()
+                if self.busy is not None:
+                    with contextlib.suppress(TelegramError):
+                        await self.busy(update)
+                return
+
+            try:
+                if update_priority == BACKGROUND and self._is_expired(
+                    update, admitted
+                ):
+                    coroutine.close()
+                    self._expired.inc()
+                    logger.info(
+                        "Dropped update %s, older than %ss",
+                        getattr(update, "update_id", None),
+                        self.update_ttl,
+                    )
+                    return
+                await self._process(coroutine, admitted)
+            finally:
+                self._slots.release()
+                if chat is not None:
+                    chat.lock.release()
+        finally:
+            if chat is not None:
+                chat.updates -= 1
+                if chat.updates == 0:
+                    del self._chats[key]
+
+    async def _acquire(self, chat: Optional[_Chat], priority: int) -> None:
+        if chat is not None:
+            await chat.lock.acquire()
+        try:
+            await self._slots.acquire(priority)
+        except BaseException:
+            if chat is not None:
+                chat.lock.release()
+            raise
+
+    @staticmethod
+    def _loop_time(deadline: Optional[float]) -> Optional[float]:
+        """:paramref:`deadline`, a `time.monotonic()`, in the event loop's clock"""
+        if deadline is None:
+            return None
+        return asyncio.get_running_loop().time() + deadline - time.monotonic()
+
+    def _is_expired(self, update: object, admitted: float) -> bool:
+        if time.monotonic() - admitted > self.update_ttl:
+            return True
+        # also counts the time spent in Telegram's queue, e.g. while the bot was down
+        if isinstance(update, Update) and (message := update.edited_message):
+            age = datetime.now(UTC) - (message.edit_date or message.date)
+            return age.total_seconds() > self.update_ttl
+        return False
+
+    async def _process(
+        self, coroutine: Coroutine[Any, Any, Any], admitted: float
+    ) -> None:
+        start = time.monotonic()
+        self._wait.observe(start - admitted)
+        self._running += 1
+        try:
+            await coroutine
+        finally:
+            self._running -= 1
+            self._duration.observe(time.monotonic() - start)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -1,11 +1,9 @@
-import math
 from datetime import timedelta
 from functools import wraps
 from gettext import GNUTranslations
-from typing import Generic, TypeVar
 
 from babel.dates import format_timedelta
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session as SessionType
 from telegram import Bot, BotCommandScopeChat, InlineKeyboardButton, Update
 from telegram.constants import ChatAction
@@ -14,7 +12,7 @@ from telegram.ext import ContextTypes
 from src import constants
 from src.constants import Commands
 from src.database import Session
-from src.models import Role, RoleName, Setting, SettingKey, User, user_role
+from src.models import Role, RoleName, SettingKey, User, user_role
 
 
 def send_action(action):
@@ -142,34 +140,28 @@ def user_locale(language_code: str) -> GNUTranslations:
     return constants.ar_ if language_code == constants.AR else constants.en_
 
 
-def get_setting_value(session: SessionType, user_id: int, setting_key: SettingKey):
-    value = session.scalar(
-        select(Setting.value).where(
-            Setting.user_id == user_id, Setting.key == setting_key.key
-        )
+def get_notification_settings(
+    session: SessionType, user_id: int
+) -> dict[SettingKey, bool]:
+    """The value of each notification setting of a user, read in one query"""
+    mask = session.scalar(select(User.notification_mask).where(User.id == user_id))
+    return {key: bool(mask & key.bit) for key in SettingKey.get_notification_keys()}
+
+
+def set_notification_settings(
+    session: SessionType, user_id: int, values: dict[SettingKey, bool]
+) -> bool:
+    """Sets notification settings of a user in one statement. Returns whether any
+    of them changed."""
+    on = sum(key.bit for key, value in values.items() if value)
+    off = sum(key.bit for key, value in values.items() if not value)
+    mask = User.notification_mask.bitwise_or(on).bitwise_and(~off)
+    result = session.execute(
+        update(User)
+        .where(User.id == user_id, User.notification_mask != mask)
+        .values(notification_mask=mask)
     )
-    return value if value is not None else setting_key.default
-
-
-def set_setting_value(
-    session: SessionType, user_id: int, setting_key: SettingKey, value
-):
-    setting = session.scalar(
-        select(Setting).where(
-            Setting.user_id == user_id, Setting.key == setting_key.key
-        )
-    )
-    if setting:
-        setting.value = value
-    else:
-        user = session.get(User, user_id)
-        setting = Setting(
-            user_id=user.id,
-            key=setting_key.key,
-            value=value,
-        )
-        user.settings.append(setting)
-    return setting
+    return result.rowcount > 0
 
 
 def build_menu(
@@ -229,37 +221,3 @@ async def set_my_commands(bot: Bot, user: User):
             commands.editor_commands(),
             scope=BotCommandScopeChat(user.chat_id),
         )
-
-
-T = TypeVar("T")
-
-
-class Pager(Generic[T]):
-    def __init__(self, i_list: list[T], offset: int, size: int):
-        self.items: list[T] = i_list[offset : offset + size]
-        self.has_next: bool = (offset + size) < len(i_list)
-        self.next_offset = offset + size if self.has_next else None
-
-        self.has_previous = offset > 0
-        self.previous_offset = offset - size if self.has_previous else None
-
-        self.current_page = (offset // size) + 1
-        self.number_of_pages = math.ceil(len(i_list) / size)
-
-
-def paginate(item_list: list[T], offset: int, size: int) -> Pager:
-    items: list[T] = item_list[offset : offset + size]
-
-    has_next: bool = (offset + size) < len(item_list)
-    next_offset = offset + size if has_next else None
-
-    has_previous = offset > 0
-    previous_offset = offset - size if has_previous else None
-
-    return Pager(
-        items=items,
-        has_next=has_next,
-        next_offset=next_offset,
-        has_previous=has_previous,
-        previous_offset=previous_offset,
-    )
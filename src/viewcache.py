@@ -0,0 +1,62 @@
+import hashlib
+from typing import Any, Optional, Union
+
+from cachetools import LRUCache
+
+from src import metrics
+
+Key = tuple[Union[int, str], int]
+"""`(chat_id, message_id)` of a message"""
+
+
+def digest(*parts: Any) -> bytes:
+    """A short fingerprint of :paramref:`parts`, by their `repr`. Telegram objects
+    list all their attributes in it, objects whose `repr` is not stable never
+    match, which only costs an edit."""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+
+
+def key(chat_id: Union[int, str, None], message_id: Optional[int]) -> Optional[Key]:
+    if chat_id is None or message_id is None:
+        # inline messages are not cached
+        return None
+    return (chat_id, message_id)
+
+
+class ViewCache:
+    """Remembers what the most recent messages of the bot show, as the
+    :func:`digest` of their text and of their keyboard, to skip the edits that
+    would not change them.
+
+    Args:
+        maxsize (:obj:`int`): Messages remembered, the least recently used ones are
+            forgotten first.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self._views: LRUCache[Key, tuple[bytes, bytes]] = LRUCache(
+            maxsize=maxsize
+        )
+        self.skipped = metrics.counter("edits.skipped")
+
+    def remember(self, key: Optional[Key], text: bytes, markup: bytes) -> None:
+        if key is not None:
+            self._views[key] = (text, markup)
+
+    def shows(self, key: Optional[Key], text: Optional[bytes], markup: bytes) -> bool:
+        """Whether the message :paramref:`key` already shows :paramref:`text` and
+        :paramref:`markup`. :paramref:`text` `None` compares the keyboard only."""
+        if key is None or (view := self._views.get(key)) is None:
+            return False
+        shows = view[1] == markup and (text is None or view[0] == text)
+        if shows:
+            self.skipped.inc()
+        return shows
+
+    def update_markup(self, key: Optional[Key], markup: bytes) -> None:
+        if key is not None and (view := self._views.get(key)) is not None:
+            self._views[key] = (view[0], markup)
+
+    def forget(self, key: Optional[Key]) -> None:
+        if key is not None:
+            self._views.pop(key, None)